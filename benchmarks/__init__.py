@@ -0,0 +1,8 @@
+"""
+Performance benchmarks for llmworkbook.
+
+Run all suites with:
+    python -m benchmarks
+
+See `python -m benchmarks --help` for sizes, output and regression options.
+"""
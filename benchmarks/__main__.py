@@ -0,0 +1,156 @@
+"""
+Command line entry point for the benchmark suite.
+
+Usage:
+    python -m benchmarks [--suites wrappers,integrator] [--sizes 1000,100000,1000000]
+                         [--large] [--json results.json] [--compare baseline.json]
+"""
+
+import argparse
+import sys
+
+from . import (
+    bench_cache,
+    bench_formats,
+    bench_imports,
+    bench_integrator,
+    bench_parallel,
+    bench_storage,
+    bench_templates,
+    bench_wrappers,
+)
+from .harness import compare_results, print_results, save_results
+
+
+def _int_list(value: str):
+    return [int(item) for item in value.split(",") if item]
+
+
+def main():
+    """
+    Parse arguments, run the selected suites and report the results.
+    """
+    parser = argparse.ArgumentParser(description="Run llmworkbook benchmarks.")
+    parser.add_argument(
+        "--suites",
+        default="wrappers,integrator",
+        help="Comma-separated suites to run: wrappers, integrator, scheduling, "
+        "imports, storage, formats, templates, parallel, cache "
+        "(default: wrappers,integrator)",
+    )
+    parser.add_argument(
+        "--sizes",
+        type=_int_list,
+        default=[1_000, 100_000, 1_000_000],
+        help="Row counts for the wrapping benchmarks",
+    )
+    parser.add_argument(
+        "--integrator-sizes",
+        type=_int_list,
+        default=None,
+        help="Row counts for the integrator benchmarks (network bound; default: "
+        "1000, or 1000,100000,1000000 with --large)",
+    )
+    parser.add_argument(
+        "--large",
+        action="store_true",
+        help="Run the integrator benchmarks at 1k, 100k and 1M rows",
+    )
+    parser.add_argument(
+        "--no-memory",
+        action="store_true",
+        help="Skip the extra peak memory run of the integrator benchmarks",
+    )
+    parser.add_argument(
+        "--storage-sizes",
+        type=_int_list,
+        default=[100_000],
+        help="Row counts for the string storage benchmarks",
+    )
+    parser.add_argument(
+        "--template-sizes",
+        type=_int_list,
+        default=[100_000],
+        help="Row counts for the prompt template benchmarks",
+    )
+    parser.add_argument(
+        "--parallel-sizes",
+        type=_int_list,
+        default=[1_000_000],
+        help="Row counts for the parallel wrapping benchmarks",
+    )
+    parser.add_argument(
+        "--cache-sizes",
+        type=_int_list,
+        default=[5_000],
+        help="Prompt and text counts for the cache benchmarks",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=_int_list,
+        default=[1, 2, 4, 8],
+        help="Process counts for the parallel wrapping benchmarks",
+    )
+    parser.add_argument("--latency", type=float, default=0.01)
+    parser.add_argument("--jitter", type=float, default=0.005)
+    parser.add_argument("--rate-limit-ratio", type=float, default=0.0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", help="Save results to this JSON file")
+    parser.add_argument("--compare", help="Baseline JSON file to compare against")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=1.2,
+        help="Slowdown ratio reported as a regression (default: 1.2)",
+    )
+    args = parser.parse_args()
+
+    if args.integrator_sizes is None:
+        args.integrator_sizes = [1_000, 100_000, 1_000_000] if args.large else [1_000]
+
+    suites = args.suites.split(",")
+    results = []
+    if "wrappers" in suites:
+        results += bench_wrappers.run(args.sizes, repeat=args.repeat)
+    if "integrator" in suites:
+        results += bench_integrator.run(
+            args.integrator_sizes,
+            latency=args.latency,
+            jitter=args.jitter,
+            rate_limit_ratio=args.rate_limit_ratio,
+            track_memory=not args.no_memory,
+        )
+
+    if "scheduling" in suites:
+        results += bench_integrator.run_scheduling()
+    if "formats" in suites:
+        results += bench_formats.run(repeat=args.repeat)
+    if "templates" in suites:
+        results += bench_templates.run(args.template_sizes, repeat=args.repeat)
+    if "parallel" in suites:
+        results += bench_parallel.run(
+            args.parallel_sizes, args.jobs, repeat=args.repeat
+        )
+    if "storage" in suites:
+        results += bench_storage.run(args.storage_sizes, repeat=args.repeat)
+    if "cache" in suites:
+        results += bench_cache.run(
+            args.cache_sizes, latency=args.latency, repeat=args.repeat
+        )
+    if "imports" in suites:
+        results += bench_imports.run(repeat=max(args.repeat, 5))
+
+    print_results(results)
+
+    if args.json:
+        save_results(results, args.json)
+    if args.compare:
+        regressions = compare_results(results, args.compare, args.threshold)
+        for message in regressions:
+            print(f"REGRESSION {message}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""
+Cache hit rate and throughput on repeated prompts and texts.
+
+Repeated prompts go through `LLMService` (shared response cache) and repeated texts
+through `LLMDataFrameIntegrator.add_embeddings` (the runner's embedding LRU cache),
+each with the cache enabled and disabled, against the local mock server.
+"""
+
+import asyncio
+import os
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from llmworkbook import (
+    ConcurrencyLimiter,
+    LLMConfig,
+    LLMDataFrameIntegrator,
+    LLMRunner,
+    LLMService,
+)
+from llmworkbook.tests.mock_server import MockChatServer
+
+from .harness import BenchmarkResult, measure
+
+# Rows per `add_embeddings` call
+_CHUNK_SIZE = 1_000
+
+
+class _CountingServer(MockChatServer):
+    """
+    Mock server that also counts the texts it embeds.
+    """
+
+    def __init__(self, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.stats["texts"] = 0
+
+    def embedding(self, text: str) -> np.ndarray:
+        self.stats["texts"] += 1
+        return super().embedding(text)
+
+
+def _repeated(rows: int, distinct: int, label: str) -> List[str]:
+    """
+    `rows` values drawn from `distinct` ones, in a fixed pseudo-random order.
+    """
+    picks = np.random.default_rng(0).integers(0, distinct, size=rows)
+    return [f"{label} number {pick}" for pick in picks]
+
+
+async def _serve(service: LLMService, prompts: List[str], wave: int) -> List[str]:
+    # Clients arrive in waves: repeats within a wave are coalesced with the request
+    # in flight, repeats of an earlier wave are served by the cache
+    responses = []
+    for start in range(0, len(prompts), wave):
+        responses += await asyncio.gather(
+            *(service.run(prompt) for prompt in prompts[start : start + wave])
+        )
+    return responses
+
+
+def _bench_service(
+    server: MockChatServer, prompts: List[str], cache_size: int, repeat: int
+) -> BenchmarkResult:
+    state: Dict = {}
+
+    def setup() -> None:
+        runner = LLMRunner(
+            LLMConfig(provider="openai", api_key="mock-key"),
+            limiter=ConcurrencyLimiter(64),
+        )
+        state["service"] = LLMService(runner, cache_size=cache_size)
+        state["requests"] = server.stats["requests"]
+
+    result = measure(
+        f"cache/service/{'cache' if cache_size else 'no_cache'}/{len(prompts)}",
+        lambda: asyncio.run(_serve(state["service"], prompts, 64)),
+        len(prompts),
+        repeat=repeat,
+        track_memory=False,
+        setup=setup,
+    )
+    counters = state["service"].stats()["service"]
+    result.extra.update(
+        hit_rate=counters["cache_hits"] / counters["requests"],
+        coalesced=counters["coalesced"],
+        upstream=server.stats["requests"] - state["requests"],
+    )
+    return result
+
+
+def _bench_embeddings(
+    server: MockChatServer, texts: List[str], cache_size: int, repeat: int
+) -> BenchmarkResult:
+    df = pd.DataFrame({"text": texts})
+    state: Dict = {}
+
+    def setup() -> None:
+        runner = LLMRunner(
+            LLMConfig(
+                provider="openai",
+                api_key="mock-key",
+                options={"embedding_cache_size": cache_size},
+            )
+        )
+        state["integrator"] = LLMDataFrameIntegrator(runner, df)
+        state["texts"] = server.stats["texts"]
+
+    def embed_chunks() -> None:
+        # One call per chunk, like a job embedding a large frame batch by batch;
+        # identical texts are only deduplicated within a call, the cache spans calls
+        for start in range(0, len(texts), _CHUNK_SIZE):
+            row_filter = list(range(start, min(start + _CHUNK_SIZE, len(texts))))
+            state["integrator"].add_embeddings("text", row_filter=row_filter)
+
+    result = measure(
+        f"cache/embeddings/{'cache' if cache_size else 'no_cache'}/{len(texts)}",
+        embed_chunks,
+        len(texts),
+        repeat=repeat,
+        track_memory=False,
+        setup=setup,
+    )
+    upstream = server.stats["texts"] - state["texts"]
+    result.extra.update(hit_rate=1 - upstream / len(texts), upstream=upstream)
+    return result
+
+
+def run(
+    sizes: List[int], distinct: int = 500, latency: float = 0.01, repeat: int = 3
+) -> List[BenchmarkResult]:
+    """
+    Benchmark the response and embedding caches on repeated inputs.
+
+    The "hit_rate" extra is the share of prompts answered by the service cache,
+    or the share of texts not sent to the server (deduplication plus cache hits);
+    "upstream" counts the requests or texts that reached the server in one run.
+    Texts are embedded 1,000 rows per `add_embeddings` call.
+
+    Args:
+        sizes (List[int]): Prompt and text counts to benchmark.
+        distinct (int): Number of distinct prompts and texts they are drawn from.
+        latency (float): Mock server mean latency in seconds.
+        repeat (int): Timed runs per case, each starting from an empty cache.
+
+    Returns:
+        List[BenchmarkResult]: One result per input, mode and size.
+    """
+    results = []
+    previous_url = os.environ.get("OPENAI_BASE_URL")
+    with _CountingServer(latency=latency, seed=0) as server:
+        os.environ["OPENAI_BASE_URL"] = server.base_url
+        try:
+            for rows in sizes:
+                prompts = _repeated(rows, distinct, "Prompt")
+                texts = _repeated(rows, distinct, "Text")
+                for cache_size in (10_000, 0):
+                    results.append(_bench_service(server, prompts, cache_size, repeat))
+                for cache_size in (10_000, 0):
+                    results.append(_bench_embeddings(server, texts, cache_size, repeat))
+                for result in results[-4:]:
+                    result.extra = {"distinct": distinct, **result.extra}
+        finally:
+            if previous_url is None:
+                os.environ.pop("OPENAI_BASE_URL", None)
+            else:
+                os.environ["OPENAI_BASE_URL"] = previous_url
+    return results
@@ -0,0 +1,49 @@
+"""
+Input tokens per row and wrapping speed of every wrap format.
+
+Tokens are counted with tiktoken when it is installed, and estimated from the
+character count otherwise.
+"""
+
+from typing import List
+
+from llmworkbook import WrapDataFrame, estimate_tokens
+from llmworkbook.wrappers import WRAP_FORMATS
+
+from .bench_wrappers import make_frame
+from .harness import BenchmarkResult, measure
+
+try:
+    import tiktoken  # noqa: F401  pylint: disable=unused-import
+
+    TOKEN_BACKEND = "tiktoken"
+except ImportError:  # Optional dependency
+    TOKEN_BACKEND = "chars"
+
+
+def run(rows: int = 10_000, repeat: int = 3) -> List[BenchmarkResult]:
+    """
+    Benchmark `WrapDataFrame.wrap()` in every format and count its tokens.
+
+    Args:
+        rows (int): Rows of sample data.
+        repeat (int): Timed runs per format.
+
+    Returns:
+        List[BenchmarkResult]: One result per format, with "tokens_per_row".
+    """
+    df = make_frame(rows)
+    results = []
+    for wrap_format in WRAP_FORMATS:
+        wrapper = WrapDataFrame(
+            df,
+            prompt_column="prompt",
+            data_columns=["review", "language"],
+            wrap_format=wrap_format,
+        )
+        result = measure(f"format/{wrap_format}/{rows}", wrapper.wrap, rows, repeat)
+        tokens = estimate_tokens(wrapper.wrap()["wrapped_output"], TOKEN_BACKEND)
+        result.extra["tokens_per_row"] = float(tokens.mean())
+        result.extra["token_backend"] = TOKEN_BACKEND
+        results.append(result)
+    return results
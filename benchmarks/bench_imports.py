@@ -0,0 +1,36 @@
+"""
+Import time of the package and the CLI, each measured in a fresh interpreter.
+"""
+
+import subprocess
+import sys
+from typing import List
+
+from .harness import BenchmarkResult, measure
+
+CASES = {
+    "import/llmworkbook": "import llmworkbook",
+    "import/llmworkbook.LLMConfig": "from llmworkbook import LLMConfig",
+    "import/llmworkbook.LLMRunner": "from llmworkbook import LLMRunner",
+    "import/cli": "import llmworkbook.cli.cli",
+}
+
+
+def _python(code: str) -> None:
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+def run(repeat: int = 5) -> List[BenchmarkResult]:
+    """
+    Benchmark interpreter start plus import, for the package, single names and the CLI.
+
+    Args:
+        repeat (int): Timed runs per case.
+
+    Returns:
+        List[BenchmarkResult]: One result per case, including `python -c pass`.
+    """
+    results = [measure("import/baseline", lambda: _python("pass"), 1, repeat, False)]
+    for name, code in CASES.items():
+        results.append(measure(name, lambda code=code: _python(code), 1, repeat, False))
+    return results
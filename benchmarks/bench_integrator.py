@@ -0,0 +1,165 @@
+"""
+Integrator throughput against the local mock chat-completions server.
+
+The runner is pointed at the mock server through the `OPENAI_BASE_URL`
+environment variable, so the full OpenAI client stack is exercised.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+import pandas as pd
+
+from llmworkbook import (
+    AdaptiveConcurrencyLimiter,
+    ConcurrencyLimiter,
+    LLMConfig,
+    LLMRunner,
+    LLMDataFrameIntegrator,
+)
+from llmworkbook.tests.mock_server import MockChatServer
+
+from .harness import BenchmarkResult, measure
+
+
+def _make_runner(limiter=None) -> LLMRunner:
+    return LLMRunner(LLMConfig(provider="openai", api_key="mock-key"), limiter=limiter)
+
+
+def _run_threaded(runner: LLMRunner, df: pd.DataFrame, workers: int) -> pd.DataFrame:
+    """
+    Baseline that fans `run_sync` out over a thread pool.
+    """
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        responses = list(executor.map(runner.run_sync, df["prompt_column"]))
+    df["llm_response"] = responses
+    return df
+
+
+# One request at a time would take hours beyond this many rows
+_SERIAL_MAX_ROWS = 100_000
+
+
+def run(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    sizes: List[int],
+    latency: float = 0.01,
+    jitter: float = 0.005,
+    rate_limit_ratio: float = 0.0,
+    workers: int = 16,
+    repeat: int = 1,
+    track_memory: bool = True,
+) -> List[BenchmarkResult]:
+    """
+    Benchmark sync, async (unbounded and AIMD-limited) and threaded integration modes.
+
+    The sync mode is skipped above 100k rows, where it would take hours.
+
+    Args:
+        sizes (List[int]): Row counts to benchmark.
+        latency (float): Mock server mean latency in seconds.
+        jitter (float): Mock server latency jitter in seconds.
+        rate_limit_ratio (float): Fraction of requests the mock answers with 429.
+        workers (int): Thread count for the threaded baseline.
+        repeat (int): Timed runs per case.
+        track_memory (bool): Record peak memory in one extra run per case.
+
+    Returns:
+        List[BenchmarkResult]: One result per mode and size.
+    """
+    results = []
+    previous_url = os.environ.get("OPENAI_BASE_URL")
+    with MockChatServer(
+        latency=latency, jitter=jitter, rate_limit_ratio=rate_limit_ratio, seed=0
+    ) as server:
+        os.environ["OPENAI_BASE_URL"] = server.base_url
+        try:
+            for rows in sizes:
+                prompts = pd.DataFrame(
+                    {"prompt_column": [f"Prompt number {i}" for i in range(rows)]}
+                )
+
+                limiter = AdaptiveConcurrencyLimiter()
+
+                def fresh_integrator(
+                    rows_df=prompts, limiter=None
+                ) -> LLMDataFrameIntegrator:
+                    return LLMDataFrameIntegrator(_make_runner(limiter), rows_df.copy())
+
+                cases = {
+                    "sync": lambda: fresh_integrator().add_llm_responses(),
+                    "async": lambda: fresh_integrator().add_llm_responses(
+                        async_mode=True
+                    ),
+                    "async+aimd": lambda limiter=limiter: fresh_integrator(
+                        limiter=limiter
+                    ).add_llm_responses(async_mode=True),
+                    f"threaded[{workers}]": lambda rows_df=prompts: _run_threaded(
+                        _make_runner(), rows_df.copy(), workers
+                    ),
+                }
+                if rows > _SERIAL_MAX_ROWS:
+                    del cases["sync"]
+                for mode, func in cases.items():
+                    result = measure(
+                        f"integrator/{mode}/{rows}",
+                        func,
+                        rows,
+                        repeat=repeat,
+                        track_memory=track_memory,
+                    )
+                    if mode == "async+aimd":
+                        result.extra["concurrency_limit"] = limiter.limit
+                    results.append(result)
+        finally:
+            if previous_url is None:
+                os.environ.pop("OPENAI_BASE_URL", None)
+            else:
+                os.environ["OPENAI_BASE_URL"] = previous_url
+    return results
+
+
+def run_scheduling(
+    rows: int = 200, concurrency: int = 8, latency_per_token: float = 0.002
+) -> List[BenchmarkResult]:
+    """
+    Compare index-order and longest-first dispatch on prompts of skewed size.
+
+    Prompt latency grows with prompt length and the few longest prompts sit at the
+    end of the frame, the worst case for index-order dispatch.
+
+    Args:
+        rows (int): Number of rows.
+        concurrency (int): Fixed concurrency limit of the runner.
+        latency_per_token (float): Mock server latency per prompt token.
+
+    Returns:
+        List[BenchmarkResult]: One result per schedule.
+    """
+    lengths = [40] * (rows - rows // 20) + [4000] * (rows // 20)
+    prompts = pd.DataFrame({"prompt_column": ["x" * length for length in lengths]})
+
+    results = []
+    previous_url = os.environ.get("OPENAI_BASE_URL")
+    with MockChatServer(latency_per_token=latency_per_token) as server:
+        os.environ["OPENAI_BASE_URL"] = server.base_url
+        try:
+            for schedule in (None, "longest_first"):
+                results.append(
+                    measure(
+                        f"schedule/{schedule or 'index_order'}/{rows}",
+                        lambda schedule=schedule: LLMDataFrameIntegrator(
+                            _make_runner(ConcurrencyLimiter(concurrency)),
+                            prompts.copy(),
+                        ).add_llm_responses(async_mode=True, schedule=schedule),
+                        rows,
+                        repeat=1,
+                        track_memory=False,
+                    )
+                )
+        finally:
+            if previous_url is None:
+                os.environ.pop("OPENAI_BASE_URL", None)
+            else:
+                os.environ["OPENAI_BASE_URL"] = previous_url
+    return results
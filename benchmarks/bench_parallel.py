@@ -0,0 +1,49 @@
+"""
+Parallel wrapping scaling: `wrap(n_jobs=...)` over a growing number of processes.
+"""
+
+import os
+from typing import List
+
+from llmworkbook import WrapDataFrame
+
+from .bench_wrappers import make_frame
+from .harness import BenchmarkResult, measure
+
+
+def run(sizes: List[int], jobs: List[int], repeat: int = 3) -> List[BenchmarkResult]:
+    """
+    Benchmark parallel wrapping for every size and process count.
+
+    Process counts above the number of cores are skipped.
+
+    Args:
+        sizes (List[int]): Row counts to benchmark.
+        jobs (List[int]): Process counts to benchmark; 1 is the serial baseline.
+        repeat (int): Timed runs per case.
+
+    Returns:
+        List[BenchmarkResult]: A result per size and process count.
+    """
+    cores = os.cpu_count() or 1
+    results = []
+    for rows in sizes:
+        wrapper = WrapDataFrame(
+            make_frame(rows),
+            prompt_column="prompt",
+            data_columns=["review", "language"],
+        )
+        for n_jobs in jobs:
+            if n_jobs > cores:
+                continue
+            results.append(
+                measure(
+                    f"parallel/n_jobs={n_jobs}/{rows}",
+                    lambda wrapper=wrapper, n_jobs=n_jobs: wrapper.wrap(n_jobs=n_jobs),
+                    rows,
+                    repeat=repeat,
+                    # tracemalloc only sees the parent process
+                    track_memory=False,
+                )
+            )
+    return results
@@ -0,0 +1,81 @@
+"""
+Memory of wrapped and response columns with object vs Arrow-backed string storage.
+
+Arrow buffers are allocated outside the Python allocator, so tracemalloc cannot see
+them; the column size is taken from `memory_usage(deep=True)` instead, along with the
+number of Python objects the column keeps alive.
+"""
+
+from typing import List, Optional
+
+from llmworkbook import LLMDataFrameIntegrator, WrapDataFrame
+
+from .bench_wrappers import make_frame
+from .harness import BenchmarkResult, measure
+
+STORAGES = [None, "pyarrow", "large_string"]
+
+
+class _EchoRunner:  # pylint: disable=too-few-public-methods
+    """
+    Runner stand-in answering instantly with a response of realistic length.
+    """
+
+    async def run(self, prompt: str) -> str:
+        """
+        Returns:
+            str: A response four times as long as the prompt.
+        """
+        return prompt * 4
+
+
+def _footprint(result: BenchmarkResult, column) -> BenchmarkResult:
+    result.extra["column_mb"] = column.memory_usage(deep=True) / 1024**2
+    result.extra["py_objects"] = len(column) if column.dtype == object else 0
+    return result
+
+
+def run(sizes: List[int], repeat: int = 3) -> List[BenchmarkResult]:
+    """
+    Benchmark wrapping and storing responses for every string storage.
+
+    Args:
+        sizes (List[int]): Row counts to benchmark.
+        repeat (int): Timed runs per case.
+
+    Returns:
+        List[BenchmarkResult]: One wrap and one response result per storage and size.
+    """
+    results = []
+    for rows in sizes:
+        df = make_frame(rows)
+        wrapper = WrapDataFrame(
+            df, prompt_column="prompt", data_columns=["review", "language"]
+        )
+        for storage in STORAGES:
+            label = storage or "object"
+            wrapped: Optional[object] = None
+
+            def wrap(storage=storage):
+                nonlocal wrapped
+                wrapped = wrapper.wrap(string_storage=storage)
+
+            result = measure(f"storage/wrap/{label}/{rows}", wrap, rows, repeat, False)
+            results.append(_footprint(result, wrapped["wrapped_output"]))
+
+            integrator = LLMDataFrameIntegrator(
+                _EchoRunner(), wrapped.copy(), string_storage=storage
+            )
+            result = measure(
+                f"storage/responses/{label}/{rows}",
+                lambda integrator=integrator: integrator.add_llm_responses(
+                    prompt_column="wrapped_output", async_mode=True
+                ),
+                rows,
+                repeat=1,
+                track_memory=False,
+                setup=integrator.reset_responses,
+            )
+            results.append(_footprint(result, integrator.df["llm_response"]))
+            del wrapped, integrator
+    return results
@@ -0,0 +1,48 @@
+"""
+Prompt template rendering throughput: `PromptTemplate.render` against a row-wise
+`df.apply` f-string building the same prompts.
+"""
+
+from typing import List
+
+from llmworkbook import PromptTemplate
+
+from .bench_wrappers import make_frame
+from .harness import BenchmarkResult, measure
+
+TEMPLATE = "Summarize this {language} review in one sentence: {review}"
+
+
+def run(sizes: List[int], repeat: int = 3) -> List[BenchmarkResult]:
+    """
+    Benchmark template rendering for every size.
+
+    Args:
+        sizes (List[int]): Row counts to benchmark.
+        repeat (int): Timed runs per case.
+
+    Returns:
+        List[BenchmarkResult]: A "template" and an "apply" result per size.
+    """
+    template = PromptTemplate(TEMPLATE)
+    results = []
+    for rows in sizes:
+        df = make_frame(rows)
+
+        def apply(df=df):
+            return df.apply(
+                lambda row: "Summarize this "
+                f"{row['language']} review in one sentence: {row['review']}",
+                axis=1,
+            )
+
+        results.append(
+            measure(
+                f"template/render/{rows}",
+                lambda df=df: template.render(df),
+                rows,
+                repeat=repeat,
+            )
+        )
+        results.append(measure(f"template/apply/{rows}", apply, rows, repeat=repeat))
+    return results
@@ -0,0 +1,76 @@
+"""
+Wrapping throughput and memory for the wrapper classes.
+
+`WrapPolarsFrame` is included when the optional `polars` package is installed.
+"""
+
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+from llmworkbook import WrapDataFrame, WrapDataArray, WrapPromptList, WrapPolarsFrame
+
+try:
+    import polars as pl
+except ImportError:  # Optional dependency
+    pl = None
+
+from .harness import BenchmarkResult, measure
+
+
+def make_frame(rows: int) -> pd.DataFrame:
+    """
+    Build a synthetic frame with a prompt column and two data columns.
+
+    Args:
+        rows (int): Number of rows.
+
+    Returns:
+        pd.DataFrame: The synthetic data.
+    """
+    ids = np.arange(rows)
+    return pd.DataFrame(
+        {
+            "prompt": np.where(ids % 2 == 0, "Summarize this", "Translate this"),
+            "review": pd.Series(ids).map("Review text number {}".format),
+            "language": np.where(ids % 3 == 0, "en", "es"),
+        }
+    )
+
+
+def run(sizes: List[int], repeat: int = 3) -> List[BenchmarkResult]:
+    """
+    Benchmark `wrap()` for every wrapper and size.
+
+    Args:
+        sizes (List[int]): Row counts to benchmark.
+        repeat (int): Timed runs per case.
+
+    Returns:
+        List[BenchmarkResult]: One result per wrapper and size.
+    """
+    results = []
+    for rows in sizes:
+        df = make_frame(rows)
+        arr = df.to_numpy(dtype=object)
+        prompts = df["prompt"].tolist()
+
+        wrappers = {
+            "WrapDataFrame": WrapDataFrame(
+                df, prompt_column="prompt", data_columns=["review", "language"]
+            ),
+            "WrapDataArray": WrapDataArray(arr, prompt_index=0, data_indices=[1, 2]),
+            "WrapPromptList": WrapPromptList(prompts),
+        }
+        if pl is not None:
+            wrappers["WrapPolarsFrame"] = WrapPolarsFrame(
+                pl.from_pandas(df),
+                prompt_column="prompt",
+                data_columns=["review", "language"],
+            )
+        for name, wrapper in wrappers.items():
+            results.append(
+                measure(f"wrap/{name}/{rows}", wrapper.wrap, rows, repeat=repeat)
+            )
+    return results
@@ -0,0 +1,174 @@
+"""
+Minimal benchmark harness: timing, peak memory and regression comparison.
+"""
+
+import gc
+import json
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+
+
+class BenchmarkResult:  # pylint: disable=too-few-public-methods
+    """
+    The outcome of a single benchmark case.
+
+    Attributes:
+        name (str): Unique benchmark name (e.g. "wrap/WrapDataFrame/1000").
+        seconds (float): Best wall time over all repeats.
+        rows (int): Number of rows processed per repeat.
+        peak_mb (float, optional): Peak traced Python memory in MiB.
+        extra (Dict): Any additional benchmark-specific numbers.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        seconds: float,
+        rows: int,
+        peak_mb: Optional[float] = None,
+        extra: Optional[Dict] = None,
+    ) -> None:
+        self.name = name
+        self.seconds = seconds
+        self.rows = rows
+        self.peak_mb = peak_mb
+        self.extra = extra or {}
+
+    @property
+    def rows_per_second(self) -> float:
+        """
+        Returns:
+            float: Throughput of the best repeat.
+        """
+        return self.rows / self.seconds if self.seconds else float("inf")
+
+    def to_dict(self) -> Dict:
+        """
+        Converts the result to a dictionary.
+
+        Returns:
+            Dict: The result as a dictionary.
+        """
+        return {
+            "name": self.name,
+            "seconds": self.seconds,
+            "rows": self.rows,
+            "rows_per_second": self.rows_per_second,
+            "peak_mb": self.peak_mb,
+            **self.extra,
+        }
+
+
+def measure(
+    name: str,
+    func: Callable[[], object],
+    rows: int,
+    repeat: int = 3,
+    track_memory: bool = True,
+    setup: Optional[Callable[[], None]] = None,
+) -> BenchmarkResult:
+    """
+    Time `func` and optionally record its peak memory.
+
+    Timing runs are done without tracemalloc (which slows allocation heavy code
+    considerably); memory is measured in one separate run.
+
+    Args:
+        name (str): Benchmark name.
+        func (Callable): Zero-argument callable to benchmark.
+        rows (int): Rows processed by one call, used for throughput.
+        repeat (int): Number of timed runs; the best one is reported.
+        track_memory (bool): Whether to do an extra run under tracemalloc.
+        setup (Callable, optional): Called before every run, outside the timing.
+
+    Returns:
+        BenchmarkResult: The measured result.
+    """
+    timings = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        gc.collect()
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+
+    peak_mb = None
+    if track_memory:
+        if setup:
+            setup()
+        gc.collect()
+        tracemalloc.start()
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        peak_mb = peak / 1024**2
+
+    return BenchmarkResult(name, min(timings), rows, peak_mb)
+
+
+def print_results(results: List[BenchmarkResult]) -> None:
+    """
+    Print results as a fixed-width table.
+
+    Args:
+        results (List[BenchmarkResult]): Results to print.
+    """
+    header = f"{'benchmark':<48} {'seconds':>10} {'rows/s':>14} {'peak MiB':>10}"
+    print(header)
+    print("-" * len(header))
+    for result in results:
+        peak = f"{result.peak_mb:.1f}" if result.peak_mb is not None else "-"
+        extra = "  ".join(
+            f"{key}={value:.4g}" if isinstance(value, float) else f"{key}={value}"
+            for key, value in result.extra.items()
+        )
+        print(
+            f"{result.name:<48} {result.seconds:>10.4f} "
+            f"{result.rows_per_second:>14,.0f} {peak:>10}  {extra}".rstrip()
+        )
+
+
+def save_results(results: List[BenchmarkResult], file_path: str) -> None:
+    """
+    Save results as JSON so later runs can be compared against them.
+
+    Args:
+        results (List[BenchmarkResult]): Results to save.
+        file_path (str): Destination JSON file.
+    """
+    with open(file_path, "w", encoding="utf-8") as file:
+        json.dump([result.to_dict() for result in results], file, indent=2)
+
+
+def compare_results(
+    results: List[BenchmarkResult], baseline_path: str, threshold: float = 1.2
+) -> List[str]:
+    """
+    Compare results with a saved baseline.
+
+    Args:
+        results (List[BenchmarkResult]): Fresh results.
+        baseline_path (str): JSON file written by `save_results`.
+        threshold (float): Maximum allowed slowdown ratio before a benchmark is
+            reported as a regression.
+
+    Returns:
+        List[str]: Human readable regression messages (empty when none).
+    """
+    with open(baseline_path, "r", encoding="utf-8") as file:
+        baseline = {entry["name"]: entry for entry in json.load(file)}
+
+    regressions = []
+    for result in results:
+        previous = baseline.get(result.name)
+        if not previous:
+            continue
+        ratio = result.seconds / previous["seconds"] if previous["seconds"] else 1.0
+        if ratio > threshold:
+            regressions.append(
+                f"{result.name}: {previous['seconds']:.4f}s -> "
+                f"{result.seconds:.4f}s ({ratio:.2f}x)"
+            )
+    return regressions
@@ -1,17 +1,104 @@
 """
 llmworkbook package initialization.
+
+Public names are loaded lazily on first access (PEP 562), so `import llmworkbook`
+does not pay for importing openai, pandas and numpy until they are needed.
 """
 
-from .config import LLMConfig
-from .runner import LLMRunner
-from .integrator import LLMDataFrameIntegrator
-from .wrappers import WrapDataFrame, WrapDataArray, WrapPromptList
+import importlib
+from typing import TYPE_CHECKING
+
+# Public name -> submodule that defines it
+_LAZY_IMPORTS = {
+    "LLMConfig": ".config",
+    "Endpoint": ".endpoints",
+    "EndpointPool": ".endpoints",
+    "ConcurrencyLimiter": ".concurrency",
+    "AdaptiveConcurrencyLimiter": ".concurrency",
+    "HedgingPolicy": ".concurrency",
+    "ModelCascade": ".cascade",
+    "LLMRunner": ".runner",
+    "LLMDataFrameIntegrator": ".integrator",
+    "LLMJob": ".jobs",
+    "LLMService": ".service",
+    "LLMServiceClient": ".service",
+    "OutputSchema": ".structured",
+    "PipelineStage": ".pipeline",
+    "WrapDataFrame": ".wrappers",
+    "WrapDataArray": ".wrappers",
+    "WrapPromptList": ".wrappers",
+    "WrapPolarsFrame": ".wrappers",
+    "PromptTemplate": ".wrappers",
+    "WorkQueue": ".workqueue",
+    "SQLiteWorkQueue": ".workqueue",
+    "run_worker": ".workqueue",
+    "estimate_tokens": ".planner",
+    "plan_run": ".planner",
+}
 
+# Spelled out (not list(_LAZY_IMPORTS)) so linters see the re-exports
 __all__ = [
     "LLMConfig",
+    "Endpoint",
+    "EndpointPool",
+    "ConcurrencyLimiter",
+    "AdaptiveConcurrencyLimiter",
+    "HedgingPolicy",
+    "ModelCascade",
     "LLMRunner",
     "LLMDataFrameIntegrator",
+    "LLMJob",
+    "LLMService",
+    "LLMServiceClient",
+    "OutputSchema",
+    "PipelineStage",
     "WrapDataFrame",
     "WrapDataArray",
     "WrapPromptList",
+    "WrapPolarsFrame",
+    "PromptTemplate",
+    "WorkQueue",
+    "SQLiteWorkQueue",
+    "run_worker",
+    "estimate_tokens",
+    "plan_run",
 ]
+
+if TYPE_CHECKING:
+    from .concurrency import (
+        ConcurrencyLimiter,
+        AdaptiveConcurrencyLimiter,
+        HedgingPolicy,
+    )
+    from .cascade import ModelCascade
+    from .config import LLMConfig
+    from .endpoints import Endpoint, EndpointPool
+    from .runner import LLMRunner
+    from .integrator import LLMDataFrameIntegrator
+    from .jobs import LLMJob
+    from .service import LLMService, LLMServiceClient
+    from .pipeline import PipelineStage
+    from .planner import estimate_tokens, plan_run
+    from .structured import OutputSchema
+    from .wrappers import (
+        WrapDataFrame,
+        WrapDataArray,
+        WrapPromptList,
+        WrapPolarsFrame,
+        PromptTemplate,
+    )
+    from .workqueue import WorkQueue, SQLiteWorkQueue, run_worker
+
+
+def __getattr__(name: str):
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    # Cache it, so later lookups do not go through __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted([*globals(), *__all__])
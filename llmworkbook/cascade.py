@@ -0,0 +1,170 @@
+"""
+Model cascade module to send rows to a cheap model first and escalate only the
+responses that fail an acceptance check.
+
+An acceptance check is any callable `check(response, logprobs) -> bool`, where
+`logprobs` are the token log-probabilities of the response (None unless a check asks
+for them). Ready-made checks:
+
+1) regex_check   - the response matches a regular expression
+2) json_check    - the response is valid JSON
+3) length_check  - the response length is within bounds
+4) logprob_check - the mean token log-probability is above a threshold
+"""
+
+import json
+import re
+import threading
+from typing import Callable, Dict, List, Optional, Sequence, Union
+
+AcceptanceCheck = Callable[[str, Optional[List[float]]], bool]
+
+
+def regex_check(pattern: str, flags: int = 0) -> AcceptanceCheck:
+    """
+    Accept responses matching `pattern` (anywhere, like `re.search`).
+    """
+    compiled = re.compile(pattern, flags)
+
+    def check(  # pylint: disable=unused-argument
+        response: str, logprobs: Optional[List[float]] = None
+    ) -> bool:
+        return compiled.search(response or "") is not None
+
+    return check
+
+
+def json_check() -> AcceptanceCheck:
+    """
+    Accept responses that parse as JSON.
+    """
+
+    def check(  # pylint: disable=unused-argument
+        response: str, logprobs: Optional[List[float]] = None
+    ) -> bool:
+        try:
+            json.loads(response)
+        except (TypeError, ValueError):
+            return False
+        return True
+
+    return check
+
+
+def length_check(
+    min_chars: int = 1, max_chars: Optional[int] = None
+) -> AcceptanceCheck:
+    """
+    Accept responses of `min_chars` to `max_chars` characters.
+    """
+
+    def check(  # pylint: disable=unused-argument
+        response: str, logprobs: Optional[List[float]] = None
+    ) -> bool:
+        length = len(response or "")
+        return length >= min_chars and (max_chars is None or length <= max_chars)
+
+    return check
+
+
+def logprob_check(threshold: float = -0.5) -> AcceptanceCheck:
+    """
+    Accept responses whose mean token log-probability is at least `threshold`.
+
+    The runner requests logprobs from the provider for cascades using this check;
+    responses without logprobs are escalated.
+    """
+
+    def check(  # pylint: disable=unused-argument
+        response: str, logprobs: Optional[List[float]] = None
+    ) -> bool:
+        if not logprobs:
+            return False
+        return sum(logprobs) / len(logprobs) >= threshold
+
+    check.needs_logprobs = True
+    return check
+
+
+class ModelCascade:
+    """
+    Ordered model tiers, cheapest first, and the check that decides escalation.
+
+    A row goes to the first tier; when its response fails the check it is re-run on
+    the next tier. The response of the last tier is kept whether it passes or not.
+
+    Attributes:
+        models (List[str]): Model names of the tiers, cheapest first.
+        needs_logprobs (bool): Whether the checks need token log-probabilities.
+    """
+
+    def __init__(
+        self,
+        models: Sequence[str],
+        accept: Union[AcceptanceCheck, Sequence[AcceptanceCheck]],
+    ) -> None:
+        """
+        Args:
+            models (Sequence[str]): Model names, from the cheapest to the strongest.
+            accept (Callable or Sequence[Callable]): Acceptance check(s); a response
+                is accepted when all checks pass.
+        """
+        if len(models) < 2:
+            raise ValueError("A cascade needs at least two models.")
+        self.models = list(models)
+        self._checks = [accept] if callable(accept) else list(accept)
+        self.needs_logprobs = any(
+            getattr(check, "needs_logprobs", False) for check in self._checks
+        )
+        self._lock = threading.Lock()
+        self._stats = {
+            model: {"requests": 0, "accepted": 0, "escalated": 0, "latency": 0.0}
+            for model in self.models
+        }
+
+    def accepts(self, response: str, logprobs: Optional[List[float]] = None) -> bool:
+        """
+        Returns:
+            bool: Whether the response passes all acceptance checks.
+        """
+        return all(check(response, logprobs) for check in self._checks)
+
+    def record(self, tier: int, latency: float, accepted: bool) -> None:
+        """
+        Record a call of a tier.
+
+        Args:
+            tier (int): Index of the tier in `models`.
+            latency (float): Latency of the call in seconds.
+            accepted (bool): Whether its response passed the checks.
+        """
+        with self._lock:
+            stats = self._stats[self.models[tier]]
+            stats["requests"] += 1
+            stats["latency"] += latency
+            if accepted:
+                stats["accepted"] += 1
+            elif tier < len(self.models) - 1:
+                stats["escalated"] += 1
+
+    def stats(self) -> Dict:
+        """
+        Returns:
+            Dict: Per model, the request, accepted and escalated counters and the
+            average latency in seconds. Rows answered by each tier are its "accepted"
+            count, plus the rejected responses kept from the last tier.
+        """
+        with self._lock:
+            return {
+                model: {
+                    "requests": stats["requests"],
+                    "accepted": stats["accepted"],
+                    "escalated": stats["escalated"],
+                    "avg_latency": (
+                        stats["latency"] / stats["requests"]
+                        if stats["requests"]
+                        else 0.0
+                    ),
+                }
+                for model, stats in self._stats.items()
+            }
@@ -0,0 +1,213 @@
+"""
+Cassette module to record LLM responses and replay them offline.
+
+A cassette is an append-only data file plus a sorted index sidecar:
+
+- `<path>` holds one record per line: `<key hex>\\t<latency>\\t<json response>`.
+- `<path>.idx.npy` holds a NumPy structured array of (key, offset, length, latency)
+  sorted by key. It is opened memory-mapped, so looking up a response among
+  millions of recorded rows is a binary search plus a slice of the mapped data file.
+
+The index is rebuilt automatically when the data file has grown since it was written.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import random
+import threading
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+INDEX_DTYPE = np.dtype(
+    [("key", "<u8"), ("offset", "<u8"), ("length", "<u4"), ("latency", "<f4")]
+)
+
+
+def cassette_key(prompt: str, system_prompt: Optional[str], options: Dict) -> int:
+    """
+    Compute the 64-bit lookup key of a request.
+
+    Args:
+        prompt (str): The user prompt.
+        system_prompt (str, optional): The system prompt sent with it.
+        options (Dict): The model options; model name and temperature are part of the key.
+
+    Returns:
+        int: The request key.
+    """
+    payload = json.dumps(
+        [options.get("model_name"), options.get("temperature"), system_prompt, prompt],
+        ensure_ascii=False,
+    )
+    digest = hashlib.blake2b(payload.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+class Cassette:
+    """
+    Indexed, memory-mapped store of recorded responses.
+
+    Attributes:
+        path (str): Path of the cassette data file.
+        index_path (str): Path of the index sidecar.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Args:
+            path (str): Path of the cassette data file. It is created on first record.
+        """
+        self.path = path
+        self.index_path = f"{path}.idx.npy"
+        self._lock = threading.Lock()
+        self._writer = None
+        self._index: Optional[np.ndarray] = None
+        self._data: Optional[mmap.mmap] = None
+        self._data_file = None
+
+    def record(self, key: int, response: str, latency: float) -> None:
+        """
+        Append a response to the cassette.
+
+        Args:
+            key (int): The request key, see `cassette_key`.
+            response (str): The response text.
+            latency (float): The observed latency in seconds.
+        """
+        line = f"{key:016x}\t{latency:.6f}\t{json.dumps(response)}\n"
+        with self._lock:
+            if self._writer is None:
+                self._writer = open(  # pylint: disable=consider-using-with
+                    self.path, "a", encoding="utf-8", newline="\n"
+                )
+            self._writer.write(line)
+            self._writer.flush()
+            # Any loaded index is stale now
+            self._close_reader()
+
+    def lookup(self, key: int) -> Tuple[str, float]:
+        """
+        Look up a recorded response.
+
+        Args:
+            key (int): The request key, see `cassette_key`.
+
+        Returns:
+            Tuple[str, float]: The response text and its recorded latency.
+
+        Raises:
+            KeyError: If the request was never recorded.
+        """
+        index = self._load()
+        position = int(np.searchsorted(index["key"], np.uint64(key)))
+        if position == len(index) or int(index["key"][position]) != key:
+            raise KeyError(
+                f"Request {key:016x} is not recorded in cassette '{self.path}'."
+            )
+        entry = index[position]
+        start = int(entry["offset"])
+        raw = self._data[start : start + int(entry["length"])]
+        return json.loads(raw), float(entry["latency"])
+
+    def sample_latency(self) -> float:
+        """
+        Draw a latency from the distribution of recorded latencies.
+
+        Returns:
+            float: A recorded latency in seconds (0 for an empty cassette).
+        """
+        latencies = self._load()["latency"]
+        if not len(latencies):  # pylint: disable=use-implicit-booleaness-not-len
+            return 0.0
+        return float(latencies[random.randrange(len(latencies))])
+
+    def __len__(self) -> int:
+        return len(self._load())
+
+    def build_index(self) -> np.ndarray:
+        """
+        Scan the data file and (re)write the sorted index sidecar.
+
+        When a key was recorded more than once, the last record wins.
+
+        Returns:
+            np.ndarray: The index array.
+        """
+        entries = []
+        offset = 0
+        with open(self.path, "rb") as file:
+            for line in file:
+                key, latency, _ = line.split(b"\t", 2)
+                prefix = len(key) + len(latency) + 2
+                entries.append(
+                    (
+                        int(key, 16),
+                        offset + prefix,
+                        len(line) - prefix - 1,
+                        float(latency),
+                    )
+                )
+                offset += len(line)
+
+        index = np.array(entries, dtype=INDEX_DTYPE)
+        if len(index):
+            # Stable sort keeps record order within a key; keep the last of each run
+            index = index[np.argsort(index["key"], kind="stable")]
+            last_of_key = np.append(index["key"][1:] != index["key"][:-1], True)
+            index = index[last_of_key]
+        np.save(self.index_path, index)
+        return index
+
+    def _index_is_fresh(self) -> bool:
+        if not os.path.exists(self.index_path):
+            return False
+        index = np.load(self.index_path, mmap_mode="r")
+        data_size = os.path.getsize(self.path)
+        if not len(index):  # pylint: disable=use-implicit-booleaness-not-len
+            return data_size == 0
+        # The furthest record must end (with its newline) exactly at the end of the file
+        end = int((index["offset"] + index["length"]).max()) + 1
+        return end == data_size
+
+    def _load(self) -> np.ndarray:
+        if self._index is not None:
+            return self._index
+        with self._lock:
+            if self._index is not None:
+                return self._index
+            if not os.path.exists(self.path):
+                self._index = np.zeros(0, dtype=INDEX_DTYPE)
+                return self._index
+            if not self._index_is_fresh():
+                self.build_index()
+            self._index = np.load(self.index_path, mmap_mode="r")
+            if os.path.getsize(self.path):
+                self._data_file = open(  # pylint: disable=consider-using-with
+                    self.path, "rb"
+                )
+                self._data = mmap.mmap(
+                    self._data_file.fileno(), 0, access=mmap.ACCESS_READ
+                )
+            return self._index
+
+    def _close_reader(self) -> None:
+        self._index = None
+        if self._data is not None:
+            self._data.close()
+            self._data = None
+        if self._data_file is not None:
+            self._data_file.close()
+            self._data_file = None
+
+    def close(self) -> None:
+        """
+        Close the writer and any memory-mapped files.
+        """
+        with self._lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+            self._close_reader()
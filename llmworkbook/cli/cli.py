@@ -14,19 +14,16 @@ Commands:
     - wrap_array: Wraps a 2D array into a structured format.
     - wrap_prompts: Wraps a list of prompts.
     - test: Tests the LLM connection using a sample prompt.
+    - plan: Estimates tokens, cost and wall time of a run without calling the API.
+    - worker: Runs batches of a distributed job from a work queue.
+    - serve: Runs a local service sharing one runner, limiter and cache between scripts.
 """
 
+# Heavy imports (pandas, numpy, openai) are deferred to the commands that need
+# them, so `--help` and light commands start fast.
+# pylint: disable=import-outside-toplevel
 import argparse
 import json
-import pandas as pd
-import numpy as np
-from llmworkbook import (
-    WrapDataFrame,
-    WrapDataArray,
-    WrapPromptList,
-    LLMConfig,
-    LLMRunner,
-)
 
 
 def wrap_dataframe(
@@ -41,6 +38,9 @@ def wrap_dataframe(
         prompt_column (str): Column name to be used as the prompt.
         data_columns (str): Comma-separated column names for wrapping data.
     """
+    import pandas as pd
+    from llmworkbook import WrapDataFrame
+
     df = (
         pd.read_csv(input_file)
         if input_file.endswith(".csv")
@@ -64,6 +64,9 @@ def wrap_array(input_file: str, output_file: str, prompt_index: str, data_indice
         prompt_index (str): Index of the prompt column in the array.
         data_indices (str): Comma-separated indices for data columns.
     """
+    import numpy as np
+    from llmworkbook import WrapDataArray
+
     with open(input_file, "r", encoding="utf-8") as file:
         array_data = json.load(file)
     wrapper = WrapDataArray(
@@ -84,6 +87,8 @@ def wrap_prompts(prompts_file: str, output_file: str):
         prompts_file (str): Path to the input file containing prompts (one per line).
         output_file (str): Path to save the wrapped prompts as a CSV.
     """
+    from llmworkbook import WrapPromptList
+
     with open(prompts_file, "r", encoding="utf-8") as file:
         prompts = file.readlines()
     wrapper = WrapPromptList([prompt.strip() for prompt in prompts])
@@ -100,6 +105,8 @@ def test_llm(api_key: str, model_name: str = "gpt-3.5-turbo"):
         api_key (str): API key for the LLM provider.
         model_name (str, optional): Model name to use for testing. Defaults to "gpt-3.5-turbo".
     """
+    from llmworkbook import LLMConfig, LLMRunner
+
     config = LLMConfig(
         provider="openai",
         api_key=api_key,
@@ -124,7 +131,142 @@ def test_llm(api_key: str, model_name: str = "gpt-3.5-turbo"):
         print(f"Error: {e}")
 
 
-def main():
+def plan(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    input_file: str,
+    column: str = "wrapped_output",
+    model_name: str = "gpt-4o-mini",
+    max_tokens: int = 1024,
+    rpm: float = None,
+    tpm: float = None,
+    concurrency: int = None,
+    latency: float = None,
+    tokenizer: str = "chars",
+):
+    """
+    Estimates tokens, cost and wall time of a run over a wrapped file.
+
+    Args:
+        input_file (str): Path to a CSV or Excel file, e.g. the output of wrap_dataframe.
+        column (str, optional): Column holding the prompts. Defaults to "wrapped_output".
+        model_name (str, optional): Model to price and tokenize for.
+        max_tokens (int, optional): Maximum output tokens per row.
+        rpm (float, optional): Requests-per-minute quota.
+        tpm (float, optional): Tokens-per-minute quota.
+        concurrency (int, optional): Concurrent requests, used with `latency`.
+        latency (float, optional): Expected seconds per request.
+        tokenizer (str, optional): "chars" or "tiktoken".
+    """
+    import pandas as pd
+    from llmworkbook import LLMConfig, plan_run
+
+    df = (
+        pd.read_csv(input_file)
+        if input_file.endswith(".csv")
+        else pd.read_excel(input_file)
+    )
+    config = LLMConfig(options={"model_name": model_name, "max_tokens": max_tokens})
+    result = plan_run(
+        df,
+        config,
+        column=column,
+        rpm=rpm,
+        tpm=tpm,
+        concurrency=concurrency,
+        latency=latency,
+        token_backend=tokenizer,
+    )
+    print(f"📋 Plan for {result['rows']} rows ({model_name}):")
+    print(f"  Input tokens:  {result['input_tokens']:,}")
+    print(
+        f"  Output tokens: {result['output_tokens']:,} (at most {max_tokens} per row)"
+    )
+    if result["cost"] is not None:
+        print(f"  Cost:          ${result['cost']:,.2f} (at most)")
+    if result["wall_time"] is not None:
+        print(
+            f"  Wall time:     {result['wall_time'] / 60:,.1f} min"
+            f" (bound by {result['bottleneck']})"
+        )
+
+
+def _build_runner(model_name: str, api_key: str, base_url: str, concurrency: int):
+    """
+    Builds the runner of the worker and serve commands.
+    """
+    from llmworkbook import ConcurrencyLimiter, LLMConfig, LLMRunner
+
+    config = LLMConfig(
+        provider="openai" if base_url is None else "openai_compatible",
+        api_key=api_key,
+        options={"model_name": model_name},
+        base_url=base_url,
+    )
+    return LLMRunner(config, limiter=ConcurrencyLimiter(concurrency))
+
+
+def worker(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    queue_path: str,
+    model_name: str = "gpt-4o-mini",
+    api_key: str = None,
+    base_url: str = None,
+    concurrency: int = 8,
+    lease_seconds: float = 300.0,
+):
+    """
+    Runs batches of a distributed job from a SQLite work queue until it is finished.
+
+    Args:
+        queue_path (str): The queue file the coordinator filled with `enqueue_rows`.
+        model_name (str, optional): Model to run the prompts with.
+        api_key (str, optional): API key; defaults to the OPENAI_API_KEY variable.
+        base_url (str, optional): Base URL of an OpenAI-compatible server.
+        concurrency (int, optional): Concurrent requests of this worker.
+        lease_seconds (float, optional): Lease duration of a batch.
+    """
+    from llmworkbook import SQLiteWorkQueue, run_worker
+
+    runner = _build_runner(model_name, api_key, base_url, concurrency)
+    queue = SQLiteWorkQueue(queue_path)
+    print(f"🔄 Working on {queue_path}...")
+    try:
+        batches = run_worker(queue, runner, lease_seconds=lease_seconds)
+    finally:
+        queue.close()
+    print(f"✅ Queue finished; this worker ran {batches} batches.")
+
+
+def serve(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    model_name: str = "gpt-4o-mini",
+    api_key: str = None,
+    base_url: str = None,
+    concurrency: int = 16,
+    host: str = "127.0.0.1",
+    port: int = 8765,
+    unix_socket: str = None,
+    cache_size: int = 10_000,
+):
+    """
+    Runs the local service sharing one runner, limiter and cache between clients.
+
+    Args:
+        model_name (str, optional): Model to run the prompts with.
+        api_key (str, optional): API key; defaults to the OPENAI_API_KEY variable.
+        base_url (str, optional): Base URL of an OpenAI-compatible server.
+        concurrency (int, optional): Concurrent requests of all clients together.
+        host (str, optional): Interface to bind to.
+        port (int, optional): TCP port to bind to.
+        unix_socket (str, optional): Serve on this Unix socket instead.
+        cache_size (int, optional): Responses kept in the shared cache.
+    """
+    from llmworkbook import LLMService
+
+    runner = _build_runner(model_name, api_key, base_url, concurrency)
+    where = unix_socket or f"http://{host}:{port}"
+    print(f"🔄 Serving {model_name} on {where} (Ctrl+C to stop)...")
+    LLMService(runner, cache_size=cache_size).serve_forever(host, port, unix_socket)
+
+
+def main():  # pylint: disable=too-many-statements
     """
     Main function to handle CLI arguments and execute respective commands.
     """
@@ -179,6 +321,71 @@ def main():
         help="Optional: LLM model name (default: gpt-3.5-turbo)",
     )
 
+    # Plan a run
+    parser_plan = subparsers.add_parser(
+        "plan", help="Estimate tokens, cost and wall time without calling the API"
+    )
+    parser_plan.add_argument(
+        "input_file", help="Path to the wrapped input file (CSV/Excel)"
+    )
+    parser_plan.add_argument(
+        "--column", default="wrapped_output", help="Column holding the prompts"
+    )
+    parser_plan.add_argument("--model_name", default="gpt-4o-mini", help="Model name")
+    parser_plan.add_argument(
+        "--max_tokens", type=int, default=1024, help="Maximum output tokens per row"
+    )
+    parser_plan.add_argument("--rpm", type=float, help="Requests-per-minute quota")
+    parser_plan.add_argument("--tpm", type=float, help="Tokens-per-minute quota")
+    parser_plan.add_argument("--concurrency", type=int, help="Concurrent requests")
+    parser_plan.add_argument(
+        "--latency", type=float, help="Expected seconds per request"
+    )
+    parser_plan.add_argument(
+        "--tokenizer",
+        choices=["chars", "tiktoken"],
+        default="chars",
+        help="Token estimator (default: chars)",
+    )
+
+    # Work on a distributed job
+    parser_worker = subparsers.add_parser(
+        "worker", help="Run batches of a distributed job from a work queue"
+    )
+    parser_worker.add_argument("queue_path", help="Path to the SQLite work queue")
+    parser_worker.add_argument("--model_name", default="gpt-4o-mini", help="Model name")
+    parser_worker.add_argument("--api_key", help="API key (default: OPENAI_API_KEY)")
+    parser_worker.add_argument(
+        "--base_url", help="Base URL of an OpenAI-compatible server"
+    )
+    parser_worker.add_argument(
+        "--concurrency", type=int, default=8, help="Concurrent requests"
+    )
+    parser_worker.add_argument(
+        "--lease_seconds", type=float, default=300.0, help="Lease duration of a batch"
+    )
+
+    # Local service
+    parser_serve = subparsers.add_parser(
+        "serve", help="Run a local service sharing one runner between scripts"
+    )
+    parser_serve.add_argument("--model_name", default="gpt-4o-mini", help="Model name")
+    parser_serve.add_argument("--api_key", help="API key (default: OPENAI_API_KEY)")
+    parser_serve.add_argument(
+        "--base_url", help="Base URL of an OpenAI-compatible server"
+    )
+    parser_serve.add_argument(
+        "--concurrency", type=int, default=16, help="Concurrent requests of all clients"
+    )
+    parser_serve.add_argument(
+        "--host", default="127.0.0.1", help="Interface to bind to"
+    )
+    parser_serve.add_argument("--port", type=int, default=8765, help="TCP port")
+    parser_serve.add_argument("--unix_socket", help="Serve on this Unix socket instead")
+    parser_serve.add_argument(
+        "--cache_size", type=int, default=10_000, help="Responses kept in the cache"
+    )
+
     args = parser.parse_args()
 
     # Dispatch Commands
@@ -194,5 +401,37 @@ def main():
         wrap_prompts(args.prompts_file, args.output_file)
     elif args.command in ["test", "t"]:
         test_llm(args.api_key, args.model_name)
+    elif args.command == "plan":
+        plan(
+            args.input_file,
+            args.column,
+            args.model_name,
+            args.max_tokens,
+            args.rpm,
+            args.tpm,
+            args.concurrency,
+            args.latency,
+            args.tokenizer,
+        )
+    elif args.command == "worker":
+        worker(
+            args.queue_path,
+            args.model_name,
+            args.api_key,
+            args.base_url,
+            args.concurrency,
+            args.lease_seconds,
+        )
+    elif args.command == "serve":
+        serve(
+            args.model_name,
+            args.api_key,
+            args.base_url,
+            args.concurrency,
+            args.host,
+            args.port,
+            args.unix_socket,
+            args.cache_size,
+        )
     else:
         parser.print_help()
@@ -0,0 +1,299 @@
+"""
+Concurrency module to bound the number of in-flight LLM requests and cut tail latency.
+
+1) ConcurrencyLimiter         - a fixed limit
+2) AdaptiveConcurrencyLimiter - an AIMD limit driven by latency and 429 / timeout feedback
+3) HedgingPolicy              - when to send a duplicate request for a slow call
+
+Limiters do not hold loop-bound asyncio primitives, so one limiter can be shared by
+`run_sync` calls (one event loop each) and async integrator runs alike.
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional
+
+import numpy as np
+
+
+class ConcurrencyLimiter:
+    """
+    Limits the number of concurrent requests to a fixed value.
+
+    Attributes:
+        limit (int): Current maximum number of concurrent requests.
+        in_flight (int): Number of requests currently holding a slot.
+    """
+
+    def __init__(self, limit: int = 16) -> None:
+        """
+        Args:
+            limit (int): Maximum number of concurrent requests.
+        """
+        if limit < 1:
+            raise ValueError("Concurrency limit must be at least 1.")
+        self.limit = limit
+        self.in_flight = 0
+        self._lock = threading.Lock()
+        self._waiters: deque = deque()
+        self._stats = {"requests": 0, "overloads": 0}
+
+    @property
+    def max_limit(self) -> int:
+        """
+        Returns:
+            int: The highest limit this limiter can reach.
+        """
+        return self.limit
+
+    async def acquire(self) -> None:
+        """
+        Wait until a request slot is free and take it. Waiters are served in order.
+        """
+        with self._lock:
+            if self.in_flight < self.limit and not self._waiters:
+                self.in_flight += 1
+                return
+            future = asyncio.get_running_loop().create_future()
+            self._waiters.append(future)
+        try:
+            await future
+        except asyncio.CancelledError:
+            with self._lock:
+                if future in self._waiters:
+                    self._waiters.remove(future)
+                elif future.done() and not future.cancelled():
+                    # The slot was handed over just before cancellation; pass it on
+                    self.in_flight -= 1
+                    self._wake_waiters()
+            raise
+
+    def release(self, latency: Optional[float] = 0.0, overloaded: bool = False) -> None:
+        """
+        Give a slot back and record the outcome of the request.
+
+        Args:
+            latency (float, optional): Request latency in seconds. None (e.g. for a
+                cancelled request) gives the slot back without any feedback.
+            overloaded (bool): Whether the request failed with a 429 or a timeout.
+        """
+        with self._lock:
+            self.in_flight -= 1
+            if latency is not None or overloaded:
+                self._stats["requests"] += 1
+                if overloaded:
+                    self._stats["overloads"] += 1
+                self._on_result(latency, overloaded)
+            self._wake_waiters()
+
+    def _on_result(self, latency: float, overloaded: bool) -> None:
+        """
+        Hook for limit adaptation. Called with the lock held.
+        """
+
+    def _wake_waiters(self) -> None:
+        # Called with the lock held
+        while self._waiters and self.in_flight < self.limit:
+            future = self._waiters.popleft()
+            if future.done():
+                continue
+            self.in_flight += 1
+            future.get_loop().call_soon_threadsafe(_resolve, future)
+
+    def stats(self) -> Dict:
+        """
+        Returns:
+            Dict: The current limit, in-flight and waiting requests, and counters.
+        """
+        with self._lock:
+            return {
+                "limit": self.limit,
+                "in_flight": self.in_flight,
+                "waiting": len(self._waiters),
+                **self._stats,
+            }
+
+
+def _resolve(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class AdaptiveConcurrencyLimiter(  # pylint: disable=too-many-instance-attributes
+    ConcurrencyLimiter
+):
+    """
+    Additive-increase / multiplicative-decrease (AIMD) concurrency limit.
+
+    Every healthy completion grows the limit by `increase / limit`, i.e. by about
+    `increase` per round trip of the current window. A 429 or a timeout cuts the
+    limit by `decrease_factor`, at most once per `cooldown` seconds so one burst of
+    errors counts as a single congestion event. When smoothed latency exceeds
+    `latency_tolerance` times the best smoothed latency seen, growth pauses.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self,
+        initial_limit: int = 8,
+        min_limit: int = 1,
+        max_limit: int = 256,
+        increase: float = 1.0,
+        decrease_factor: float = 0.5,
+        latency_tolerance: Optional[float] = 2.0,
+        cooldown: float = 1.0,
+    ) -> None:
+        """
+        Args:
+            initial_limit (int): Starting concurrency.
+            min_limit (int): Lower bound of the limit.
+            max_limit (int): Upper bound of the limit.
+            increase (float): Additive increase per window of healthy completions.
+            decrease_factor (float): Multiplier (0-1) applied on 429s / timeouts.
+            latency_tolerance (float, optional): Growth pauses while smoothed latency is
+                above this multiple of the best smoothed latency. None disables it.
+            cooldown (float): Minimum seconds between two decreases.
+        """
+        if not 0 < decrease_factor < 1:
+            raise ValueError("decrease_factor must be between 0 and 1.")
+        if not 1 <= min_limit <= initial_limit <= max_limit:
+            raise ValueError(
+                "Limits must satisfy 1 <= min_limit <= initial_limit <= max_limit."
+            )
+        super().__init__(initial_limit)
+        self.min_limit = min_limit
+        self._max_limit = max_limit
+        self.increase = increase
+        self.decrease_factor = decrease_factor
+        self.latency_tolerance = latency_tolerance
+        self.cooldown = cooldown
+        # Fractional limit; `limit` is its integer part
+        self._window = float(initial_limit)
+        self._smoothed_latency: Optional[float] = None
+        self._best_latency: Optional[float] = None
+        self._last_decrease = float("-inf")
+        self._stats["decreases"] = 0
+
+    @property
+    def max_limit(self) -> int:
+        return self._max_limit
+
+    def _latency_healthy(self, latency: float) -> bool:
+        if self._smoothed_latency is None:
+            self._smoothed_latency = latency
+        else:
+            self._smoothed_latency += 0.1 * (latency - self._smoothed_latency)
+        if self._best_latency is None or self._smoothed_latency < self._best_latency:
+            self._best_latency = self._smoothed_latency
+        if self.latency_tolerance is None or not self._best_latency:
+            return True
+        return self._smoothed_latency <= self.latency_tolerance * self._best_latency
+
+    def _on_result(self, latency: float, overloaded: bool) -> None:
+        if overloaded:
+            now = time.monotonic()
+            if now - self._last_decrease >= self.cooldown:
+                self._last_decrease = now
+                self._window = max(
+                    float(self.min_limit), self._window * self.decrease_factor
+                )
+                self._stats["decreases"] += 1
+        elif self._latency_healthy(latency):
+            self._window = min(
+                float(self._max_limit), self._window + self.increase / self._window
+            )
+        self.limit = int(self._window)
+
+    def stats(self) -> Dict:
+        stats = super().stats()
+        stats["smoothed_latency"] = self._smoothed_latency
+        return stats
+
+
+class HedgingPolicy:
+    """
+    Decides when to send a duplicate ("hedged") request for a slow call.
+
+    A hedge fires when a call is still running after the `percentile` latency of
+    recent completed calls. Hedges are capped at `max_extra_load` times the number of
+    primary requests, so hedging can never add more than that fraction of load.
+    """
+
+    def __init__(
+        self,
+        percentile: float = 95.0,
+        max_extra_load: float = 0.1,
+        min_samples: int = 20,
+        window: int = 1000,
+    ) -> None:
+        """
+        Args:
+            percentile (float): Latency percentile (0-100) after which to hedge.
+            max_extra_load (float): Maximum hedges as a fraction of primary requests.
+            min_samples (int): Completed calls needed before hedging starts.
+            window (int): Number of most recent latencies the percentile is taken over.
+        """
+        if not 0 < percentile < 100:
+            raise ValueError("percentile must be between 0 and 100.")
+        self.percentile = percentile
+        self.max_extra_load = max_extra_load
+        self.min_samples = min_samples
+        self._latencies: deque = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self._stats = {"requests": 0, "hedges": 0, "hedge_wins": 0}
+
+    def hedge_delay(self) -> Optional[float]:
+        """
+        Count a primary request and return how long to wait before hedging it.
+
+        Returns:
+            float, optional: The delay in seconds, or None while there are too few samples.
+        """
+        with self._lock:
+            self._stats["requests"] += 1
+            if len(self._latencies) < self.min_samples:
+                return None
+            return float(np.percentile(self._latencies, self.percentile))
+
+    def try_hedge(self) -> bool:
+        """
+        Reserve a hedge if the extra-load budget allows it.
+
+        Returns:
+            bool: Whether a hedged request may be sent.
+        """
+        with self._lock:
+            if (
+                self._stats["hedges"] + 1
+                > self.max_extra_load * self._stats["requests"]
+            ):
+                return False
+            self._stats["hedges"] += 1
+            return True
+
+    def record(self, latency: float, hedge_won: bool = False) -> None:
+        """
+        Record the latency of a completed call.
+
+        Args:
+            latency (float): End-to-end latency in seconds.
+            hedge_won (bool): Whether the hedged request answered first.
+        """
+        with self._lock:
+            self._latencies.append(latency)
+            if hedge_won:
+                self._stats["hedge_wins"] += 1
+
+    def stats(self) -> Dict:
+        """
+        Returns:
+            Dict: Request, hedge and hedge-win counters and the current hedge delay.
+        """
+        with self._lock:
+            delay = (
+                float(np.percentile(self._latencies, self.percentile))
+                if len(self._latencies) >= self.min_samples
+                else None
+            )
+            return {**self._stats, "hedge_delay": delay}
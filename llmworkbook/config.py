@@ -10,7 +10,7 @@ class LLMConfig:  # pylint: disable=too-few-public-methods
     LLM configuration object to store various LLM parameters.
     """
 
-    def __init__(
+    def __init__(  # pylint: disable=too-many-arguments,too-many-positional-arguments
         self,
         provider: str = "openai",
         api_key: Optional[str] = None,
@@ -18,18 +18,38 @@ class LLMConfig:  # pylint: disable=too-few-public-methods
             str
         ] = "You're an assistant, process the data for given prompt.",
         options: Optional[Dict[str, Optional[float]]] = None,
+        base_url: Optional[str] = None,
+        headers: Optional[Dict[str, str]] = None,
     ) -> None:
         """
         Initializes the LLM configuration.
 
         Args:
-            provider (str): The name of the LLM provider (e.g., "openai", "azure_openai").
+            provider (str): The name of the LLM provider ("openai", "openai_compatible"
+                or "replay").
             api_key (str): The API key to authenticate requests to the LLM provider.
             system_prompt (str, optional): System-level prompt to guide the LLM.
             options (Dict, optional): Additional parameters for the model configuration, including:
                 - model_name (str): Name or version of the LLM model. Default is "gpt-4o-mini".
                 - temperature (float): Sampling temperature to control randomness. Default is 0.7.
                 - max_tokens (int): Maximum tokens for the output. Default is 1024.
+                - max_retries (int): Retries on connection errors, 429s and 5xx. Default is 2.
+                - request_timeout (float): Per-request timeout in seconds. Default is None.
+                Embedding options:
+                - embedding_model (str): Model of `LLMRunner.embed`. Default is
+                  "text-embedding-3-small".
+                - embedding_encoding (str): "base64" (default) or "float" for servers
+                  that cannot send base64 encoded vectors.
+                - embedding_cache_size (int): Vectors kept in the runner's LRU cache.
+                  Default is 10,000; 0 disables the cache.
+                Replay provider options:
+                - cassette_path (str): Cassette file to record to / replay from.
+                - replay_mode (str): "replay" (default) or "record".
+                - record_provider (str): Provider called in "record" mode. Default is "openai".
+                - replay_latency (str): None (default, no delay), "recorded" or "sampled".
+            base_url (str, optional): Base URL of an OpenAI-compatible server
+                (e.g. "http://localhost:8000/v1" for vLLM or llama.cpp).
+            headers (Dict, optional): Extra HTTP headers sent with every request.
         """
         # Default options
         default_options = {
@@ -43,6 +63,8 @@ class LLMConfig:  # pylint: disable=too-few-public-methods
         self.api_key = api_key
         self.system_prompt = system_prompt
         self.options = {**default_options, **(options or {})}
+        self.base_url = base_url
+        self.headers = headers or {}
 
     def to_dict(self) -> Dict:
         """
@@ -56,4 +78,6 @@ class LLMConfig:  # pylint: disable=too-few-public-methods
             "api_key": self.api_key,
             "system_prompt": self.system_prompt,
             "options": self.options,
+            "base_url": self.base_url,
+            "headers": self.headers,
         }
@@ -0,0 +1,282 @@
+"""
+Endpoint pool module to spread LLM calls over several endpoints / API keys.
+
+Each `Endpoint` has its own weight and optional requests-per-minute (RPM) and
+tokens-per-minute (TPM) budget. The `EndpointPool` picks an endpoint for every call,
+either by least outstanding requests or by most remaining quota, temporarily ejects
+endpoints that keep failing, and keeps per-endpoint statistics.
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+
+class Endpoint:  # pylint: disable=too-many-instance-attributes
+    """
+    A single LLM endpoint (base URL and / or API key) with its budget.
+
+    Attributes:
+        name (str): Name used in the statistics, unique within a pool. Defaults to the
+            base URL and the last characters of the API key.
+        base_url (str, optional): Base URL of the endpoint. None uses the config / default.
+        api_key (str, optional): API key of the endpoint. None uses the config / environment.
+        headers (Dict, optional): Extra HTTP headers for this endpoint.
+        weight (float): Relative share of traffic this endpoint should get.
+        rpm (int, optional): Requests-per-minute budget. None means unlimited.
+        tpm (int, optional): Tokens-per-minute budget. None means unlimited.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self,
+        base_url: Optional[str] = None,
+        api_key: Optional[str] = None,
+        headers: Optional[Dict[str, str]] = None,
+        weight: float = 1.0,
+        rpm: Optional[int] = None,
+        tpm: Optional[int] = None,
+        name: Optional[str] = None,
+    ) -> None:
+        if weight <= 0:
+            raise ValueError("Endpoint weight must be positive.")
+        self.base_url = base_url
+        self.api_key = api_key
+        self.headers = headers or {}
+        self.weight = weight
+        self.rpm = rpm
+        self.tpm = tpm
+        key = f"key-...{api_key[-4:]}" if api_key else None
+        self.name = name or " ".join(filter(None, [base_url, key])) or "default"
+        self.named = name is not None
+
+        self.outstanding = 0
+        self.consecutive_errors = 0
+        self.ejected_until = 0.0
+        self.stats = {"requests": 0, "errors": 0, "tokens": 0, "latency_total": 0.0}
+        # (timestamp, tokens) of the requests sent within the last minute
+        self._window: deque = deque()
+
+    def _expire(self, now: float) -> None:
+        while self._window and now - self._window[0][0] >= 60:
+            self._window.popleft()
+
+    def remaining_quota(self, now: float, tokens: int = 0) -> float:
+        """
+        Fraction (0-1) of the per-minute budget still available, counting `tokens`
+        for the next request. Unlimited budgets count as 1.
+
+        Args:
+            now (float): Current monotonic time.
+            tokens (int): Estimated tokens of the next request.
+
+        Returns:
+            float: The remaining fraction of the tightest budget.
+        """
+        self._expire(now)
+        remaining = 1.0
+        if self.rpm:
+            remaining = min(remaining, (self.rpm - len(self._window)) / self.rpm)
+        if self.tpm:
+            used = sum(entry[1] for entry in self._window)
+            remaining = min(remaining, (self.tpm - used - tokens) / self.tpm)
+        return remaining
+
+    def available_in(self, now: float, tokens: int = 0) -> float:
+        """
+        Seconds until this endpoint can take a request (0 when it can right away).
+
+        Args:
+            now (float): Current monotonic time.
+            tokens (int): Estimated tokens of the next request.
+
+        Returns:
+            float: Wait time in seconds.
+        """
+        if now < self.ejected_until:
+            return self.ejected_until - now
+        if self.remaining_quota(now, tokens) > 0 or not self._window:
+            return 0.0
+        return max(0.0, 60 - (now - self._window[0][0]))
+
+
+class EndpointPool:
+    """
+    Load balancer over several endpoints.
+
+    Attributes:
+        endpoints (List[Endpoint]): The balanced endpoints.
+        strategy (str): "least_outstanding" or "remaining_quota".
+        eject_after (int): Consecutive errors after which an endpoint is ejected.
+        eject_seconds (float): How long an ejected endpoint is kept out of rotation.
+    """
+
+    STRATEGIES = ("least_outstanding", "remaining_quota")
+
+    def __init__(
+        self,
+        endpoints: List[Endpoint],
+        strategy: str = "least_outstanding",
+        eject_after: int = 3,
+        eject_seconds: float = 30.0,
+    ) -> None:
+        """
+        Args:
+            endpoints (List[Endpoint]): The endpoints to balance over.
+            strategy (str): "least_outstanding" (default) picks the endpoint with the
+                fewest in-flight requests per unit of weight; "remaining_quota" picks
+                the one with the most RPM/TPM budget left, scaled by weight.
+            eject_after (int): Consecutive errors after which an endpoint is ejected.
+            eject_seconds (float): How long an ejected endpoint is kept out of rotation.
+
+        Raises:
+            ValueError: If no endpoints, an unknown strategy or two endpoints with the
+                same explicit name are given.
+        """
+        if not endpoints:
+            raise ValueError("EndpointPool needs at least one endpoint.")
+        if strategy not in self.STRATEGIES:
+            raise ValueError(
+                f"Unknown strategy '{strategy}'. Use one of {self.STRATEGIES}."
+            )
+        self._unique_names(endpoints)
+        self.endpoints = endpoints
+        self.strategy = strategy
+        self.eject_after = eject_after
+        self.eject_seconds = eject_seconds
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.endpoints)
+
+    @staticmethod
+    def _unique_names(endpoints: List[Endpoint]) -> None:
+        """
+        Check explicit names are unique and number colliding default names (two keys
+        sharing a suffix, the same URL twice) by pool position, since statistics and
+        failover track endpoints by name.
+        """
+        names = [endpoint.name for endpoint in endpoints if endpoint.named]
+        duplicates = {name for name in names if names.count(name) > 1}
+        if duplicates:
+            raise ValueError(f"Duplicate endpoint names: {sorted(duplicates)}.")
+        taken = set(names)
+        for position, endpoint in enumerate(endpoints):
+            if endpoint.named:
+                continue
+            if endpoint.name in taken:
+                endpoint.name = f"{endpoint.name} #{position}"
+            taken.add(endpoint.name)
+
+    def _score(self, endpoint: Endpoint, now: float, tokens: int) -> float:
+        # Lower is better
+        if self.strategy == "remaining_quota":
+            return -endpoint.remaining_quota(now, tokens) * endpoint.weight
+        return (endpoint.outstanding + 1) / endpoint.weight
+
+    def _try_acquire(self, tokens: int, exclude: Optional[set] = None):
+        now = time.monotonic()
+        with self._lock:
+            candidates = [
+                endpoint
+                for endpoint in self.endpoints
+                if endpoint.available_in(now, tokens) == 0
+                and (not exclude or endpoint.name not in exclude)
+            ]
+            if not candidates:
+                waits = [
+                    endpoint.available_in(now, tokens) for endpoint in self.endpoints
+                ]
+                return None, None, min(waits)
+            endpoint = min(candidates, key=lambda item: self._score(item, now, tokens))
+            entry = [now, tokens]
+            endpoint._window.append(entry)  # pylint: disable=protected-access
+            endpoint.outstanding += 1
+            return endpoint, entry, 0.0
+
+    async def acquire(self, tokens: int = 0, exclude: Optional[set] = None):
+        """
+        Wait for and reserve a request slot on the best available endpoint.
+
+        Args:
+            tokens (int): Estimated tokens of the request, counted against TPM budgets.
+            exclude (set, optional): Endpoint names to skip (e.g. ones that just failed)
+                while others are available.
+
+        Returns:
+            Tuple[Endpoint, list]: The chosen endpoint and its budget entry, to be
+            handed back to `release`.
+        """
+        while True:
+            endpoint, entry, wait = self._try_acquire(tokens, exclude)
+            if endpoint is not None:
+                return endpoint, entry
+            if exclude:
+                # Fall back to the excluded endpoints rather than waiting
+                exclude = None
+                continue
+            await asyncio.sleep(min(max(wait, 0.01), 1.0))
+
+    def release(  # pylint: disable=too-many-arguments
+        self,
+        endpoint: Endpoint,
+        entry: list,
+        latency: float,
+        tokens: Optional[int] = None,
+        error: Optional[BaseException] = None,
+    ) -> None:
+        """
+        Return a request slot and record its outcome.
+
+        Args:
+            endpoint (Endpoint): The endpoint returned by `acquire`.
+            entry (list): The budget entry returned by `acquire`.
+            latency (float): Request latency in seconds.
+            tokens (int, optional): Actual tokens used, replacing the estimate.
+            error (BaseException, optional): The endpoint's error (counted towards
+                ejection), if any.
+        """
+        with self._lock:
+            endpoint.outstanding -= 1
+            endpoint.stats["requests"] += 1
+            endpoint.stats["latency_total"] += latency
+            if tokens is not None:
+                entry[1] = tokens
+            endpoint.stats["tokens"] += entry[1]
+            if error is None:
+                endpoint.consecutive_errors = 0
+                return
+            endpoint.stats["errors"] += 1
+            endpoint.consecutive_errors += 1
+            if endpoint.consecutive_errors >= self.eject_after:
+                endpoint.ejected_until = time.monotonic() + self.eject_seconds
+                endpoint.consecutive_errors = 0
+
+    def stats(self) -> Dict[str, Dict]:
+        """
+        Per-endpoint statistics.
+
+        Returns:
+            Dict[str, Dict]: For each endpoint name: requests, errors, tokens,
+            average latency, in-flight requests, whether it is ejected and its
+            remaining quota fraction.
+        """
+        now = time.monotonic()
+        with self._lock:
+            return {
+                endpoint.name: {
+                    "requests": endpoint.stats["requests"],
+                    "errors": endpoint.stats["errors"],
+                    "tokens": endpoint.stats["tokens"],
+                    "avg_latency": (
+                        endpoint.stats["latency_total"] / endpoint.stats["requests"]
+                        if endpoint.stats["requests"]
+                        else 0.0
+                    ),
+                    "outstanding": endpoint.outstanding,
+                    "ejected": now < endpoint.ejected_until,
+                    "remaining_quota": endpoint.remaining_quota(now),
+                }
+                for endpoint in self.endpoints
+            }
@@ -2,34 +2,132 @@
 Integrator module to combine LLM responses and DataFrames.
 """
 
-from typing import Optional, List, Union
+# pylint: disable=too-many-lines
+
+from typing import (
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterator,
+    Optional,
+    List,
+    NamedTuple,
+    Tuple,
+    Union,
+)
 
 import asyncio
+import hashlib
+import heapq
+import json
+import os
+import time
+from functools import partial
+import nest_asyncio
+import numpy as np
 import pandas as pd
 
+from .jobs import LLMJob
+from .pipeline import PipelineStage, order_stages
+from .planner import estimate_tokens
 from .runner import LLMRunner
+from .structured import OutputSchema
+from .utils import resolve_string_dtype
+from .workqueue import WorkQueue
+
+# Marks the end of the result stream in `aiter_responses`
+_DONE = object()
+
+
+def _is_polars(df) -> bool:
+    # Checked by module name, so polars is only imported when it is in use
+    return type(df).__module__.split(".", 1)[0] == "polars"
+
+
+def _is_missing(value) -> bool:
+    # Empty strings and missing values give no prompt, like empty prompt cells
+    if isinstance(value, str):
+        return not value
+    return pd.api.types.is_scalar(value) and bool(pd.isna(value))
+
+
+class _Rows(NamedTuple):
+    """
+    Rows prepared for a run: their dispatch order and accessors on the frame.
+    """
+
+    indices: List[Union[int, str]]
+    prompt: Callable[[Union[int, str]], object]
+    store: Callable[[Union[int, str], str], None]
+    finish: Callable[[], None]
+    run_kwargs: Optional[Dict] = None
+
+
+# Options that do not change a response, left out of row fingerprints
+_TRANSPORT_OPTIONS = {
+    "max_retries",
+    "request_timeout",
+    "cassette_path",
+    "replay_mode",
+    "record_provider",
+    "replay_latency",
+}
+
+# Responses buffered before the first bulk write to an Arrow-backed column
+_FLUSH_EVERY = 1024
 
 
 class LLMDataFrameIntegrator:
     """
     Integrates LLM calls with a DataFrame.
+
+    Polars `DataFrame` / `LazyFrame` inputs are supported as well, without a round trip
+    through pandas: rows are addressed by position and the response column is attached
+    to a new frame (of the same kind) when the run ends, available as `self.df`.
     """
 
-    def __init__(self, runner: LLMRunner, df: pd.DataFrame) -> None:
+    def __init__(
+        self,
+        runner: LLMRunner,
+        df: pd.DataFrame,
+        fingerprint_path: Optional[str] = None,
+        string_storage: Optional[str] = None,
+    ) -> None:
         """
         Args:
-            runner (LLMRunner): The runner object to call the LLM.
-            df (pd.DataFrame): The DataFrame to attach results to.
+            runner (LLMRunner): The runner object to call the LLM, or an
+                `LLMServiceClient` to share the runner of an `llmworkbook serve` service.
+            df (pd.DataFrame): The DataFrame to attach results to. May also be a Polars
+                DataFrame or LazyFrame.
+            fingerprint_path (str, optional): Sidecar file keeping the row fingerprints
+                of incremental runs. By default they are kept in a hidden
+                `_<response_column>_fingerprint` column of the DataFrame.
+            string_storage (str, optional): Storage of response columns: None (Python
+                objects), "pyarrow" or "large_string" for Arrow-backed strings. As
+                every write copies an Arrow column, responses are written in bulk, in
+                batches that double in size, and at the end of a run.
         """
         self.runner = runner
         self.df = df
+        self.fingerprint_path = fingerprint_path
+        self.string_storage = string_storage
+        self._fingerprints: Optional[pd.DataFrame] = None
 
-    def add_llm_responses(
+    def add_llm_responses(  # pylint: disable=too-many-arguments,too-many-locals
         self,
         prompt_column: str = "prompt_column",
         response_column: str = "llm_response",
         row_filter: Optional[List[int]] = None,
         async_mode: bool = False,
+        *,
+        deadline: Optional[float] = None,
+        schedule: Optional[str] = None,
+        priority_column: Optional[str] = None,
+        on_token: Optional[Callable[[Union[int, str], str], None]] = None,
+        incremental: bool = False,
+        fingerprint_columns: Optional[List[str]] = None,
+        output_schema: Optional[OutputSchema] = None,
+        max_invalid_retries: int = 2,
     ) -> pd.DataFrame:
         """
         Runs the LLM on each row's `prompt_column` text and stores the response in
@@ -42,26 +140,490 @@ class LLMDataFrameIntegrator:
             row_filter (List[int], optional): Subset of row indices to run.
                                             If None, runs on all rows.
             async_mode (bool, optional): If True, uses async calls to LLM. Otherwise uses sync.
+            deadline (float, optional): Overall time budget in seconds. Rows that have not
+                finished by then are cancelled and keep no response. Rows whose request
+                hits the runner's `request_timeout` also keep no response.
+            schedule (str, optional): Dispatch order of the rows. None keeps index order;
+                "longest_first" sends the longest prompts first so a bounded number of
+                concurrent requests (see `LLMRunner(limiter=...)`) stays saturated
+                until the end of the run; "prefix" sends rows sharing a prompt prefix
+                together, so the provider's prompt cache stays warm for them (see the
+                wrappers' `layout="prefix"`). Responses always go to their original rows.
+            priority_column (str, optional): Numeric column to dispatch by instead,
+                highest value first. Takes precedence over `schedule`.
+            on_token (Callable, optional): Streams the responses and calls
+                `on_token(row_index, delta)` with every text delta, to show partial
+                progress on long generations.
+            incremental (bool, optional): Only runs rows that have no response yet or
+                whose fingerprint changed since their response was stored. The
+                fingerprint hashes the prompt, the `fingerprint_columns` and the
+                runner's provider, system prompt and generation options.
+            fingerprint_columns (List[str], optional): Data columns the prompt was built
+                from (e.g. the wrapper's `data_columns`), hashed with the prompt.
+            output_schema (OutputSchema, optional): Requests JSON responses with the
+                schema's `response_format`. The raw responses are parsed in one pass and
+                expanded into one typed column per schema field; rows whose response is
+                not valid for the schema are re-run, and keep missing values if they
+                are still invalid after that.
+            max_invalid_retries (int, optional): Re-runs of rows with invalid structured
+                responses. Defaults to 2.
 
         Returns:
             pd.DataFrame: The updated DataFrame with responses.
         """
-        if response_column not in self.df.columns:
-            self.df[response_column] = None
+        if output_schema is not None and _is_polars(self.df):
+            raise NotImplementedError(
+                "Structured output is not supported for Polars frames yet."
+            )
+        run_kwargs = {}
+        if output_schema is not None:
+            run_kwargs["response_format"] = output_schema.response_format()
+        rows = self._prepare_rows(
+            prompt_column,
+            response_column,
+            row_filter,
+            schedule=schedule,
+            priority_column=priority_column,
+            incremental=incremental,
+            fingerprint_columns=fingerprint_columns,
+        )._replace(run_kwargs=run_kwargs)
+        stop_at = time.monotonic() + deadline if deadline is not None else None
+        self._run_rows(rows, async_mode, stop_at, on_token)
+        if output_schema is not None:
+            self._expand_structured(
+                output_schema,
+                response_column,
+                self.df.index.tolist() if row_filter is None else list(row_filter),
+                max_invalid_retries=max_invalid_retries,
+                prompt_column=prompt_column,
+                async_mode=async_mode,
+                stop_at=stop_at,
+                on_token=on_token,
+            )
+        return self.df
 
-        if row_filter is None:
-            row_indices = self.df.index.tolist()
+    def _run_rows(
+        self,
+        rows: _Rows,
+        async_mode: bool,
+        stop_at: Optional[float],
+        on_token: Optional[Callable[[Union[int, str], str], None]],
+    ) -> None:
+        """
+        Helper method that runs prepared rows, in parallel or one after the other,
+        until `stop_at` (a `time.monotonic()` timestamp).
+        """
+        if async_mode:
+            deadline = None if stop_at is None else max(stop_at - time.monotonic(), 0)
+            self._run_async_prompts(rows, deadline, on_token)
+            return
+
+        try:
+            for idx in rows.indices:
+                if stop_at is not None and time.monotonic() >= stop_at:
+                    break
+                prompt_value = rows.prompt(idx)
+                if not _is_missing(prompt_value):
+                    kwargs = dict(rows.run_kwargs or {})
+                    if on_token is not None:
+                        kwargs["on_token"] = partial(on_token, idx)
+                    try:
+                        response = self.runner.run_sync(str(prompt_value), **kwargs)
+                    except asyncio.TimeoutError:
+                        continue
+                    rows.store(idx, response)
+        finally:
+            rows.finish()
+
+    def _expand_structured(  # pylint: disable=too-many-arguments,too-many-locals
+        self,
+        output_schema: OutputSchema,
+        response_column: str,
+        row_indices: List[Union[int, str]],
+        *,
+        max_invalid_retries: int,
+        prompt_column: str,
+        async_mode: bool,
+        stop_at: Optional[float],
+        on_token: Optional[Callable[[Union[int, str], str], None]],
+    ) -> None:
+        """
+        Helper method that parses the structured responses of the rows in bulk,
+        re-runs the rows with invalid responses and stores the schema fields as typed
+        columns.
+        """
+        for attempt in range(max_invalid_retries + 1):
+            responses = self.df.loc[row_indices, response_column].tolist()
+            records, valid = output_schema.parse(responses)
+            # Rows without a response (no prompt, timed out) are not retried
+            invalid = [
+                idx
+                for idx, ok, response in zip(row_indices, valid, responses)
+                if not ok and isinstance(response, str)
+            ]
+            if not invalid or attempt == max_invalid_retries:
+                break
+            if stop_at is not None and time.monotonic() >= stop_at:
+                break
+            rows = self._prepare_rows(prompt_column, response_column, invalid)._replace(
+                run_kwargs={"response_format": output_schema.response_format()}
+            )
+            self._run_rows(rows, async_mode, stop_at, on_token)
+
+        fields = output_schema.to_frame(records, pd.Index(row_indices))
+        for column in fields.columns:
+            if column in self.df.columns:
+                self.df.loc[row_indices, column] = fields[column]
+            else:
+                self.df[column] = fields[column].reindex(self.df.index)
+
+    def add_pipeline_responses(  # pylint: disable=too-many-locals
+        self,
+        stages: List[PipelineStage],
+        row_filter: Optional[List[int]] = None,
+        *,
+        deadline: Optional[float] = None,
+        max_in_flight: int = 100,
+    ) -> pd.DataFrame:
+        """
+        Runs several dependent prompt stages (e.g. classify -> extract -> summarize)
+        in one asynchronous run.
+
+        A row's stage is dispatched as soon as the cells its template reads are
+        done, instead of waiting for the previous stage to finish on every row, so
+        all stages overlap and share the runner's client pool, limiter and endpoint
+        budgets. Among ready cells, later stages go first, so rows finish early.
+
+        Example:
+            integrator.add_pipeline_responses([
+                PipelineStage("category", "Classify this review: {review}"),
+                PipelineStage("summary", "Summarize this {category} review: {review}"),
+            ])
+
+        Args:
+            stages (List[PipelineStage]): The stages; their order does not matter.
+            row_filter (List[int], optional): Subset of row indices to run.
+            deadline (float, optional): Overall time budget in seconds. Cells still
+                running at the deadline are cancelled and keep no response.
+            max_in_flight (int, optional): Maximum cells in flight at once.
+
+        Returns:
+            pd.DataFrame: The updated DataFrame with one response column per stage.
+            Cells reading a missing or empty value (including a failed or timed out
+            upstream cell) are skipped.
+
+        Raises:
+            ValueError: If the stages read unknown columns or form a cycle.
+        """
+        if _is_polars(self.df):
+            raise NotImplementedError(
+                "Pipelines are not supported for Polars frames yet."
+            )
+        by_output = {stage.output_column: stage for stage in stages}
+        upstream = order_stages(stages, self.df.columns)
+        downstream: Dict[str, List[str]] = {output: [] for output in upstream}
+        depth: Dict[str, int] = {}
+        for output, columns in upstream.items():
+            for column in columns:
+                downstream[column].append(output)
+            depth[output] = 1 + max((depth[column] for column in columns), default=-1)
+
+        stage_rows = {
+            output: self._prepare_rows(by_output[output].columns[0], output, row_filter)
+            for output in upstream
+        }
+        row_indices = self.df.index.tolist() if row_filter is None else row_filter
+        waiting: Dict[Tuple, int] = {}
+        ready: list = []
+        for position, idx in enumerate(row_indices):
+            for output, columns in upstream.items():
+                if columns:
+                    waiting[idx, output] = len(columns)
+                else:
+                    ready.append((-depth[output], position, idx, output))
+        heapq.heapify(ready)
+        positions = {idx: position for position, idx in enumerate(row_indices)}
+        # Upstream responses of this run; Arrow-backed columns are written in batches
+        upstream_responses: Dict[Tuple, str] = {}
+
+        async def run_cell(idx: Union[int, str], output: str) -> Optional[str]:
+            stage = by_output[output]
+            values = {
+                column: (
+                    upstream_responses[idx, column]
+                    if column in upstream[output]
+                    else self.df.at[idx, column]
+                )
+                for column in stage.columns
+            }
+            if any(_is_missing(value) for value in values.values()):
+                return None
+            try:
+                return await self.runner.run(stage.render(values))
+            except asyncio.TimeoutError:
+                return None
+
+        async def main() -> None:
+            loop = asyncio.get_running_loop()
+            stop_at = loop.time() + deadline if deadline is not None else None
+            in_flight: Dict[asyncio.Future, Tuple] = {}
+            try:
+                while ready or in_flight:
+                    while ready and len(in_flight) < max_in_flight:
+                        _, _, idx, output = heapq.heappop(ready)
+                        task = asyncio.ensure_future(run_cell(idx, output))
+                        in_flight[task] = (idx, output)
+                    timeout = None if stop_at is None else stop_at - loop.time()
+                    done, _ = await asyncio.wait(
+                        in_flight, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    if not done:
+                        return
+                    for task in done:
+                        idx, output = in_flight.pop(task)
+                        response = task.result()
+                        if response is None:
+                            continue
+                        stage_rows[output].store(idx, response)
+                        if downstream[output]:
+                            upstream_responses[idx, output] = response
+                        for child in downstream[output]:
+                            waiting[idx, child] -= 1
+                            if not waiting[idx, child]:
+                                heapq.heappush(
+                                    ready, (-depth[child], positions[idx], idx, child)
+                                )
+            finally:
+                for task in in_flight:
+                    task.cancel()
+                await asyncio.gather(*in_flight, return_exceptions=True)
+
+        try:
+            asyncio.run(main())
+        finally:
+            for rows in stage_rows.values():
+                rows.finish()
+        return self.df
+
+    def add_embeddings(  # pylint: disable=too-many-arguments,too-many-locals
+        self,
+        text_column: str = "prompt_column",
+        row_filter: Optional[List[int]] = None,
+        async_mode: bool = False,
+        *,
+        batch_size: int = 2048,
+        max_batch_tokens: int = 300_000,
+        out_path: Optional[str] = None,
+        max_in_flight: int = 8,
+    ) -> np.ndarray:
+        """
+        Embeds each row's `text_column` text with `LLMRunner.embed`, packing many rows
+        into every embeddings request.
+
+        Identical texts are embedded once. Vectors are written into one contiguous
+        float32 array instead of a Python list per row; with `out_path` the array is
+        a memory-mapped `.npy` file, so it can exceed memory and be reopened with
+        `np.load(out_path, mmap_mode="r")`. Every request takes a slot of the
+        runner's limiter and a share of its endpoint budgets, like chat calls.
+
+        Args:
+            text_column (str): The column in the DataFrame containing the text.
+            row_filter (List[int], optional): Subset of row indices to embed.
+                If None, embeds all rows.
+            async_mode (bool, optional): If True, sends up to `max_in_flight`
+                requests at once. Otherwise one after the other.
+            batch_size (int, optional): Maximum texts per request (the provider's
+                batch limit). Defaults to 2048.
+            max_batch_tokens (int, optional): Maximum estimated tokens per request.
+                Defaults to 300,000.
+            out_path (str, optional): `.npy` file to write the vectors to.
+            max_in_flight (int, optional): Maximum concurrent requests in async mode.
+
+        Returns:
+            np.ndarray: A float32 array with one row per DataFrame row (or per
+            `row_filter` entry, in that order). Rows with an empty or missing text
+            are NaN.
+        """
+        if _is_polars(self.df):
+            column = self.df.select(text_column)
+            if hasattr(column, "collect"):  # LazyFrame
+                column = column.collect()
+            values = column.to_series()
+            row_indices = list(range(len(values))) if row_filter is None else row_filter
+            texts = pd.Series(values.gather(row_indices).to_list(), dtype=object)
         else:
-            row_indices = row_filter
+            row_indices = self.df.index.tolist() if row_filter is None else row_filter
+            texts = pd.Series(
+                self.df.loc[row_indices, text_column].to_numpy(), dtype=object
+            )
+        valid = (texts.notna() & (texts.astype(str).str.len() > 0)).to_numpy()
+        valid_rows = np.flatnonzero(valid)
+        codes, uniques = pd.factorize(texts[valid].astype(str))
+        uniques = list(uniques)
+
+        # Batches of unique texts within the count and token limits
+        batches, start, batch_tokens = [], 0, 0
+        for position, tokens in enumerate(estimate_tokens(uniques)):
+            if position > start and (
+                position - start >= batch_size
+                or batch_tokens + tokens > max_batch_tokens
+            ):
+                batches.append((start, position))
+                start, batch_tokens = position, 0
+            batch_tokens += tokens
+        if uniques:
+            batches.append((start, len(uniques)))
+
+        # Rows of every unique text, grouped by code
+        order = np.argsort(codes, kind="stable")
+        sorted_codes = codes[order]
+        vectors: Optional[np.ndarray] = None
+
+        def store(batch: Tuple[int, int], embedded: np.ndarray) -> None:
+            nonlocal vectors
+            if vectors is None:
+                shape = (len(row_indices), embedded.shape[1])
+                if out_path is None:
+                    vectors = np.empty(shape, dtype=np.float32)
+                else:
+                    vectors = np.lib.format.open_memmap(
+                        out_path, mode="w+", dtype=np.float32, shape=shape
+                    )
+                vectors[:] = np.nan
+            low, high = np.searchsorted(sorted_codes, batch)
+            vectors[valid_rows[order[low:high]]] = embedded[
+                sorted_codes[low:high] - batch[0]
+            ]
 
         if async_mode:
-            return self._run_async_prompts(row_indices, prompt_column, response_column)
 
-        for idx in row_indices:
-            prompt_value = self.df.at[idx, prompt_column]
-            if prompt_value:
-                response = self.runner.run_sync(str(prompt_value))
-                self.df.at[idx, response_column] = response
+            async def main() -> None:
+                slots = asyncio.Semaphore(max_in_flight)
+
+                async def embed_batch(batch: Tuple[int, int]) -> None:
+                    async with slots:
+                        store(batch, await self.runner.embed(uniques[slice(*batch)]))
+
+                await asyncio.gather(*(embed_batch(batch) for batch in batches))
+
+            asyncio.run(main())
+        else:
+            for batch in batches:
+                store(batch, self.runner.embed_sync(uniques[slice(*batch)]))
+
+        if vectors is None:
+            return np.empty((len(row_indices), 0), dtype=np.float32)
+        if out_path is not None:
+            vectors.flush()
+        return vectors
+
+    def enqueue_rows(  # pylint: disable=too-many-arguments
+        self,
+        queue: WorkQueue,
+        prompt_column: str = "prompt_column",
+        response_column: str = "llm_response",
+        row_filter: Optional[List[int]] = None,
+        *,
+        batch_size: int = 100,
+        schedule: Optional[str] = None,
+        priority_column: Optional[str] = None,
+    ) -> int:
+        """
+        Puts the rows' prompts in a work queue, in batches for workers on other
+        processes or nodes to run (see `llmworkbook.workqueue.run_worker`). Collect the
+        responses with `collect_responses`.
+
+        Args:
+            queue (WorkQueue): A new, empty queue, e.g. `SQLiteWorkQueue("job.db")`.
+            prompt_column (str): The column in the DataFrame containing prompt text.
+            response_column (str, optional): The column the responses will go to.
+            row_filter (List[int], optional): Subset of row indices to run.
+                If None, runs all rows.
+            batch_size (int, optional): Rows per batch, the unit workers lease.
+                Defaults to 100.
+            schedule (str, optional): Order of the batches, see `add_llm_responses`.
+            priority_column (str, optional): Numeric column to order the batches by,
+                highest value first.
+
+        Returns:
+            int: Number of batches queued.
+
+        Raises:
+            ValueError: If the queue already holds batches, or `batch_size` is not
+                positive.
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size must be positive.")
+        if sum(queue.counts().values()):
+            raise ValueError(
+                "The work queue already holds batches; use a new queue for every job."
+            )
+        rows = self._prepare_rows(
+            prompt_column,
+            response_column,
+            row_filter,
+            schedule=schedule,
+            priority_column=priority_column,
+        )
+        indices = [idx for idx in rows.indices if not _is_missing(rows.prompt(idx))]
+        positions = (
+            indices if _is_polars(self.df) else self.df.index.get_indexer(indices)
+        )
+        items = [
+            (int(position), str(rows.prompt(idx)))
+            for position, idx in zip(positions, indices)
+        ]
+        rows.finish()
+        batches = [
+            items[start : start + batch_size]
+            for start in range(0, len(items), batch_size)
+        ]
+        queue.put(batches)
+        return len(batches)
+
+    def collect_responses(  # pylint: disable=too-many-arguments
+        self,
+        queue: WorkQueue,
+        prompt_column: str = "prompt_column",
+        response_column: str = "llm_response",
+        *,
+        wait: bool = False,
+        poll_interval: float = 1.0,
+        timeout: Optional[float] = None,
+    ) -> pd.DataFrame:
+        """
+        Merges the responses committed to a work queue back into the DataFrame, in
+        row order.
+
+        Args:
+            queue (WorkQueue): The queue filled by `enqueue_rows`.
+            prompt_column (str): The column in the DataFrame containing prompt text.
+            response_column (str, optional): The column to store the responses in.
+            wait (bool, optional): Wait until the workers have finished every batch.
+            poll_interval (float, optional): Seconds between checks while waiting.
+            timeout (float, optional): Stop waiting after this many seconds; rows of
+                unfinished batches keep no response.
+
+        Returns:
+            pd.DataFrame: The updated DataFrame with responses.
+        """
+        if wait:
+            stop_at = time.monotonic() + timeout if timeout is not None else None
+            while not queue.finished():
+                if stop_at is not None and time.monotonic() >= stop_at:
+                    break
+                time.sleep(poll_interval)
+
+        rows = self._prepare_rows(prompt_column, response_column, [])
+        labels = None if _is_polars(self.df) else self.df.index
+        try:
+            for position, response in queue.results():
+                if response is not None:
+                    rows.store(
+                        position if labels is None else labels[position], response
+                    )
+        finally:
+            rows.finish()
         return self.df
 
     def reset_responses(self, response_column: str = "llm_response") -> pd.DataFrame:
@@ -75,25 +637,584 @@ class LLMDataFrameIntegrator:
             pd.DataFrame: The updated DataFrame with the response column reset.
         """
         if response_column in self.df.columns:
-            self.df[response_column] = None
+            if _is_polars(self.df):
+                import polars as pl  # pylint: disable=import-outside-toplevel
+
+                self.df = self.df.with_columns(
+                    pl.lit(None, dtype=pl.String).alias(response_column)
+                )
+            else:
+                self.df[response_column] = self._empty_responses()
         return self.df
 
-    def _run_async_prompts(
-        self, row_indices: List[int], prompt_column: str, response_column: str
-    ) -> pd.DataFrame:
+    def _order_rows(
+        self,
+        row_indices: List[Union[int, str]],
+        prompt_column: str,
+        schedule: Optional[str],
+        priority_column: Optional[str],
+    ) -> List[Union[int, str]]:
         """
-        Helper method that runs LLM calls asynchronously in parallel.
+        Helper method that orders rows for dispatch, keeping index order among ties.
+        """
+        if priority_column is not None:
+            priority = -self._values(priority_column, row_indices)
+        elif schedule == "longest_first":
+            # Prompt length in characters is proportional to its token count
+            priority = -self._values(prompt_column, row_indices, lengths=True)
+        elif schedule == "prefix":
+            # Sorted prompts put rows sharing the longest prefixes next to each other
+            priority = self._values(prompt_column, row_indices, text=True)
+        elif schedule is None:
+            return row_indices
+        else:
+            raise ValueError(
+                f"Unknown schedule '{schedule}'. "
+                "Use None, 'longest_first' or 'prefix'."
+            )
+        order = np.argsort(priority, kind="stable")
+        return [row_indices[position] for position in order]
+
+    def _values(
+        self,
+        column: str,
+        row_indices: List[Union[int, str]],
+        lengths: bool = False,
+        text: bool = False,
+    ) -> np.ndarray:
         """
+        Helper method that returns a column's values (or their text or string lengths)
+        for the rows.
+        """
+        if _is_polars(self.df):
+            import polars as pl  # pylint: disable=import-outside-toplevel
+
+            values = self.df.get_column(column).gather(row_indices)
+            if lengths or text:
+                values = values.cast(pl.String).fill_null("")
+            if lengths:
+                values = values.str.len_chars()
+            return values.to_numpy()
+        values = self.df.loc[row_indices, column]
+        if lengths or text:
+            values = values.astype(str)
+        if lengths:
+            values = values.str.len()
+        return values.to_numpy()
+
+    def submit(  # pylint: disable=too-many-arguments,too-many-locals
+        self,
+        prompt_column: str = "prompt_column",
+        response_column: str = "llm_response",
+        row_filter: Optional[List[int]] = None,
+        *,
+        schedule: Optional[str] = None,
+        priority_column: Optional[str] = None,
+        max_in_flight: int = 100,
+        incremental: bool = False,
+        fingerprint_columns: Optional[List[str]] = None,
+        checkpoint_path: Optional[str] = None,
+        checkpoint_every: Optional[int] = None,
+        checkpoint_interval: Optional[float] = 30.0,
+        handle_signals: bool = True,
+    ) -> LLMJob:
+        """
+        Starts running the LLM on each row like `add_llm_responses(async_mode=True)`,
+        in the background, and returns a job handle right away.
+
+        Responses are stored in `response_column` as rows complete (Arrow-backed and
+        Polars columns are written when the job stops). Rows that fail do not stop the
+        job; their errors are kept in `job.errors`.
+
+        Example:
+            job = integrator.submit("prompt")
+            job.progress()   # done / failed / in flight rows, rows per second, ETA
+            job.cancel()     # drains the requests in flight, keeping their responses
+
+        Args:
+            prompt_column (str): The column in the DataFrame containing prompt text.
+            response_column (str, optional): The name of the column to store LLM responses.
+            row_filter (List[int], optional): Subset of row indices to run.
+            schedule (str, optional): Dispatch order, see `add_llm_responses`.
+            priority_column (str, optional): Dispatch priority column, see `add_llm_responses`.
+            max_in_flight (int, optional): Maximum rows in flight at once.
+            incremental (bool, optional): Only runs new and changed rows, see
+                `add_llm_responses`.
+            fingerprint_columns (List[str], optional): Data columns hashed with the
+                prompt, see `add_llm_responses`.
+            checkpoint_path (str, optional): File the finished responses are pickled to
+                while the job runs and when it stops, cancelled or interrupted. If it
+                exists, its responses are restored first and their rows are not run
+                again.
+            checkpoint_every (int, optional): Save the checkpoint after this many new
+                responses.
+            checkpoint_interval (float, optional): Save the checkpoint when a response
+                finishes this many seconds after the last save.
+            handle_signals (bool, optional): On SIGINT / SIGTERM, cancel the job and
+                flush its responses before the signal takes effect. Only possible when
+                called from the main thread.
+
+        Returns:
+            LLMJob: The job handle.
+        """
+        rows = self._prepare_rows(
+            prompt_column,
+            response_column,
+            row_filter,
+            schedule=schedule,
+            priority_column=priority_column,
+            incremental=incremental,
+            fingerprint_columns=fingerprint_columns,
+        )
+        completed = {}
+        if checkpoint_path is not None and os.path.exists(checkpoint_path):
+            completed = pd.read_pickle(checkpoint_path).to_dict()
+        indices = []
+        for idx in rows.indices:
+            if idx in completed:
+                rows.store(idx, completed[idx])
+            elif not _is_missing(rows.prompt(idx)):
+                indices.append(idx)
+
+        async def run_row(idx: Union[int, str]) -> str:
+            response = await self.runner.run(
+                str(rows.prompt(idx)), **(rows.run_kwargs or {})
+            )
+            rows.store(idx, response)
+            return response
+
+        def finish() -> pd.DataFrame:
+            rows.finish()
+            return self.df
+
+        job = LLMJob(
+            indices,
+            run_row,
+            finish,
+            max_in_flight=max_in_flight,
+            checkpoint_path=checkpoint_path,
+            completed=completed,
+            checkpoint_every=checkpoint_every,
+            checkpoint_interval=checkpoint_interval,
+        )
+        if handle_signals:
+            job.handle_signals()
+        return job.start()
+
+    async def aiter_responses(  # pylint: disable=too-many-arguments
+        self,
+        prompt_column: str = "prompt_column",
+        response_column: str = "llm_response",
+        row_filter: Optional[List[int]] = None,
+        *,
+        deadline: Optional[float] = None,
+        schedule: Optional[str] = None,
+        priority_column: Optional[str] = None,
+        buffer_size: int = 100,
+        on_token: Optional[Callable[[Union[int, str], str], None]] = None,
+        incremental: bool = False,
+        fingerprint_columns: Optional[List[str]] = None,
+    ) -> AsyncIterator[Tuple[Union[int, str], Optional[str], Dict]]:
+        """
+        Runs the LLM on each row like `add_llm_responses(async_mode=True)`, yielding
+        results as soon as each row completes, so they can be piped onward (DB writers,
+        queues) while the job is still running. Responses are also stored in
+        `response_column`.
+
+        At most `buffer_size` rows are in flight or waiting to be consumed: when the
+        consumer falls behind, no new requests are dispatched.
+
+        Example:
+            async for idx, response, metadata in integrator.aiter_responses("prompt"):
+                await sink.write(idx, response)
+
+        Args:
+            prompt_column (str): The column in the DataFrame containing prompt text.
+            response_column (str, optional): The name of the column to store LLM responses.
+            row_filter (List[int], optional): Subset of row indices to run.
+            deadline (float, optional): Overall time budget in seconds. Rows still running
+                at the deadline are cancelled and the iteration ends.
+            schedule (str, optional): Dispatch order, see `add_llm_responses`.
+            priority_column (str, optional): Dispatch priority column, see `add_llm_responses`.
+            buffer_size (int, optional): Maximum rows in flight plus results not yet consumed.
+            on_token (Callable, optional): Called as `on_token(row_index, delta)` with
+                every streamed text delta, see `add_llm_responses`.
+            incremental (bool, optional): Only runs new and changed rows, see
+                `add_llm_responses`.
+            fingerprint_columns (List[str], optional): Data columns hashed with the
+                prompt, see `add_llm_responses`.
+
+        Yields:
+            Tuple: (row_index, response, metadata) in completion order. `metadata` holds
+            the row's "latency" in seconds and its "error" (an `asyncio.TimeoutError` when
+            the request timed out, in which case the response is None).
+        """
+        rows = self._prepare_rows(
+            prompt_column,
+            response_column,
+            row_filter,
+            schedule=schedule,
+            priority_column=priority_column,
+            incremental=incremental,
+            fingerprint_columns=fingerprint_columns,
+        )
+        async for item in self._aiter_rows(rows, deadline, buffer_size, on_token):
+            yield item
+
+    async def _aiter_rows(  # pylint: disable=too-many-locals
+        self,
+        rows: _Rows,
+        deadline: Optional[float],
+        buffer_size: int,
+        on_token: Optional[Callable[[Union[int, str], str], None]],
+    ) -> AsyncIterator[Tuple[Union[int, str], Optional[str], Dict]]:
+        """
+        Helper that runs already prepared rows for `aiter_responses`.
+        """
+        loop = asyncio.get_running_loop()
+        stop_at = loop.time() + deadline if deadline is not None else None
+        results: asyncio.Queue = asyncio.Queue()
+        slots = asyncio.Semaphore(buffer_size)
+        tasks: set = set()
 
         async def process_row(idx: Union[int, str]) -> None:
-            prompt_value = self.df.at[idx, prompt_column]
-            if prompt_value:
-                response = await self.runner.run(str(prompt_value))
+            start = time.monotonic()
+            response, error = None, None
+            try:
+                prompt = str(rows.prompt(idx))
+                kwargs = dict(rows.run_kwargs or {})
+                if on_token is not None:
+                    kwargs["on_token"] = partial(on_token, idx)
+                response = await self.runner.run(prompt, **kwargs)
+                rows.store(idx, response)
+            except asyncio.TimeoutError as exc:
+                error = exc
+            except Exception as exc:  # pylint: disable=broad-exception-caught
+                # Handed to the consumer, which re-raises it
+                await results.put(exc)
+                return
+            await results.put(
+                (idx, response, {"latency": time.monotonic() - start, "error": error})
+            )
+
+        async def dispatch() -> None:
+            try:
+                for idx in rows.indices:
+                    if _is_missing(rows.prompt(idx)):
+                        continue
+                    await slots.acquire()
+                    task = asyncio.ensure_future(process_row(idx))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+                while tasks:
+                    await asyncio.wait(set(tasks))
+            except Exception as exc:  # pylint: disable=broad-exception-caught
+                # e.g. a row_filter index missing from the frame; the consumer raises it
+                await results.put(exc)
+            finally:
+                # Always sent, so the consumer never waits on an empty queue
+                results.put_nowait(_DONE)
+
+        dispatcher = asyncio.ensure_future(dispatch())
+        try:
+            while True:
+                timeout = None if stop_at is None else stop_at - loop.time()
+                try:
+                    item = await asyncio.wait_for(results.get(), timeout)
+                except asyncio.TimeoutError:
+                    # Deadline reached; responses finished so far are already stored
+                    return
+                if item is _DONE:
+                    return
+                slots.release()
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            pending = [dispatcher, *tasks]
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            rows.finish()
+
+    def iter_responses(  # pylint: disable=too-many-arguments
+        self,
+        prompt_column: str = "prompt_column",
+        response_column: str = "llm_response",
+        row_filter: Optional[List[int]] = None,
+        *,
+        deadline: Optional[float] = None,
+        schedule: Optional[str] = None,
+        priority_column: Optional[str] = None,
+        buffer_size: int = 100,
+        on_token: Optional[Callable[[Union[int, str], str], None]] = None,
+        incremental: bool = False,
+        fingerprint_columns: Optional[List[str]] = None,
+    ) -> Iterator[Tuple[Union[int, str], Optional[str], Dict]]:
+        """
+        Synchronous counterpart of `aiter_responses`, taking the same arguments.
+
+        Requests only make progress while the generator is being consumed, which is
+        what provides backpressure.
+
+        Example:
+            for idx, response, metadata in integrator.iter_responses("prompt"):
+                writer.write(idx, response)
+
+        Yields:
+            Tuple: (row_index, response, metadata) in completion order.
+        """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:  # No running event loop
+            loop = None
+        own_loop = loop is None
+        if own_loop:
+            loop = asyncio.new_event_loop()
+        else:
+            # Already inside an event loop (e.g., Jupyter Notebook)
+            nest_asyncio.apply()
+
+        responses = self.aiter_responses(
+            prompt_column,
+            response_column,
+            row_filter,
+            deadline=deadline,
+            schedule=schedule,
+            priority_column=priority_column,
+            buffer_size=buffer_size,
+            on_token=on_token,
+            incremental=incremental,
+            fingerprint_columns=fingerprint_columns,
+        )
+        try:
+            while True:
+                try:
+                    item = loop.run_until_complete(anext(responses))
+                except StopAsyncIteration:
+                    return
+                yield item
+        finally:
+            loop.run_until_complete(responses.aclose())
+            if own_loop:
+                loop.close()
+
+    def fingerprint_rows(
+        self,
+        prompt_column: str,
+        fingerprint_columns: Optional[List[str]] = None,
+        row_filter: Optional[List[Union[int, str]]] = None,
+    ) -> pd.Series:
+        """
+        Computes the fingerprint of every row: a hash of the prompt, the given data
+        columns and the runner's provider, system prompt and generation options. All rows
+        are hashed at once with `pd.util.hash_pandas_object`.
+
+        Args:
+            prompt_column (str): The column in the DataFrame containing prompt text.
+            fingerprint_columns (List[str], optional): Data columns to hash as well.
+            row_filter (List, optional): Subset of row indices. If None, all rows.
+
+        Returns:
+            pd.Series: 16-digit hex fingerprints, indexed like the rows. Hex strings
+            survive round trips through CSV and Excel unchanged.
+        """
+        columns = [prompt_column, *(fingerprint_columns or [])]
+        data = (
+            self.df[columns] if row_filter is None else self.df.loc[row_filter, columns]
+        )
+        config = self.runner.config
+        options = {
+            key: value
+            for key, value in sorted(config.options.items())
+            if key not in _TRANSPORT_OPTIONS
+        }
+        settings = json.dumps(
+            [config.provider, config.system_prompt, options], default=str
+        )
+        config_hash = hashlib.blake2b(settings.encode("utf-8"), digest_size=8)
+        hashes = pd.util.hash_pandas_object(
+            data.assign(_config=config_hash.hexdigest()), index=False
+        )
+        return hashes.map(lambda value: f"{value:016x}")
+
+    def _fingerprint_column(self, response_column: str) -> str:
+        return f"_{response_column}_fingerprint"
+
+    def _stored_fingerprints(self, response_column: str) -> pd.Series:
+        """
+        Helper method that returns the fingerprints stored with the responses.
+        """
+        column = self._fingerprint_column(response_column)
+        if self.fingerprint_path is None:
+            if column not in self.df.columns:
+                self.df[column] = None
+            return self.df[column]
+        if self._fingerprints is None:
+            if os.path.exists(self.fingerprint_path):
+                self._fingerprints = pd.read_pickle(self.fingerprint_path)
+            else:
+                self._fingerprints = pd.DataFrame(index=self.df.index)
+        if column not in self._fingerprints.columns:
+            self._fingerprints[column] = None
+        return self._fingerprints[column].reindex(self.df.index)
+
+    def _store_fingerprint(
+        self, response_column: str, idx: Union[int, str], fingerprint: str
+    ) -> None:
+        column = self._fingerprint_column(response_column)
+        if self.fingerprint_path is None:
+            self.df.at[idx, column] = fingerprint
+        else:
+            self._fingerprints.loc[idx, column] = fingerprint
+
+    def _save_fingerprints(self) -> None:
+        if self.fingerprint_path is not None and self._fingerprints is not None:
+            self._fingerprints.to_pickle(self.fingerprint_path)
+
+    def _prepare_rows(  # pylint: disable=too-many-arguments,too-many-locals
+        self,
+        prompt_column: str,
+        response_column: str,
+        row_filter: Optional[List[int]],
+        *,
+        schedule: Optional[str] = None,
+        priority_column: Optional[str] = None,
+        incremental: bool = False,
+        fingerprint_columns: Optional[List[str]] = None,
+    ) -> _Rows:
+        """
+        Helper method that creates the response column and returns the rows to run,
+        in dispatch order, with accessors that read prompts and store responses (and
+        the fingerprints of incremental runs).
+        """
+        if _is_polars(self.df):
+            if incremental:
+                raise NotImplementedError(
+                    "Incremental runs are not supported for Polars frames yet."
+                )
+            return self._prepare_polars_rows(
+                prompt_column, response_column, row_filter, schedule, priority_column
+            )
+
+        dtype = resolve_string_dtype(self.string_storage)
+        if response_column not in self.df.columns:
+            self.df[response_column] = self._empty_responses()
+        elif dtype is not None and self.df[response_column].dtype != dtype:
+            self.df[response_column] = self.df[response_column].astype(dtype)
+
+        if row_filter is None:
+            row_indices = self.df.index.tolist()
+        else:
+            row_indices = row_filter
+
+        fingerprints = None
+        if incremental:
+            fingerprints = self.fingerprint_rows(
+                prompt_column, fingerprint_columns, row_indices
+            )
+            stored = self._stored_fingerprints(response_column).loc[row_indices]
+            responses = self.df.loc[row_indices, response_column]
+            stale = (stored.to_numpy() != fingerprints.to_numpy()) | (
+                responses.isna().to_numpy()
+            )
+            row_indices = [idx for idx, run in zip(row_indices, stale) if run]
+
+        pending: Dict[Union[int, str], str] = {}
+        written = 0
+
+        def flush() -> None:
+            nonlocal written
+            if pending:
+                self.df.loc[list(pending), response_column] = list(pending.values())
+                written += len(pending)
+                pending.clear()
+
+        def store(idx: Union[int, str], response: str) -> None:
+            if dtype is None:
                 self.df.at[idx, response_column] = response
+            else:
+                pending[idx] = response
+                # Every write copies the column; doubling batches keep that linear
+                if len(pending) >= max(_FLUSH_EVERY, written):
+                    flush()
+            if fingerprints is not None:
+                self._store_fingerprint(response_column, idx, fingerprints[idx])
+
+        def finish() -> None:
+            flush()
+            self._save_fingerprints()
+
+        return _Rows(
+            self._order_rows(row_indices, prompt_column, schedule, priority_column),
+            lambda idx: self.df.at[idx, prompt_column],
+            store,
+            finish,
+        )
+
+    def _empty_responses(self) -> Optional[pd.Series]:
+        """
+        Helper method that returns an empty response column in the configured storage.
+        """
+        dtype = resolve_string_dtype(self.string_storage)
+        if dtype is None:
+            return None
+        return pd.Series(pd.NA, index=self.df.index, dtype=dtype)
+
+    def _prepare_polars_rows(
+        self,
+        prompt_column: str,
+        response_column: str,
+        row_filter: Optional[List[int]],
+        schedule: Optional[str],
+        priority_column: Optional[str],
+    ) -> _Rows:
+        """
+        Helper method that prepares the rows of a Polars frame, addressed by position.
+        Responses are collected in a list and attached as a column by `finish`.
+        """
+        import polars as pl  # pylint: disable=import-outside-toplevel
+
+        lazy = isinstance(self.df, pl.LazyFrame)
+        frame = self.df.collect() if lazy else self.df
+        self.df = frame
+
+        prompts = frame.get_column(prompt_column).to_list()
+        if response_column in frame.columns:
+            responses = frame.get_column(response_column).to_list()
+        else:
+            responses = [None] * frame.height
+        row_indices = list(range(frame.height)) if row_filter is None else row_filter
+
+        def finish() -> None:
+            result = frame.with_columns(
+                pl.Series(response_column, responses, dtype=pl.String, strict=False)
+            )
+            self.df = result.lazy() if lazy else result
+
+        return _Rows(
+            self._order_rows(row_indices, prompt_column, schedule, priority_column),
+            prompts.__getitem__,
+            responses.__setitem__,
+            finish,
+        )
+
+    def _run_async_prompts(
+        self,
+        rows: _Rows,
+        deadline: Optional[float] = None,
+        on_token: Optional[Callable[[Union[int, str], str], None]] = None,
+    ) -> pd.DataFrame:
+        """
+        Helper method that runs LLM calls asynchronously in parallel.
+        """
 
         async def main():
-            tasks = [process_row(idx) for idx in row_indices]
-            await asyncio.gather(*tasks)
+            # Rows are already prepared; let every row be in flight at once
+            async for _ in self._aiter_rows(
+                rows, deadline, max(len(rows.indices), 1), on_token
+            ):
+                pass
 
         asyncio.run(main())
         return self.df
@@ -0,0 +1,360 @@
+"""
+Jobs module to run the LLM on a DataFrame in the background.
+
+`LLMDataFrameIntegrator.submit` starts a run on a background thread, with its own
+event loop, and returns an `LLMJob` right away, so notebooks and services are not
+blocked for the whole run. The job reports its progress, hands out the responses
+finished so far and can be cancelled: no new rows are dispatched and the requests in
+flight are drained, so the responses already paid for are kept. With a checkpoint
+file, finished responses are also saved periodically while the job runs, so a killed
+process loses at most the last interval.
+"""
+
+import asyncio
+import os
+import signal
+import threading
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Union
+
+import pandas as pd
+
+_SIGNALS = ("SIGINT", "SIGTERM")
+
+
+class LLMJob:  # pylint: disable=too-many-instance-attributes
+    """
+    Handle of a background run, returned by `LLMDataFrameIntegrator.submit`.
+
+    Example:
+        job = integrator.submit("prompt", response_column="summary")
+        job.progress()      # {"state": "running", "done": 120, "in_flight": 16, ...}
+        job.results()       # responses finished so far, by row
+        job.cancel()        # stop dispatching and drain the requests in flight
+        df = job.result()   # the DataFrame, once the job has stopped
+
+    Attributes:
+        errors (Dict): Exception of every failed row (timed out or raised), by row.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self,
+        indices: List[Union[int, str]],
+        run_row: Callable[[Union[int, str]], Awaitable[str]],
+        finish: Callable[[], object],
+        max_in_flight: int = 100,
+        checkpoint_path: Optional[str] = None,
+        completed: Optional[Dict[Union[int, str], str]] = None,
+        *,
+        checkpoint_every: Optional[int] = None,
+        checkpoint_interval: Optional[float] = 30.0,
+    ) -> None:
+        """
+        Args:
+            indices (List): Rows to run, in dispatch order.
+            run_row (Callable): Coroutine function running a row and storing its
+                response; returns the response.
+            finish (Callable): Called on the job thread once the job stops (flushes the
+                responses to the DataFrame); its return value is `result()`.
+            max_in_flight (int): Maximum rows in flight at once.
+            checkpoint_path (str, optional): File the responses are pickled to (as a
+                Series indexed by row) when the job stops, and while it runs.
+            completed (Dict, optional): Responses restored from an earlier checkpoint,
+                kept in `results()` and in the new checkpoint.
+            checkpoint_every (int, optional): Also save the checkpoint after this many
+                new responses.
+            checkpoint_interval (float, optional): Also save the checkpoint when a
+                response finishes this many seconds after the last save. Every save
+                writes all responses, so keep saves far apart on large jobs.
+        """
+        self.errors: Dict[Union[int, str], BaseException] = {}
+        self._indices = indices
+        self._run_row = run_row
+        self._finish = finish
+        self._max_in_flight = max_in_flight
+        self._checkpoint_path = checkpoint_path
+        self._checkpoint_every = checkpoint_every
+        self._checkpoint_interval = checkpoint_interval
+        self._checkpoint_lock = threading.Lock()
+        self._unsaved = 0
+        self._saved_at = time.monotonic()
+        self._results: Dict[Union[int, str], str] = dict(completed or {})
+        self._lock = threading.Lock()
+        self._done = 0
+        self._failed = 0
+        self._in_flight = 0
+        self._state = "pending"
+        self._start: Optional[float] = None
+        self._end: Optional[float] = None
+        self._result = None
+        self._error: Optional[BaseException] = None
+        self._cancel = threading.Event()
+        self._finished = threading.Event()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._tasks: set = set()
+        self._previous_handlers: Dict[int, object] = {}
+        self._drain_timeout: Optional[float] = None
+        self._thread = threading.Thread(
+            target=self._thread_main, name="llmworkbook-job", daemon=True
+        )
+
+    def start(self) -> "LLMJob":
+        """
+        Start the background thread.
+
+        Returns:
+            LLMJob: The job itself.
+        """
+        self._start = time.monotonic()
+        self._state = "running"
+        self._thread.start()
+        return self
+
+    async def _process(self, idx: Union[int, str], slots: asyncio.Semaphore) -> None:
+        try:
+            response = await self._run_row(idx)
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            with self._lock:
+                self._failed += 1
+                self.errors[idx] = exc
+        else:
+            with self._lock:
+                self._done += 1
+                self._results[idx] = response
+                self._unsaved += 1
+            if self._checkpoint_due():
+                try:
+                    self._write_checkpoint()
+                except Exception:  # pylint: disable=broad-exception-caught
+                    pass  # Retried later; the save when the job stops reports errors
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+            slots.release()
+
+    async def _main(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        slots = asyncio.Semaphore(self._max_in_flight)
+        for idx in self._indices:
+            await slots.acquire()
+            if self._cancel.is_set():
+                break
+            with self._lock:
+                self._in_flight += 1
+            task = asyncio.ensure_future(self._process(idx, slots))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        # Drain: rows in flight finish and keep their responses
+        while self._tasks:
+            await asyncio.wait(set(self._tasks))
+
+    def _thread_main(self) -> None:
+        try:
+            asyncio.run(self._main())
+        except BaseException as exc:  # pylint: disable=broad-exception-caught
+            self._error = exc
+        finally:
+            try:
+                self._result = self._finish()
+                self._write_checkpoint()
+            except Exception as exc:  # pylint: disable=broad-exception-caught
+                self._error = self._error or exc
+            self._end = time.monotonic()
+            if self._error is not None:
+                self._state = "failed"
+            elif self._cancel.is_set():
+                self._state = "cancelled"
+            else:
+                self._state = "finished"
+            self._finished.set()
+
+    def _checkpoint_due(self) -> bool:
+        if self._checkpoint_path is None:
+            return False
+        with self._lock:
+            unsaved = self._unsaved
+        if self._checkpoint_every is not None and unsaved >= self._checkpoint_every:
+            return True
+        return (
+            self._checkpoint_interval is not None
+            and time.monotonic() - self._saved_at >= self._checkpoint_interval
+        )
+
+    def _write_checkpoint(self) -> None:
+        if self._checkpoint_path is None:
+            return
+        # Saves come from the job thread and, if a drain times out, a signal handler
+        with self._checkpoint_lock:
+            with self._lock:
+                responses = pd.Series(self._results, dtype=object)
+                self._unsaved = 0
+            self._saved_at = time.monotonic()
+            # Written aside and renamed, so a crash never leaves a truncated checkpoint
+            partial = f"{self._checkpoint_path}.partial"
+            responses.to_pickle(partial)
+            os.replace(partial, self._checkpoint_path)
+
+    def _abort(self) -> None:
+        for task in list(self._tasks):
+            task.cancel()
+
+    def cancel(
+        self, drain: bool = True, wait: bool = True, timeout: Optional[float] = None
+    ) -> bool:
+        """
+        Stop dispatching new rows.
+
+        Args:
+            drain (bool): Let the requests in flight finish and keep their responses.
+                If False they are cancelled and their rows keep no response.
+            wait (bool): Block until the job has stopped and its responses are
+                flushed to the DataFrame (and checkpoint).
+            timeout (float, optional): Maximum seconds to wait.
+
+        Returns:
+            bool: Whether the job has stopped.
+        """
+        if not self._finished.is_set():
+            self._cancel.set()
+            if self._state == "running":
+                self._state = "cancelling"
+            if not drain and self._loop is not None:
+                try:
+                    self._loop.call_soon_threadsafe(self._abort)
+                except RuntimeError:  # The loop has just closed
+                    pass
+        return self.wait(timeout) if wait else self.done()
+
+    def done(self) -> bool:
+        """
+        Returns:
+            bool: Whether the job has stopped (finished, cancelled or failed).
+        """
+        return self._finished.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until the job stops.
+
+        Args:
+            timeout (float, optional): Maximum seconds to wait.
+
+        Returns:
+            bool: Whether the job has stopped.
+        """
+        stopped = self._finished.wait(timeout)
+        if stopped:
+            self._restore_signal_handlers()
+        return stopped
+
+    def result(self, timeout: Optional[float] = None):
+        """
+        Wait for the job and return the DataFrame with the responses.
+
+        Args:
+            timeout (float, optional): Maximum seconds to wait.
+
+        Returns:
+            pd.DataFrame: The integrator's DataFrame (or Polars frame).
+
+        Raises:
+            TimeoutError: If the job is still running after `timeout` seconds.
+            Exception: The error that stopped the job, if any.
+        """
+        if not self.wait(timeout):
+            raise TimeoutError("The job is still running.")
+        if self._error is not None:
+            raise self._error
+        return self._result
+
+    def results(self) -> Dict[Union[int, str], str]:
+        """
+        Returns:
+            Dict: The responses finished so far, by row (including rows restored from
+            a checkpoint).
+        """
+        with self._lock:
+            return dict(self._results)
+
+    def progress(self) -> Dict:
+        """
+        A snapshot of the job's progress.
+
+        Returns:
+            Dict: "state" ("running", "cancelling", "cancelled", "finished" or
+            "failed"), "total" rows to run, "done", "failed", "in_flight" and
+            "pending" (not dispatched yet) rows, "elapsed" seconds, "rows_per_second"
+            and "eta" (seconds left at the current rate; None before the first row
+            finishes, 0 once the job has stopped).
+        """
+        with self._lock:
+            done, failed, in_flight = self._done, self._failed, self._in_flight
+        now = self._end if self._end is not None else time.monotonic()
+        elapsed = now - self._start if self._start is not None else 0.0
+        processed = done + failed
+        rate = processed / elapsed if elapsed > 0 else 0.0
+        pending = len(self._indices) - processed - in_flight
+        if self.done():
+            eta = 0.0
+        else:
+            remaining = in_flight + (0 if self._cancel.is_set() else pending)
+            eta = remaining / rate if rate > 0 else None
+        return {
+            "state": self._state,
+            "total": len(self._indices),
+            "done": done,
+            "failed": failed,
+            "in_flight": in_flight,
+            "pending": pending,
+            "elapsed": elapsed,
+            "rows_per_second": rate,
+            "eta": eta,
+        }
+
+    def handle_signals(self, drain_timeout: Optional[float] = 30.0) -> bool:
+        """
+        On SIGINT or SIGTERM, cancel the job, drain it and flush its responses to the
+        DataFrame and checkpoint, then hand the signal to the previous handler (so
+        Ctrl+C still raises `KeyboardInterrupt`). The previous handlers are back while
+        the job drains, so a second Ctrl+C quits without waiting for it. Without a
+        signal, handlers are restored once the job has stopped and `wait` or `result`
+        is called.
+
+        Args:
+            drain_timeout (float, optional): Maximum seconds to wait for the drain, so
+                a stuck request cannot hold the signal back. The checkpoint then gets
+                the responses finished so far.
+
+        Returns:
+            bool: False if the handlers could not be installed (only the main thread
+            can install them).
+        """
+        if threading.current_thread() is not threading.main_thread():
+            return False
+        self._drain_timeout = drain_timeout
+        for name in _SIGNALS:
+            signum = getattr(signal, name, None)
+            if signum is not None:
+                self._previous_handlers[signum] = signal.signal(signum, self._on_signal)
+        return True
+
+    def _on_signal(self, signum: int, frame) -> None:
+        previous = self._previous_handlers.get(signum, signal.SIG_DFL)
+        # Restored before draining, so a second Ctrl+C interrupts a long drain
+        self._restore_signal_handlers()
+        if not self.cancel(timeout=self._drain_timeout):
+            self._write_checkpoint()
+        if callable(previous):
+            previous(signum, frame)
+        elif previous == signal.SIG_DFL:
+            signal.raise_signal(signum)
+
+    def _restore_signal_handlers(self) -> None:
+        if not self._previous_handlers:
+            return
+        if threading.current_thread() is not threading.main_thread():
+            return
+        for signum, handler in self._previous_handlers.items():
+            if handler is not None:  # Installed outside Python; cannot be restored
+                signal.signal(signum, handler)
+        self._previous_handlers.clear()
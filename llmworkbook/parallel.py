@@ -0,0 +1,194 @@
+"""
+Parallel module to wrap very large frames on several processes.
+
+The rows to wrap are written once to an Arrow IPC file that every worker opens
+memory-mapped, so no DataFrame is pickled to the workers: each one reads its row
+chunk straight from the mapped file, wraps it and hands back the wrapped column as an
+Arrow buffer (or writes it to a CSV chunk file). Chunks are reassembled in row order.
+
+Needs the optional `pyarrow` package.
+"""
+
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, List, Optional, Tuple
+
+from pandas import DataFrame, Series
+from pandas.api.types import is_object_dtype
+
+# Chunks per worker, so that uneven chunks still keep every worker busy
+_CHUNKS_PER_JOB = 4
+
+
+def _pyarrow():
+    # pylint: disable=import-outside-toplevel
+    try:
+        import pyarrow as pa
+        import pyarrow.ipc  # noqa: F401  pylint: disable=unused-import
+    except ImportError as error:
+        raise ImportError(
+            "Parallel wrapping (n_jobs > 1) needs the pyarrow package: "
+            "pip install pyarrow"
+        ) from error
+    return pa
+
+
+def resolve_n_jobs(n_jobs: Optional[int]) -> int:
+    """
+    Map `n_jobs` to a number of processes: None or 1 is serial, -1 is all cores.
+
+    Raises:
+        ValueError: If `n_jobs` is 0 or below -1.
+    """
+    if n_jobs is None:
+        return 1
+    if n_jobs == -1:
+        return os.cpu_count() or 1
+    if n_jobs < 1:
+        raise ValueError("n_jobs must be a positive number of processes or -1.")
+    return n_jobs
+
+
+def _transferable(values: Series, wrap_format: str) -> Series:
+    """
+    Return a column that round-trips through Arrow to the same wrapped text.
+    """
+    if not is_object_dtype(values) or not values.isna().any():
+        return values
+    # Object columns with missing values (None vs NaN) or mixed types: their text,
+    # formatted per value as astype(str) may keep missing values missing
+    text = values.map(lambda value: f"{value}").astype(object)
+    if wrap_format == "json":
+        # JSON writes `null` for missing values, so keep them missing
+        text = text.where(values.notna(), None)
+    return text
+
+
+def _to_table(data_df: DataFrame, prompt_series: Series, wrap_format: str):
+    """
+    Build the Arrow table of the data and prompt columns, named by position.
+    """
+    pa = _pyarrow()
+    columns = [data_df.iloc[:, i] for i in range(data_df.shape[1])] + [prompt_series]
+    names = [f"c{position}" for position in range(len(columns) - 1)] + ["prompt"]
+    frame = DataFrame(
+        {
+            name: _transferable(values, wrap_format).reset_index(drop=True)
+            for name, values in zip(names, columns)
+        }
+    )
+    try:
+        return pa.Table.from_pandas(frame, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # Mixed object columns without missing values: their text
+        for column in frame.columns:
+            if is_object_dtype(frame[column]):
+                frame[column] = frame[column].map(
+                    lambda value: f"{value}", na_action="ignore"
+                )
+        return pa.Table.from_pandas(frame, preserve_index=False)
+
+
+def _wrap_chunk(task: Tuple) -> Optional[bytes]:  # pylint: disable=too-many-locals
+    """
+    Worker: wrap the rows `start:stop` of the mapped table.
+
+    Returns:
+        bytes, optional: The wrapped column as an Arrow IPC stream, or None when it
+        was written to `csv_path`.
+    """
+    table_path, start, stop, names, wrap, csv_path, header = task
+    pa = _pyarrow()
+    with pa.memory_map(table_path) as source:
+        table = pa.ipc.open_file(source).read_all().slice(start, stop - start)
+        frame = table.to_pandas()
+    data_df = frame.iloc[:, :-1]
+    data_df.columns = names
+    wrapped = wrap(data_df, frame["prompt"])
+
+    if csv_path is not None:
+        wrapped.to_csv(csv_path, index=False, header=header)
+        return None
+    column = pa.array(wrapped["wrapped_output"], type=pa.large_string())
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, pa.schema([("wrapped_output", column.type)])) as out:
+        out.write_batch(pa.record_batch([column], names=["wrapped_output"]))
+    return sink.getvalue().to_pybytes()
+
+
+def _chunks(rows: int, n_jobs: int) -> List[Tuple[int, int]]:
+    size = max(-(-rows // (n_jobs * _CHUNKS_PER_JOB)), 1)
+    return [(start, min(start + size, rows)) for start in range(0, rows, size)]
+
+
+def parallel_wrap(  # pylint: disable=too-many-arguments,too-many-locals
+    data_df: DataFrame,
+    prompt_series: Series,
+    wrap: Callable[[DataFrame, Series], DataFrame],
+    n_jobs: int,
+    *,
+    wrap_format: str = "xml",
+    csv_path: Optional[str] = None,
+) -> Optional[Series]:
+    """
+    Wrap the rows on `n_jobs` processes.
+
+    Args:
+        data_df (DataFrame): Data columns, already in wrapping order.
+        prompt_series (Series): The prompts.
+        wrap (Callable): Picklable function wrapping a chunk of rows in the workers,
+            as `wrap(data_df, prompt_series)`.
+        n_jobs (int): Number of processes.
+        wrap_format (str): Format `wrap` writes, see `wrappers.WRAP_FORMATS`.
+        csv_path (str, optional): Write the wrapped column as CSV to this path,
+            concatenating the workers' chunk files, instead of returning it.
+
+    Returns:
+        Series, optional: The wrapped output, indexed like `data_df`, or None when
+        written to `csv_path`.
+    """
+    pa = _pyarrow()
+    names = [str(name) for name in data_df.columns]
+    chunks = _chunks(len(prompt_series), n_jobs)
+    if not chunks and csv_path is not None:
+        # No worker writes the header for an empty frame
+        DataFrame(columns=["wrapped_output"]).to_csv(csv_path, index=False)
+        return None
+    with tempfile.TemporaryDirectory(prefix="llmworkbook-") as tmp:
+        table_path = os.path.join(tmp, "rows.arrow")
+        table = _to_table(data_df, prompt_series, wrap_format)
+        with pa.OSFile(table_path, "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        del table
+
+        part_paths = [
+            None if csv_path is None else os.path.join(tmp, f"part-{position}.csv")
+            for position in range(len(chunks))
+        ]
+        tasks = [
+            (table_path, start, stop, names, wrap, part, position == 0)
+            for position, ((start, stop), part) in enumerate(zip(chunks, part_paths))
+        ]
+        with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+            results = list(pool.map(_wrap_chunk, tasks))
+
+        if csv_path is not None:
+            with open(csv_path, "wb") as output:
+                for part in part_paths:
+                    with open(part, "rb") as chunk:
+                        shutil.copyfileobj(chunk, output)
+            return None
+
+    columns = [pa.ipc.open_stream(result).read_all().column(0) for result in results]
+    if not columns:
+        return Series([], index=data_df.index, dtype=object, name="wrapped_output")
+    wrapped = pa.chunked_array([chunk for column in columns for chunk in column.chunks])
+    return Series(
+        wrapped.to_numpy(zero_copy_only=False),
+        index=data_df.index,
+        dtype=object,
+        name="wrapped_output",
+    )
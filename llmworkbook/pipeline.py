@@ -0,0 +1,124 @@
+"""
+Pipeline module to declare several prompt stages over a DataFrame as a DAG of columns.
+
+Every stage writes the responses to its `output_column` and builds its prompt from
+a template with `{column}` placeholders. A placeholder naming the output column of
+another stage makes the stage depend on it, so a row's stage can run as soon as the
+cells it reads are done (see `LLMDataFrameIntegrator.add_pipeline_responses`).
+
+Example:
+    stages = [
+        PipelineStage("category", "Classify this review: {review}"),
+        PipelineStage("entities", "List the entities of this {category} review: {review}"),
+        PipelineStage("summary", "Summarize {review}, mentioning {entities}"),
+    ]
+"""
+
+from string import Formatter
+from typing import Dict, Iterable, List, Optional
+
+
+class PipelineStage:  # pylint: disable=too-few-public-methods
+    """
+    A prompt stage of a pipeline.
+
+    Attributes:
+        output_column (str): Column the responses are stored in.
+        template (str): Prompt template with `{column}` placeholders.
+        columns (List[str]): Columns the template reads, in order of appearance.
+        depends_on (List[str]): Extra output columns of other stages to wait for.
+    """
+
+    def __init__(
+        self,
+        output_column: str,
+        template: str,
+        depends_on: Optional[List[str]] = None,
+    ) -> None:
+        """
+        Args:
+            output_column (str): Column the responses are stored in.
+            template (str): Prompt template; `{column}` is replaced by the row's value
+                of `column` (use `{{` and `}}` for literal braces).
+            depends_on (List[str], optional): Output columns of other stages to wait
+                for even though the template does not read them.
+
+        Raises:
+            ValueError: If the template has no placeholder or reads its own output.
+        """
+        columns = []
+        for _, field, _, _ in Formatter().parse(template):
+            if field is not None and field not in columns:
+                columns.append(field)
+        if not columns:
+            raise ValueError(
+                f"The template of stage '{output_column}' reads no column."
+            )
+        if output_column in columns:
+            raise ValueError(f"Stage '{output_column}' cannot read its own output.")
+        self.output_column = output_column
+        self.template = template
+        self.columns = columns
+        self.depends_on = list(depends_on or [])
+
+    def render(self, values: Dict[str, object]) -> str:
+        """
+        Returns:
+            str: The prompt for a row's values of `columns`.
+        """
+        return self.template.format_map(values)
+
+
+def order_stages(
+    stages: Iterable[PipelineStage], columns: Iterable[str]
+) -> Dict[str, List[str]]:
+    """
+    Validate the pipeline and find the upstream stages of every stage.
+
+    Args:
+        stages (Iterable[PipelineStage]): The stages.
+        columns (Iterable[str]): Columns of the DataFrame.
+
+    Returns:
+        Dict[str, List[str]]: Output column of every stage, in topological order,
+        mapped to the output columns of the stages it waits for.
+
+    Raises:
+        ValueError: If two stages share an output column, a stage reads a column that
+            neither the DataFrame nor a stage provides, or the stages form a cycle.
+    """
+    by_output: Dict[str, PipelineStage] = {}
+    for stage in stages:
+        if stage.output_column in by_output:
+            raise ValueError(f"Two stages write column '{stage.output_column}'.")
+        by_output[stage.output_column] = stage
+
+    columns = set(columns)
+    upstream = {}
+    for output, stage in by_output.items():
+        for column in [*stage.columns, *stage.depends_on]:
+            if column not in by_output and column not in columns:
+                raise ValueError(f"Stage '{output}' reads unknown column '{column}'.")
+        upstream[output] = [
+            column
+            for column in dict.fromkeys([*stage.columns, *stage.depends_on])
+            if column in by_output
+        ]
+
+    ordered: Dict[str, List[str]] = {}
+    visiting = set()
+
+    def visit(output: str) -> None:
+        if output in ordered:
+            return
+        if output in visiting:
+            raise ValueError(f"Stages form a cycle through column '{output}'.")
+        visiting.add(output)
+        for column in upstream[output]:
+            visit(column)
+        visiting.discard(output)
+        ordered[output] = upstream[output]
+
+    for output in by_output:
+        visit(output)
+    return ordered
@@ -0,0 +1,190 @@
+"""
+Planner module to estimate the tokens, cost and wall time of a run before launching it.
+
+Nothing is sent to the LLM provider. Input tokens are estimated for all rows at once,
+either with a vectorized character heuristic (about 4 characters per token for
+English text) or exactly with the optional `tiktoken` package.
+"""
+
+from itertools import islice
+from typing import Dict, Iterable, Iterator, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from .config import LLMConfig
+from .endpoints import EndpointPool
+
+# List prices in USD per 1M (input, output) tokens; pass `prices` for other models
+MODEL_PRICES = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4-turbo": (10.00, 30.00),
+    "gpt-3.5-turbo": (0.50, 1.50),
+}
+
+# Tokens added by the chat format around every message
+MESSAGE_OVERHEAD_TOKENS = 4
+
+CHARS_PER_TOKEN = 4.0
+
+
+def estimate_tokens(
+    texts: Union[pd.Series, Iterable[str]],
+    backend: str = "chars",
+    model_name: Optional[str] = None,
+) -> np.ndarray:
+    """
+    Estimate the number of tokens of every text.
+
+    Args:
+        texts (Series or Iterable[str]): The texts, e.g. the "wrapped_output" column.
+        backend (str): "chars" (default) divides the character count by 4, without
+            any Python loop over the rows; "tiktoken" counts tokens exactly with the
+            model's tokenizer and needs the `tiktoken` package.
+        model_name (str, optional): Model whose tokenizer "tiktoken" uses.
+
+    Returns:
+        np.ndarray: Token counts as int64, one per text.
+
+    Raises:
+        ValueError: If the backend is unknown.
+        ImportError: If the "tiktoken" backend is chosen but not installed.
+    """
+    texts = texts if isinstance(texts, pd.Series) else pd.Series(list(texts))
+    texts = texts.fillna("").astype(str)
+    if backend == "chars":
+        lengths = texts.str.len().to_numpy(dtype=np.float64)
+        return np.ceil(lengths / CHARS_PER_TOKEN).astype(np.int64)
+    if backend == "tiktoken":
+        try:
+            import tiktoken  # pylint: disable=import-outside-toplevel
+        except ImportError as error:
+            raise ImportError(
+                "The 'tiktoken' backend needs the tiktoken package: pip install tiktoken"
+            ) from error
+        try:
+            encoding = tiktoken.encoding_for_model(model_name or "gpt-4o-mini")
+        except KeyError:
+            encoding = tiktoken.get_encoding("cl100k_base")
+        tokens = encoding.encode_ordinary_batch(texts.tolist())
+        return np.fromiter(map(len, tokens), dtype=np.int64, count=len(tokens))
+    raise ValueError(f"Unknown token backend '{backend}'. Use 'chars' or 'tiktoken'.")
+
+
+def _chunks(
+    prompts: Union[pd.DataFrame, pd.Series, Iterable[str]],
+    column: str,
+    chunk_size: int,
+) -> Iterator[pd.Series]:
+    """
+    Helper that yields the prompts as Series of at most `chunk_size` rows, so lazy
+    iterators are never materialized at once.
+    """
+    if isinstance(prompts, pd.DataFrame):
+        yield prompts[column]
+    elif isinstance(prompts, pd.Series):
+        yield prompts
+    else:
+        iterator = iter(prompts)
+        while chunk := list(islice(iterator, chunk_size)):
+            yield pd.Series(chunk, dtype=object)
+
+
+def plan_run(  # pylint: disable=too-many-arguments,too-many-locals
+    prompts: Union[pd.DataFrame, pd.Series, Iterable[str]],
+    config: Optional[LLMConfig] = None,
+    column: str = "wrapped_output",
+    *,
+    rpm: Optional[float] = None,
+    tpm: Optional[float] = None,
+    endpoint_pool: Optional[EndpointPool] = None,
+    concurrency: Optional[int] = None,
+    latency: Optional[float] = None,
+    prices: Optional[tuple] = None,
+    token_backend: str = "chars",
+    chunk_size: int = 100_000,
+) -> Dict:
+    """
+    Dry-run a job: estimate its tokens, cost and wall time without calling the API.
+
+    Output tokens are counted at the configured `max_tokens` per row, so cost and
+    TPM-bound time are upper bounds. The wall time is the largest of the RPM, TPM and
+    concurrency bounds, and the plan names the one that dominates.
+
+    Example:
+        wrapped = WrapDataFrame(df, prompt_column="prompt", data_columns=["text"]).wrap()
+        print(plan_run(wrapped, config, rpm=500, tpm=200_000))
+
+    Args:
+        prompts (DataFrame, Series or Iterable[str]): The output of
+            `BaseLLMWrapper.wrap()`, a Series of prompts, or any (lazy) iterable of them.
+        config (LLMConfig, optional): Supplies the model, system prompt and `max_tokens`.
+        column (str): Prompt column when `prompts` is a DataFrame.
+        rpm (float, optional): Requests-per-minute quota.
+        tpm (float, optional): Tokens-per-minute quota.
+        endpoint_pool (EndpointPool, optional): Adds up the RPM/TPM budgets of its
+            endpoints when `rpm` / `tpm` are not given.
+        concurrency (int, optional): Concurrent requests, used with `latency`.
+        latency (float, optional): Expected seconds per request.
+        prices (tuple, optional): USD per 1M (input, output) tokens. Defaults to
+            `MODEL_PRICES` for the configured model, if listed.
+        token_backend (str): "chars" or "tiktoken", see `estimate_tokens`.
+        chunk_size (int): Rows estimated at once when `prompts` is an iterator.
+
+    Returns:
+        Dict: "rows", "input_tokens", "output_tokens", "total_tokens",
+        "max_input_tokens", "cost" (USD, None without prices), "wall_time" (seconds,
+        None without any quota or concurrency) and "bottleneck".
+    """
+    config = config or LLMConfig()
+    model_name = config.options.get("model_name") or "gpt-4o-mini"
+    max_tokens = int(config.options.get("max_tokens") or 0)
+    system_tokens = 0
+    if config.system_prompt:
+        system_tokens = MESSAGE_OVERHEAD_TOKENS + int(
+            estimate_tokens([config.system_prompt], token_backend, model_name)[0]
+        )
+
+    rows = input_tokens = max_input_tokens = 0
+    for chunk in _chunks(prompts, column, chunk_size):
+        tokens = estimate_tokens(chunk, token_backend, model_name)
+        if not len(tokens):  # pylint: disable=use-implicit-booleaness-not-len
+            continue
+        tokens += system_tokens + MESSAGE_OVERHEAD_TOKENS
+        rows += len(tokens)
+        input_tokens += int(tokens.sum())
+        max_input_tokens = max(max_input_tokens, int(tokens.max()))
+    output_tokens = rows * max_tokens
+    total_tokens = input_tokens + output_tokens
+
+    prices = prices or MODEL_PRICES.get(model_name)
+    cost = None
+    if prices is not None:
+        cost = (input_tokens * prices[0] + output_tokens * prices[1]) / 1_000_000
+
+    if endpoint_pool is not None:
+        endpoints = endpoint_pool.endpoints
+        if rpm is None and all(endpoint.rpm for endpoint in endpoints):
+            rpm = sum(endpoint.rpm for endpoint in endpoints)
+        if tpm is None and all(endpoint.tpm for endpoint in endpoints):
+            tpm = sum(endpoint.tpm for endpoint in endpoints)
+    bounds = {}
+    if rpm:
+        bounds["rpm"] = 60.0 * rows / rpm
+    if tpm:
+        bounds["tpm"] = 60.0 * total_tokens / tpm
+    if concurrency and latency:
+        bounds["concurrency"] = rows * latency / concurrency
+    bottleneck = max(bounds, key=bounds.get) if bounds else None
+
+    return {
+        "rows": rows,
+        "input_tokens": input_tokens,
+        "output_tokens": output_tokens,
+        "total_tokens": total_tokens,
+        "max_input_tokens": max_input_tokens,
+        "cost": cost,
+        "wall_time": bounds[bottleneck] if bottleneck else None,
+        "bottleneck": bottleneck,
+    }
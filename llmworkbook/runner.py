@@ -2,58 +2,344 @@
 Runner module to handle the actual LLM call.
 """
 
+import asyncio
+import base64
+import contextvars
 import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple
 
+import numpy as np
+import openai
 from openai import OpenAI
 
+from .cascade import ModelCascade
+from .cassette import Cassette, cassette_key
+from .concurrency import ConcurrencyLimiter, HedgingPolicy
 from .config import LLMConfig
+from .endpoints import Endpoint, EndpointPool
 from .utils import sync_to_async
 
+# Errors worth retrying on another endpoint of the pool
+TRANSIENT_ERRORS = (
+    openai.APIConnectionError,
+    openai.RateLimitError,
+    openai.InternalServerError,
+)
 
-class LLMRunner:
+# Errors that signal an overloaded provider to the concurrency limiter
+OVERLOAD_ERRORS = (openai.RateLimitError, openai.APITimeoutError, asyncio.TimeoutError)
+
+# Marks the end of a streamed response
+_STREAM_END = object()
+
+# Model and logprobs request of the current cascade tier call, and the token
+# logprobs of its response
+_TIER_CALL: contextvars.ContextVar[Optional[Dict]] = contextvars.ContextVar(
+    "tier_call", default=None
+)
+
+# `response_format` of the current call, see `LLMRunner.run`
+_RESPONSE_FORMAT: contextvars.ContextVar[Optional[Dict]] = contextvars.ContextVar(
+    "response_format", default=None
+)
+
+
+class LLMRunner:  # pylint: disable=too-many-instance-attributes
     """
     LLMRunner handles calling the LLM provider using the configuration.
     """
 
-    def __init__(self, config: LLMConfig) -> None:
+    def __init__(
+        self,
+        config: LLMConfig,
+        endpoint_pool: Optional[EndpointPool] = None,
+        limiter: Optional[ConcurrencyLimiter] = None,
+        hedging: Optional[HedgingPolicy] = None,
+        cascade: Optional[ModelCascade] = None,
+    ) -> None:
         """
         Args:
             config (LLMConfig): The configuration object for the LLM.
+            endpoint_pool (EndpointPool, optional): Endpoints / API keys to balance the
+                "openai" and "openai_compatible" providers over. Endpoint settings
+                override the `api_key`, `base_url` and `headers` of the config.
+            limiter (ConcurrencyLimiter, optional): Bounds the number of concurrent
+                calls. An `AdaptiveConcurrencyLimiter` adjusts the bound from latency
+                and 429 / timeout feedback. None means unbounded.
+            hedging (HedgingPolicy, optional): Sends a duplicate request when a call
+                runs longer than the observed tail latency and keeps the first answer.
+            cascade (ModelCascade, optional): Sends every prompt to the cheapest model
+                of the cascade first and re-runs it on the next model while the
+                response fails the cascade's acceptance check. Its models replace
+                the `model_name` option.
         """
         self.config = config
+        self.endpoint_pool = endpoint_pool
+        self.limiter = limiter
+        self.hedging = hedging
+        self.cascade = cascade
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._cassette: Optional[Cassette] = None
+        self._clients: Dict[Tuple, OpenAI] = {}
+        self._usage_lock = threading.Lock()
+        self._usage = dict.fromkeys(
+            ("requests", "prompt_tokens", "completion_tokens", "cached_tokens"), 0
+        )
+        self._embedding_cache: OrderedDict = OrderedDict()
+        self._embedding_cache_lock = threading.Lock()
 
-    async def _call_llm_openai(self, prompt: str) -> str:
+    def _get_client(
+        self,
+        api_key: str,
+        base_url: Optional[str] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> OpenAI:
         """
-        Calls OpenAI's completion/chat endpoint asynchronously.
-
-        Args:
-            prompt (str): The user prompt to send to the LLM.
+        Returns a pooled OpenAI client for the given endpoint.
 
-        Returns:
-            str: The LLM response text.
+        Clients (and their HTTP connection pools) are created once per endpoint and
+        reused by every call of this runner.
         """
+        key = (api_key, base_url, tuple(sorted((headers or {}).items())))
+        client = self._clients.get(key)
+        if client is None:
+            kwargs = {}
+            if self.config.options.get("request_timeout"):
+                kwargs["timeout"] = self.config.options["request_timeout"]
+            client = OpenAI(
+                api_key=api_key,
+                base_url=base_url,
+                default_headers=headers or None,
+                max_retries=self.config.options.get("max_retries", 2),
+                **kwargs,
+            )
+            self._clients[key] = client
+        return client
 
+    def _messages(self, prompt: str) -> List[Dict[str, str]]:
+        """
+        Builds the chat messages for a prompt.
+        """
         messages = []
         if self.config.system_prompt:
             messages.append({"role": "system", "content": self.config.system_prompt})
         messages.append({"role": "user", "content": prompt})
+        return messages
+
+    def _model_name(self) -> str:
+        """
+        Returns the model of the current call: the cascade tier's, or `model_name`.
+        """
+        tier_call = _TIER_CALL.get()
+        if tier_call is not None:
+            return tier_call["model"]
+        return self.config.options["model_name"] or "gpt-4o-mini"
 
-        client = OpenAI(api_key=self.config.api_key or os.environ["OPENAI_API_KEY"])
+    async def _create_completion(self, client: OpenAI, prompt: str):
+        """
+        Sends a chat completion request and returns the completion object.
 
-        completion = client.chat.completions.create(
-            model=self.config.options["model_name"] or "gpt-4o-mini",
-            messages=messages,
+        The blocking client call runs in a worker thread, so concurrent calls from
+        the async integrator overlap.
+        """
+        kwargs = self._request_options()
+        tier_call = _TIER_CALL.get()
+        if tier_call is not None and tier_call["logprobs"]:
+            kwargs["logprobs"] = True
+        completion = await self._to_thread(
+            client.chat.completions.create,
+            model=self._model_name(),
+            messages=self._messages(prompt),
             temperature=self.config.options["temperature"],
+            **kwargs,
         )
+        if "logprobs" in kwargs:
+            tier_call["token_logprobs"] = self._token_logprobs(completion)
+        return completion
+
+    @staticmethod
+    def _request_options() -> Dict:
+        """
+        Returns the optional request parameters of the current call.
+        """
+        response_format = _RESPONSE_FORMAT.get()
+        if response_format is None:
+            return {}
+        return {"response_format": response_format}
+
+    @staticmethod
+    def _token_logprobs(completion) -> Optional[List[float]]:
+        """
+        Extracts the token log-probabilities of a completion, if it has any.
+        """
+        try:
+            content = completion.choices[0].logprobs.content
+            return [float(token.logprob) for token in content]
+        except (AttributeError, IndexError, TypeError, ValueError):
+            return None
+
+    async def _stream_chat(self, client: OpenAI, prompt: str) -> AsyncIterator[str]:
+        """
+        Sends a streaming chat completion request and yields the text deltas.
+
+        The blocking SDK stream is read in a worker thread that hands every delta to
+        the event loop, so the per-chunk overhead is a single thread-safe callback.
+        """
+        loop = asyncio.get_running_loop()
+        deltas: asyncio.Queue = asyncio.Queue()
+        stop = threading.Event()
+        model = self._model_name()
+        kwargs = self._request_options()
+
+        def put(item) -> None:
+            try:
+                loop.call_soon_threadsafe(deltas.put_nowait, item)
+            except RuntimeError:  # The event loop is already closed
+                stop.set()
+
+        def pump() -> None:
+            try:
+                chunks = client.chat.completions.create(
+                    model=model,
+                    messages=self._messages(prompt),
+                    temperature=self.config.options["temperature"],
+                    stream=True,
+                    **kwargs,
+                )
+                for chunk in chunks:
+                    if stop.is_set():
+                        chunks.close()
+                        break
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        put(chunk.choices[0].delta.content)
+            except Exception as error:  # pylint: disable=broad-exception-caught
+                put(error)
+            put(_STREAM_END)
+
+        self._get_executor().submit(pump)
+        try:
+            while True:
+                item = await deltas.get()
+                if item is _STREAM_END:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            stop.set()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """
+        Returns the runner's own thread pool, sized to the limiter's maximum.
+        """
+        if self._executor is None:
+            max_workers = self.limiter.max_limit if self.limiter else 32
+            self._executor = ThreadPoolExecutor(
+                max_workers=max_workers, thread_name_prefix="llmworkbook"
+            )
+        return self._executor
+
+    async def _to_thread(self, func, **kwargs):
+        """
+        Runs a blocking call in a worker thread.
+
+        With a limiter, the runner uses its own thread pool sized to the limiter's
+        maximum, so the default executor (at most 32 threads) does not cap concurrency.
+        """
+        if self.limiter is None:
+            return await asyncio.to_thread(func, **kwargs)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_executor(), partial(func, **kwargs))
 
+    @staticmethod
+    def _completion_text(completion) -> str:
+        """
+        Extracts the response text from a completion object.
+        """
         try:
             return completion.choices[0].message.content
         except (KeyError, IndexError):
             return str(completion)
 
-    async def run(self, prompt: str) -> str:
+    async def _chat_completion(self, client: OpenAI, prompt: str) -> str:
         """
-        Entry point for calling any LLM provider.
+        Sends a chat completion request and returns the response text.
+        """
+        completion = await self._create_completion(client, prompt)
+        self._record_usage(completion)
+        return self._completion_text(completion)
+
+    def _record_usage(self, completion) -> None:
+        """
+        Adds the token usage of a completion, including cached prompt tokens, to the
+        runner's statistics.
+        """
+        usage = getattr(completion, "usage", None)
+        if usage is None:
+            return
+        details = getattr(usage, "prompt_tokens_details", None)
+        counts = {
+            "prompt_tokens": getattr(usage, "prompt_tokens", None),
+            "completion_tokens": getattr(usage, "completion_tokens", None),
+            "cached_tokens": getattr(details, "cached_tokens", None),
+        }
+        with self._usage_lock:
+            self._usage["requests"] += 1
+            for key, value in counts.items():
+                if isinstance(value, int):
+                    self._usage[key] += value
+
+    def _endpoint_client(self, endpoint: Endpoint) -> OpenAI:
+        """
+        Returns the pooled client of an endpoint of the endpoint pool.
+        """
+        return self._get_client(
+            api_key=endpoint.api_key
+            or self.config.api_key
+            or os.environ.get("OPENAI_API_KEY")
+            or "not-needed",
+            base_url=endpoint.base_url or self.config.base_url,
+            headers={**self.config.headers, **endpoint.headers},
+        )
+
+    def _provider_client(self, provider: str) -> OpenAI:
+        """
+        Returns the pooled client of the "openai" or "openai_compatible" provider.
+
+        Raises:
+            ValueError: If the openai_compatible provider has no `base_url`.
+        """
+        if provider == "openai":
+            return self._get_client(
+                api_key=self.config.api_key or os.environ["OPENAI_API_KEY"],
+                base_url=self.config.base_url,
+                headers=self.config.headers,
+            )
+        if not self.config.base_url:
+            raise ValueError(
+                "The openai_compatible provider needs a 'base_url' in the config."
+            )
+        # Self-hosted servers often run without authentication
+        return self._get_client(
+            api_key=self.config.api_key
+            or os.environ.get("OPENAI_API_KEY")
+            or "not-needed",
+            base_url=self.config.base_url,
+            headers=self.config.headers,
+        )
+
+    async def _call_llm_pool(self, prompt: str) -> str:
+        """
+        Calls the best available endpoint of the endpoint pool.
+
+        Transient errors (connection errors, 429s, 5xx) are retried once on each of
+        the other endpoints before being raised. Only they count against an
+        endpoint; other errors (e.g. a 400 for a bad prompt) are the caller's.
 
         Args:
             prompt (str): The user prompt to send to the LLM.
@@ -61,21 +347,567 @@ class LLMRunner:
         Returns:
             str: The LLM response text.
         """
-        provider = self.config.provider.lower()
+        pool = self.endpoint_pool
+        tokens = (len(prompt) + len(self.config.system_prompt or "")) // 4
+        failed = set()
+        for attempt in range(len(pool)):
+            endpoint, entry = await pool.acquire(tokens, exclude=failed)
+            client = self._endpoint_client(endpoint)
+            start, error, completion = time.monotonic(), None, None
+            try:
+                completion = await self._create_completion(client, prompt)
+            except TRANSIENT_ERRORS as exc:
+                error = exc
+                failed.add(endpoint.name)
+                if attempt == len(pool) - 1:
+                    raise
+                continue
+            finally:
+                # Also on cancellation (timeouts, losing hedges), so no slot leaks
+                usage = getattr(completion, "usage", None)
+                pool.release(
+                    endpoint,
+                    entry,
+                    time.monotonic() - start,
+                    tokens=getattr(usage, "total_tokens", None),
+                    error=error,
+                )
+            self._record_usage(completion)
+            return self._completion_text(completion)
+        raise RuntimeError("Endpoint pool is empty.")
+
+    async def _call_llm_openai(self, prompt: str) -> str:
+        """
+        Calls OpenAI's completion/chat endpoint asynchronously.
+
+        Args:
+            prompt (str): The user prompt to send to the LLM.
+
+        Returns:
+            str: The LLM response text.
+        """
+        if self.endpoint_pool is not None:
+            return await self._call_llm_pool(prompt)
+        return await self._chat_completion(self._provider_client("openai"), prompt)
+
+    async def _call_llm_openai_compatible(self, prompt: str) -> str:
+        """
+        Calls the chat endpoint of a self-hosted OpenAI-compatible server
+        (vLLM, llama.cpp, TGI, ...) at `config.base_url`.
+
+        Args:
+            prompt (str): The user prompt to send to the LLM.
+
+        Returns:
+            str: The LLM response text.
+
+        Raises:
+            ValueError: If no `base_url` is configured.
+        """
+        if self.endpoint_pool is not None:
+            return await self._call_llm_pool(prompt)
+        return await self._chat_completion(
+            self._provider_client("openai_compatible"), prompt
+        )
+
+    def _get_cassette(self) -> Cassette:
+        """
+        Returns the cassette named by the `cassette_path` option, opening it once.
+        """
+        if self._cassette is None:
+            cassette_path = self.config.options.get("cassette_path")
+            if not cassette_path:
+                raise ValueError(
+                    "The replay provider needs a 'cassette_path' in the config options."
+                )
+            self._cassette = Cassette(cassette_path)
+        return self._cassette
+
+    async def _call_llm_replay(self, prompt: str) -> str:
+        """
+        Serves a response from a recorded cassette, or records one.
+
+        In "record" mode the prompt is sent to `record_provider` and the response
+        and its latency are appended to the cassette. In "replay" mode the response
+        is read back from the cassette, optionally waiting for the recorded latency
+        ("recorded") or for one drawn from all recorded latencies ("sampled").
+
+        Args:
+            prompt (str): The user prompt to send to the LLM.
+
+        Returns:
+            str: The LLM response text.
+        """
+        options = self.config.options
+        cassette = self._get_cassette()
+        tier_call = _TIER_CALL.get()
+        if tier_call is not None:
+            options = {**options, "model_name": tier_call["model"]}
+        key = cassette_key(prompt, self.config.system_prompt, options)
+
+        if options.get("replay_mode", "replay") == "record":
+            record_provider = options.get("record_provider", "openai").lower()
+            if record_provider == "replay":
+                raise ValueError("'record_provider' cannot be 'replay'.")
+            start = time.perf_counter()
+            response = await self._dispatch(record_provider, prompt)
+            cassette.record(key, response, time.perf_counter() - start)
+            return response
+
+        response, latency = cassette.lookup(key)
+        replay_latency = options.get("replay_latency")
+        if replay_latency == "sampled":
+            latency = cassette.sample_latency()
+        if replay_latency in ("recorded", "sampled") and latency > 0:
+            await asyncio.sleep(latency)
+        return response
+
+    async def _stream_provider(self, provider: str, prompt: str) -> AsyncIterator[str]:
+        """
+        Streams the response deltas of the given provider.
+
+        The replay provider yields its recorded response as a single delta.
+
+        Raises:
+            NotImplementedError: If the provider is unknown.
+        """
+        if provider == "replay":
+            yield await self._call_llm_replay(prompt)
+            return
+        if provider not in ("openai", "openai_compatible"):
+            raise NotImplementedError(f"Provider {provider} is not supported yet.")
+        if self.endpoint_pool is None:
+            async for delta in self._stream_chat(
+                self._provider_client(provider), prompt
+            ):
+                yield delta
+            return
+
+        pool = self.endpoint_pool
+        tokens = (len(prompt) + len(self.config.system_prompt or "")) // 4
+        endpoint, entry = await pool.acquire(tokens)
+        start, error = time.monotonic(), None
+        try:
+            async for delta in self._stream_chat(
+                self._endpoint_client(endpoint), prompt
+            ):
+                yield delta
+        except TRANSIENT_ERRORS as exc:
+            error = exc
+            raise
+        finally:
+            pool.release(endpoint, entry, time.monotonic() - start, error=error)
+
+    async def _collect_stream(
+        self, provider: str, prompt: str, on_token: Callable[[str], None]
+    ) -> str:
+        """
+        Streams a response, calling `on_token` per delta, and returns the full text.
+        """
+        deltas = []
+        async for delta in self._stream_provider(provider, prompt):
+            on_token(delta)
+            deltas.append(delta)
+        return "".join(deltas)
+
+    async def _dispatch(self, provider: str, prompt: str) -> str:
+        """
+        Calls the given provider.
 
+        Raises:
+            NotImplementedError: If the provider is unknown.
+        """
         if provider == "openai":
             return await self._call_llm_openai(prompt)
+        if provider == "openai_compatible":
+            return await self._call_llm_openai_compatible(prompt)
+        if provider == "replay":
+            return await self._call_llm_replay(prompt)
         raise NotImplementedError(f"Provider {provider} is not supported yet.")
 
+    async def _run_once(
+        self,
+        provider: str,
+        prompt: str,
+        on_token: Optional[Callable[[str], None]] = None,
+        dispatched: Optional[asyncio.Future] = None,
+    ) -> str:
+        """
+        Calls the provider once, within a limiter slot and the request timeout.
+        `dispatched`, if given, is resolved with the dispatch time once a limiter
+        slot is held.
+        """
+        request_timeout = self.config.options.get("request_timeout")
+
+        def call():
+            if dispatched is not None and not dispatched.done():
+                dispatched.set_result(time.monotonic())
+            if on_token is None:
+                coroutine = self._dispatch(provider, prompt)
+            else:
+                coroutine = self._collect_stream(provider, prompt, on_token)
+            if request_timeout:
+                return asyncio.wait_for(coroutine, request_timeout)
+            return coroutine
+
+        if self.limiter is None:
+            return await call()
+
+        await self.limiter.acquire()
+        start = time.monotonic()
+        latency, overloaded = None, False
+        try:
+            response = await call()
+            latency = time.monotonic() - start
+            return response
+        except OVERLOAD_ERRORS:
+            overloaded = True
+            raise
+        except Exception:
+            latency = time.monotonic() - start
+            raise
+        finally:
+            # Cancelled calls (lost hedges, deadlines) give no latency feedback
+            self.limiter.release(latency, overloaded)
+
+    async def _run_hedged(self, provider: str, prompt: str) -> str:
+        """
+        Calls the provider and, if the call outlives the hedge delay, sends a
+        duplicate. The first successful answer wins and the other call is cancelled.
+
+        The hedge delay and the recorded latency start once the call holds a
+        limiter slot, so time queued behind the limiter never triggers a hedge.
+        """
+        dispatched = asyncio.get_running_loop().create_future()
+        primary = asyncio.ensure_future(
+            self._run_once(provider, prompt, dispatched=dispatched)
+        )
+        pending = {primary}
+        try:
+            await asyncio.wait(
+                {primary, dispatched}, return_when=asyncio.FIRST_COMPLETED
+            )
+            start = dispatched.result() if dispatched.done() else time.monotonic()
+            delay = self.hedging.hedge_delay()
+            if delay is not None:
+                await asyncio.wait(pending, timeout=delay)
+                if not primary.done() and self.hedging.try_hedge():
+                    pending.add(asyncio.ensure_future(self._run_once(provider, prompt)))
+
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.cancelled():
+                        error = error or asyncio.CancelledError()
+                    elif task.exception() is None:
+                        self.hedging.record(
+                            time.monotonic() - start, hedge_won=task is not primary
+                        )
+                        return task.result()
+                    else:
+                        error = error or task.exception()
+            raise error
+        finally:
+            dispatched.cancel()
+            for task in pending:
+                task.cancel()
+
+    async def _run_cascade(self, provider: str, prompt: str) -> str:
+        """
+        Calls the cascade's models in order until a response passes its acceptance
+        check, and returns that response (or the last model's).
+        """
+        cascade = self.cascade
+        response = None
+        for tier, model in enumerate(cascade.models):
+            tier_call = {
+                "model": model,
+                "logprobs": cascade.needs_logprobs,
+                "token_logprobs": None,
+            }
+            token = _TIER_CALL.set(tier_call)
+            start = time.monotonic()
+            try:
+                if self.hedging is None:
+                    response = await self._run_once(provider, prompt)
+                else:
+                    response = await self._run_hedged(provider, prompt)
+            finally:
+                _TIER_CALL.reset(token)
+            accepted = cascade.accepts(response, tier_call["token_logprobs"])
+            cascade.record(tier, time.monotonic() - start, accepted)
+            if accepted:
+                break
+        return response
+
+    async def run(
+        self,
+        prompt: str,
+        on_token: Optional[Callable[[str], None]] = None,
+        response_format: Optional[Dict] = None,
+    ) -> str:
+        """
+        Entry point for calling any LLM provider.
+
+        The `request_timeout` option bounds every attempt; a timed out call raises
+        `asyncio.TimeoutError`.
+
+        Args:
+            prompt (str): The user prompt to send to the LLM.
+            on_token (Callable, optional): If given, the response is streamed and
+                `on_token` is called with every text delta as it arrives. Streamed
+                calls are not hedged and not cascaded.
+            response_format (Dict, optional): The `response_format` of the request,
+                e.g. `OutputSchema.response_format()` for JSON output. Defaults to the
+                `response_format` option of the config.
+
+        Returns:
+            str: The LLM response text.
+        """
+        provider = self.config.provider.lower()
+        response_format = response_format or self.config.options.get("response_format")
+        token = _RESPONSE_FORMAT.set(response_format)
+        try:
+            if self.cascade is not None and on_token is None:
+                return await self._run_cascade(provider, prompt)
+            if on_token is not None or self.hedging is None:
+                return await self._run_once(provider, prompt, on_token)
+            return await self._run_hedged(provider, prompt)
+        finally:
+            _RESPONSE_FORMAT.reset(token)
+
+    async def stream(
+        self, prompt: str, on_token: Optional[Callable[[str], None]] = None
+    ) -> AsyncIterator[str]:
+        """
+        Streams the LLM response as text deltas, for time-to-first-token sensitive use.
+
+        Example:
+            async for delta in runner.stream("Tell me a story"):
+                print(delta, end="", flush=True)
+
+        Args:
+            prompt (str): The user prompt to send to the LLM.
+            on_token (Callable, optional): Also called with every delta.
+
+        Yields:
+            str: The response text deltas; joined they form the full response.
+        """
+        provider = self.config.provider.lower()
+        if self.limiter is not None:
+            await self.limiter.acquire()
+        start, latency, overloaded = time.monotonic(), None, False
+        try:
+            async for delta in self._stream_provider(provider, prompt):
+                if on_token is not None:
+                    on_token(delta)
+                yield delta
+            latency = time.monotonic() - start
+        except OVERLOAD_ERRORS:
+            overloaded = True
+            raise
+        finally:
+            if self.limiter is not None:
+                self.limiter.release(latency, overloaded)
+
+    async def _embedding_request(self, texts: List[str]) -> np.ndarray:
+        """
+        Sends one embeddings request for `texts`, within a limiter slot, the request
+        timeout and (with an endpoint pool) an endpoint's budget.
+
+        Vectors are requested base64 encoded and decoded straight into a float32
+        array, without a Python float per value.
+        """
+        provider = self.config.provider.lower()
+        if provider not in ("openai", "openai_compatible"):
+            raise NotImplementedError(
+                f"Provider {provider} does not support embeddings yet."
+            )
+        options = self.config.options
+        encoding_format = options.get("embedding_encoding", "base64")
+        request_timeout = options.get("request_timeout")
+
+        async def call(client: OpenAI):
+            coroutine = self._to_thread(
+                client.embeddings.create,
+                model=options.get("embedding_model") or "text-embedding-3-small",
+                input=texts,
+                encoding_format=encoding_format,
+            )
+            if request_timeout:
+                return await asyncio.wait_for(coroutine, request_timeout)
+            return await coroutine
+
+        if self.limiter is not None:
+            await self.limiter.acquire()
+        start, latency, overloaded = time.monotonic(), None, False
+        try:
+            if self.endpoint_pool is None:
+                response = await call(self._provider_client(provider))
+            else:
+                response = await self._pooled_embedding_call(
+                    call, sum(map(len, texts)) // 4
+                )
+            latency = time.monotonic() - start
+        except OVERLOAD_ERRORS:
+            overloaded = True
+            raise
+        finally:
+            if self.limiter is not None:
+                self.limiter.release(latency, overloaded)
+
+        self._record_usage(response)
+        return self._decode_embeddings(response)
+
+    async def _pooled_embedding_call(self, call, tokens: int):
+        """
+        Runs `call` with a client of the pool endpoint picked for `tokens` estimated
+        tokens, and reports the outcome to the pool.
+        """
+        pool = self.endpoint_pool
+        endpoint, entry = await pool.acquire(tokens)
+        start, error, response = time.monotonic(), None, None
+        try:
+            response = await call(self._endpoint_client(endpoint))
+        except TRANSIENT_ERRORS as exc:
+            error = exc
+            raise
+        finally:
+            usage = getattr(response, "usage", None)
+            pool.release(
+                endpoint,
+                entry,
+                time.monotonic() - start,
+                tokens=getattr(usage, "total_tokens", None),
+                error=error,
+            )
+        return response
+
+    @staticmethod
+    def _decode_embeddings(response) -> np.ndarray:
+        """
+        Stacks the vectors of an embeddings response, in input order.
+        """
+        data = sorted(response.data, key=lambda item: item.index)
+        if data and isinstance(data[0].embedding, str):
+            return np.stack(
+                [
+                    np.frombuffer(base64.b64decode(item.embedding), dtype=np.float32)
+                    for item in data
+                ]
+            )
+        return np.array([item.embedding for item in data], dtype=np.float32)
+
+    async def embed(self, texts: List[str]) -> np.ndarray:
+        """
+        Embeds texts with the `embedding_model` option (default
+        "text-embedding-3-small") in a single request.
+
+        Recently embedded texts are served from an in-memory LRU cache holding up to
+        the `embedding_cache_size` option (default 10,000) vectors; 0 disables it.
+        See `LLMDataFrameIntegrator.add_embeddings` for batching a whole column.
+
+        Args:
+            texts (List[str]): The texts, at most the provider's batch limit.
+
+        Returns:
+            np.ndarray: A float32 array of shape (len(texts), dimension).
+        """
+        model = self.config.options.get("embedding_model")
+        cache_size = self.config.options.get("embedding_cache_size", 10_000)
+        vectors: List[Optional[np.ndarray]] = [None] * len(texts)
+        missing: Dict[str, List[int]] = {}
+        with self._embedding_cache_lock:
+            for position, text in enumerate(texts):
+                vector = self._embedding_cache.get((model, text))
+                if vector is None:
+                    missing.setdefault(text, []).append(position)
+                else:
+                    self._embedding_cache.move_to_end((model, text))
+                    vectors[position] = vector
+
+        if missing:
+            embedded = await self._embedding_request(list(missing))
+            with self._embedding_cache_lock:
+                for (text, positions), vector in zip(missing.items(), embedded):
+                    for position in positions:
+                        vectors[position] = vector
+                    if cache_size:
+                        self._embedding_cache[model, text] = vector
+                while len(self._embedding_cache) > cache_size:
+                    self._embedding_cache.popitem(last=False)
+        if not vectors:
+            return np.empty((0, 0), dtype=np.float32)
+        return np.stack(vectors)
+
+    @sync_to_async
+    async def embed_sync(self, texts: List[str]) -> np.ndarray:
+        """
+        Synchronous wrapper of `embed`.
+
+        Args:
+            texts (List[str]): The texts to embed.
+
+        Returns:
+            np.ndarray: A float32 array of shape (len(texts), dimension).
+        """
+        return await self.embed(texts)
+
+    def stats(self) -> Dict:
+        """
+        Runtime statistics of the runner.
+
+        Returns:
+            Dict: "usage" (requests, prompt, completion and cached prompt tokens, and
+            the share of prompt tokens served from the provider's prompt cache) and,
+            when configured, "concurrency" (limit, in-flight, waiting, counters of the
+            limiter), "hedging" (hedge counters and delay), "cascade" (per-model
+            request, accepted and escalated counters and latency) and "endpoints"
+            (per-endpoint statistics of the pool). Streamed calls report no usage.
+        """
+        with self._usage_lock:
+            usage = dict(self._usage)
+        usage["cache_hit_ratio"] = (
+            usage["cached_tokens"] / usage["prompt_tokens"]
+            if usage["prompt_tokens"]
+            else 0.0
+        )
+        stats = {"usage": usage}
+        if self.limiter is not None:
+            stats["concurrency"] = self.limiter.stats()
+        if self.hedging is not None:
+            stats["hedging"] = self.hedging.stats()
+        if self.cascade is not None:
+            stats["cascade"] = self.cascade.stats()
+        if self.endpoint_pool is not None:
+            stats["endpoints"] = self.endpoint_pool.stats()
+        return stats
+
     @sync_to_async
-    async def run_sync(self, prompt: str) -> str:
+    async def run_sync(
+        self,
+        prompt: str,
+        on_token: Optional[Callable[[str], None]] = None,
+        response_format: Optional[Dict] = None,
+    ) -> str:
         """
         Synchronous wrapper for simpler usage.
 
         Args:
             prompt (str): The user prompt.
+            on_token (Callable, optional): Streams the response, calling `on_token`
+                with every text delta (e.g. `print`) while waiting for the full text.
+            response_format (Dict, optional): The `response_format` of the request.
 
         Returns:
             str: The LLM response text.
         """
-        return await self.run(prompt)
+        kwargs = {}
+        if on_token is not None:
+            kwargs["on_token"] = on_token
+        if response_format is not None:
+            kwargs["response_format"] = response_format
+        return await self.run(prompt, **kwargs)
@@ -0,0 +1,459 @@
+"""
+Service module to share one runner between many local scripts.
+
+`llmworkbook serve` (or `LLMService(runner).serve_forever()`) runs an HTTP service,
+on a TCP port or a Unix socket, holding a single `LLMRunner`: its pooled client,
+concurrency limiter, endpoint budgets and caches are shared by every client, so
+scripts running side by side no longer compete for the same quota. Identical prompts
+are answered from a shared response cache, and identical requests in flight are sent
+to the provider once.
+
+`LLMServiceClient` talks to the service and can replace the runner of an
+`LLMDataFrameIntegrator`:
+
+    client = LLMServiceClient("http://127.0.0.1:8765")
+    integrator = LLMDataFrameIntegrator(runner=client, df=df)
+
+Endpoints (JSON bodies):
+
+- `POST /v1/run`: `{"prompt", "response_format"?}` -> `{"response"}`
+- `POST /v1/embed`: `{"texts"}` -> `{"embeddings"}` (base64 float32) and `{"shape"}`
+- `POST /v1/wrap`: a frame in pandas "split" JSON plus `WrapDataFrame` options ->
+  `{"wrapped"}`
+- `GET /v1/config`, `GET /v1/stats`, `GET /health`
+"""
+
+import asyncio
+import base64
+import json
+import threading
+from collections import OrderedDict
+from functools import partial
+from io import StringIO
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from aiohttp import ClientSession, ClientTimeout, TCPConnector, UnixConnector, web
+from pandas.errors import InvalidColumnName
+
+from .config import LLMConfig
+from .runner import LLMRunner
+from .utils import BackgroundServer
+from .wrappers import WrapDataFrame
+
+_json_response = partial(web.json_response, dumps=partial(json.dumps, default=str))
+
+
+def _retrieve_exception(task: asyncio.Task) -> None:
+    # So an error nobody waits for any more (every caller left) is not logged
+    if not task.cancelled():
+        task.exception()
+
+
+class LLMService:  # pylint: disable=too-many-instance-attributes
+    """
+    HTTP service running the prompts of many clients through one shared runner.
+
+    Attributes:
+        runner (LLMRunner): The shared runner.
+        cache_size (int): Responses kept in the shared LRU cache; 0 disables it.
+    """
+
+    def __init__(self, runner: LLMRunner, cache_size: int = 10_000) -> None:
+        """
+        Args:
+            runner (LLMRunner): The shared runner; give it a limiter (and endpoints) to
+                enforce one budget for every client.
+            cache_size (int): Responses kept in the shared cache, keyed by prompt and
+                response format. Repeated prompts get the cached response even with a
+                non-zero temperature; use 0 to disable the cache.
+        """
+        self.runner = runner
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+        self._in_flight: Dict[Tuple[str, str], asyncio.Task] = {}
+        self._counters = {"requests": 0, "cache_hits": 0, "coalesced": 0}
+        self._server: Optional[BackgroundServer] = None
+        self.address = None
+
+    async def run(self, prompt: str, response_format: Optional[Dict] = None) -> str:
+        """
+        Run a prompt through the shared runner, the cache and in-flight requests.
+
+        Returns:
+            str: The LLM response text.
+        """
+        self._counters["requests"] += 1
+        key = (prompt, json.dumps(response_format, sort_keys=True))
+        if key in self._cache:
+            self._counters["cache_hits"] += 1
+            self._cache.move_to_end(key)
+            return self._cache[key]
+        task = self._in_flight.get(key)
+        if task is None:
+            # A task of its own, so the request survives its first caller leaving
+            task = asyncio.ensure_future(self._call(key, prompt, response_format))
+            task.add_done_callback(_retrieve_exception)
+            self._in_flight[key] = task
+        else:
+            self._counters["coalesced"] += 1
+        return await asyncio.shield(task)
+
+    async def _call(
+        self, key: Tuple[str, str], prompt: str, response_format: Optional[Dict]
+    ) -> str:
+        try:
+            response = await self.runner.run(prompt, response_format=response_format)
+        finally:
+            del self._in_flight[key]
+        if self.cache_size > 0:
+            self._cache[key] = response
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return response
+
+    async def _handle_run(self, request: web.Request) -> web.Response:
+        payload = await request.json()
+        if not isinstance(payload.get("prompt"), str):
+            return _json_response({"error": "'prompt' must be a string."}, status=400)
+        try:
+            response = await self.run(payload["prompt"], payload.get("response_format"))
+        except asyncio.TimeoutError:
+            return _json_response({"error": "The LLM request timed out."}, status=504)
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            return _json_response({"error": str(exc)}, status=502)
+        return _json_response({"response": response})
+
+    async def _handle_embed(self, request: web.Request) -> web.Response:
+        payload = await request.json()
+        texts = payload.get("texts")
+        if not isinstance(texts, list):
+            return _json_response({"error": "'texts' must be a list."}, status=400)
+        try:
+            vectors = await self.runner.embed(texts)
+        except asyncio.TimeoutError:
+            return _json_response({"error": "The LLM request timed out."}, status=504)
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            return _json_response({"error": str(exc)}, status=502)
+        vectors = np.ascontiguousarray(vectors, dtype="<f4")
+        return _json_response(
+            {
+                "embeddings": base64.b64encode(vectors.tobytes()).decode("ascii"),
+                "shape": list(vectors.shape),
+            }
+        )
+
+    async def _handle_wrap(self, request: web.Request) -> web.Response:
+        payload = await request.json()
+
+        def wrap() -> List:
+            df = pd.read_json(StringIO(payload["frame"]), orient="split", dtype=False)
+            wrapper = WrapDataFrame(df, **payload.get("options", {}))
+            return wrapper.wrap()["wrapped_output"].tolist()
+
+        try:
+            # Wrapping is CPU bound; keep the event loop serving requests meanwhile
+            wrapped = await asyncio.get_running_loop().run_in_executor(None, wrap)
+        except (KeyError, TypeError, ValueError, InvalidColumnName) as exc:
+            return _json_response({"error": str(exc)}, status=400)
+        return _json_response({"wrapped": wrapped})
+
+    async def _handle_config(self, _request: web.Request) -> web.Response:
+        config = self.runner.config
+        # No credentials: the API key and the headers stay on the service
+        return _json_response(
+            {
+                "provider": config.provider,
+                "system_prompt": config.system_prompt,
+                "options": config.options,
+            }
+        )
+
+    async def _handle_stats(self, _request: web.Request) -> web.Response:
+        return _json_response(self.stats())
+
+    async def _handle_health(self, _request: web.Request) -> web.Response:
+        return _json_response({"status": "ok"})
+
+    def stats(self) -> Dict:
+        """
+        Returns:
+            Dict: The runner's `stats()` plus "service" counters: requests, cache
+            hits, requests coalesced with an identical one in flight and cached
+            responses.
+        """
+        stats = self.runner.stats()
+        stats["service"] = {**self._counters, "cached_responses": len(self._cache)}
+        return stats
+
+    def app(self) -> web.Application:
+        """
+        Returns:
+            web.Application: The aiohttp application of the service.
+        """
+        app = web.Application(client_max_size=256 * 1024**2)
+        app.router.add_post("/v1/run", self._handle_run)
+        app.router.add_post("/v1/embed", self._handle_embed)
+        app.router.add_post("/v1/wrap", self._handle_wrap)
+        app.router.add_get("/v1/config", self._handle_config)
+        app.router.add_get("/v1/stats", self._handle_stats)
+        app.router.add_get("/health", self._handle_health)
+        return app
+
+    def serve_forever(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 8765,
+        unix_socket: Optional[str] = None,
+    ) -> None:
+        """
+        Serve until interrupted (Ctrl+C or SIGTERM).
+
+        Args:
+            host (str): Interface to bind to.
+            port (int): TCP port to bind to.
+            unix_socket (str, optional): Serve on this Unix socket instead.
+        """
+        if unix_socket is not None:
+            web.run_app(self.app(), path=unix_socket, access_log=None)
+        else:
+            web.run_app(self.app(), host=host, port=port, access_log=None)
+
+    def start(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        unix_socket: Optional[str] = None,
+    ) -> "LLMService":
+        """
+        Serve on a daemon thread, e.g. inside a notebook, until `stop` is called.
+
+        Args:
+            host (str): Interface to bind to.
+            port (int): TCP port to bind to; 0 picks a free one (see `address`).
+            unix_socket (str, optional): Serve on this Unix socket instead.
+
+        Returns:
+            LLMService: The running service.
+
+        Raises:
+            OSError: If the address cannot be bound (e.g. the port is in use).
+        """
+        server = BackgroundServer(
+            self.app, host, port, unix_socket, name="llmworkbook-service"
+        )
+        self._server = server.start()
+        self.address = server.address
+        return self
+
+    def stop(self) -> None:
+        """
+        Stop a service started with `start` and join its thread.
+        """
+        if self._server is not None:
+            self._server.stop()
+            self._server = None
+
+    def __enter__(self) -> "LLMService":
+        return self.start() if self._server is None else self
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+
+class LLMServiceClient:
+    """
+    Client of an `LLMService`, usable as the runner of an `LLMDataFrameIntegrator`.
+
+    Requests go through one pooled HTTP session running on a background thread, so
+    the client works from any event loop (sync calls, `async_mode`, background jobs).
+
+    Attributes:
+        url (str): Base URL of the service.
+    """
+
+    def __init__(
+        self,
+        url: str = "http://127.0.0.1:8765",
+        unix_socket: Optional[str] = None,
+        timeout: float = 600.0,
+        max_connections: int = 100,
+    ) -> None:
+        """
+        Args:
+            url (str): Base URL of the service. With `unix_socket` only its path
+                matters.
+            unix_socket (str, optional): Connect to the service's Unix socket.
+            timeout (float): Seconds before a request to the service is abandoned.
+            max_connections (int): Connections kept open to the service.
+        """
+        self.url = url.rstrip("/")
+        self._config: Optional[LLMConfig] = None
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="llmworkbook-client", daemon=True
+        )
+        self._thread.start()
+        self._session: ClientSession = self._submit(
+            self._open_session(unix_socket, timeout, max_connections)
+        ).result()
+
+    @staticmethod
+    async def _open_session(
+        unix_socket: Optional[str], timeout: float, max_connections: int
+    ) -> ClientSession:
+        if unix_socket is not None:
+            connector = UnixConnector(path=unix_socket, limit=max_connections)
+        else:
+            connector = TCPConnector(limit=max_connections)
+        return ClientSession(connector=connector, timeout=ClientTimeout(total=timeout))
+
+    def _submit(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop)
+
+    async def _request(self, method: str, path: str, payload: Optional[Dict] = None):
+        async with self._session.request(
+            method, self.url + path, json=payload
+        ) as response:
+            body = await response.json()
+        if response.status == 504:
+            # Like the runner, a timed out request raises asyncio.TimeoutError
+            raise asyncio.TimeoutError(body.get("error"))
+        if response.status >= 400:
+            raise RuntimeError(
+                f"llmworkbook service error {response.status}: {body.get('error')}"
+            )
+        return body
+
+    def _call(self, method: str, path: str, payload: Optional[Dict] = None):
+        return self._submit(self._request(method, path, payload)).result()
+
+    async def _acall(self, method: str, path: str, payload: Optional[Dict] = None):
+        return await asyncio.wrap_future(
+            self._submit(self._request(method, path, payload))
+        )
+
+    @property
+    def config(self) -> LLMConfig:
+        """
+        Returns:
+            LLMConfig: The service runner's provider, system prompt and options
+            (without credentials), used for the fingerprints of incremental runs.
+        """
+        if self._config is None:
+            body = self._call("GET", "/v1/config")
+            self._config = LLMConfig(
+                provider=body["provider"],
+                system_prompt=body["system_prompt"],
+                options=body["options"],
+            )
+        return self._config
+
+    @staticmethod
+    def _run_payload(prompt: str, response_format: Optional[Dict]) -> Dict:
+        payload = {"prompt": prompt}
+        if response_format is not None:
+            payload["response_format"] = response_format
+        return payload
+
+    async def run(
+        self,
+        prompt: str,
+        on_token=None,
+        response_format: Optional[Dict] = None,
+    ) -> str:
+        """
+        Run a prompt on the service.
+
+        Args:
+            prompt (str): The user prompt.
+            on_token (Callable, optional): Called once with the full response; the
+                service does not stream.
+            response_format (Dict, optional): The `response_format` of the request.
+
+        Returns:
+            str: The LLM response text.
+        """
+        body = await self._acall(
+            "POST", "/v1/run", self._run_payload(prompt, response_format)
+        )
+        if on_token is not None:
+            on_token(body["response"])
+        return body["response"]
+
+    def run_sync(
+        self,
+        prompt: str,
+        on_token=None,
+        response_format: Optional[Dict] = None,
+    ) -> str:
+        """
+        Synchronous counterpart of `run`.
+        """
+        body = self._call("POST", "/v1/run", self._run_payload(prompt, response_format))
+        if on_token is not None:
+            on_token(body["response"])
+        return body["response"]
+
+    @staticmethod
+    def _vectors(body: Dict) -> np.ndarray:
+        vectors = np.frombuffer(base64.b64decode(body["embeddings"]), dtype="<f4")
+        return vectors.reshape(body["shape"]).astype(np.float32, copy=False)
+
+    async def embed(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed texts on the service.
+
+        Returns:
+            np.ndarray: A float32 array of shape (len(texts), dimension).
+        """
+        return self._vectors(
+            await self._acall("POST", "/v1/embed", {"texts": list(texts)})
+        )
+
+    def embed_sync(self, texts: List[str]) -> np.ndarray:
+        """
+        Synchronous counterpart of `embed`.
+        """
+        return self._vectors(self._call("POST", "/v1/embed", {"texts": list(texts)}))
+
+    def wrap(self, df: pd.DataFrame, **options) -> pd.DataFrame:
+        """
+        Wrap a DataFrame on the service, like `WrapDataFrame(df, **options).wrap()`.
+
+        Values travel as JSON, so dates arrive as ISO strings.
+
+        Returns:
+            pd.DataFrame: A DataFrame with the wrapped content.
+        """
+        frame = df.to_json(orient="split", date_format="iso", default_handler=str)
+        body = self._call("POST", "/v1/wrap", {"frame": frame, "options": options})
+        return pd.DataFrame(
+            {"wrapped_output": pd.Series(body["wrapped"], dtype=object)}
+        ).set_axis(df.index)
+
+    def stats(self) -> Dict:
+        """
+        Returns:
+            Dict: The service's `stats()`.
+        """
+        return self._call("GET", "/v1/stats")
+
+    def close(self) -> None:
+        """
+        Close the HTTP session and stop the client's thread.
+        """
+        if self._thread is None:
+            return
+        self._submit(self._session.close()).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        self._thread = None
+
+    def __enter__(self) -> "LLMServiceClient":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,187 @@
+"""
+Structured output module to request JSON responses and expand them into typed columns.
+
+An `OutputSchema` names the fields a prompt asks for and their types. It is sent with
+every request as the `response_format`, and the raw responses of a run are parsed in
+one pass (with `orjson` when installed) and turned into one typed column per field.
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple, Type
+
+import pandas as pd
+
+try:
+    import orjson
+
+    _loads = orjson.loads  # pylint: disable=no-member
+    _JSON_ERRORS: Tuple[Type[Exception], ...] = (
+        orjson.JSONDecodeError,  # pylint: disable=no-member
+        TypeError,
+    )
+except ImportError:  # orjson is an optional extra
+    import json
+
+    _loads = json.loads
+    _JSON_ERRORS = (ValueError, TypeError)
+
+# Python type -> (JSON schema type, pandas dtype)
+FIELD_TYPES = {
+    str: ("string", "string"),
+    int: ("integer", "Int64"),
+    float: ("number", "Float64"),
+    bool: ("boolean", "boolean"),
+}
+
+_MODES = ("json_schema", "json_object")
+
+
+def _strip_fences(text: str) -> str:
+    # Models without a JSON mode often wrap the object in a ```json code fence
+    text = text.strip()
+    if text.startswith("```"):
+        text = text.split("\n", 1)[-1]
+        if text.endswith("```"):
+            text = text[:-3]
+    return text
+
+
+class OutputSchema:
+    """
+    Fields and types of a structured (JSON object) response.
+
+    Example:
+        schema = OutputSchema({"label": str, "score": float, "spam": bool})
+        integrator.add_llm_responses("prompt", output_schema=schema)
+
+    Attributes:
+        fields (Dict[str, type]): Field names and their Python types
+            (str, int, float or bool).
+        name (str): Schema name sent to the provider.
+        mode (str): "json_schema" (default) sends the full schema for strict
+            structured outputs; "json_object" only asks for a JSON object, for
+            servers without schema support.
+    """
+
+    def __init__(
+        self,
+        fields: Dict[str, type],
+        name: str = "row_output",
+        mode: str = "json_schema",
+    ) -> None:
+        """
+        Args:
+            fields (Dict[str, type]): Field names and their Python types.
+            name (str): Schema name sent to the provider.
+            mode (str): "json_schema" or "json_object".
+
+        Raises:
+            ValueError: If there are no fields, a type is not supported or the mode
+                is unknown.
+        """
+        if not fields:
+            raise ValueError("An output schema needs at least one field.")
+        for field, field_type in fields.items():
+            if field_type not in FIELD_TYPES:
+                raise ValueError(
+                    f"Unsupported type {field_type!r} for field '{field}'. "
+                    "Use str, int, float or bool."
+                )
+        if mode not in _MODES:
+            raise ValueError(f"Unknown mode '{mode}'. Use one of {_MODES}.")
+        self.fields = dict(fields)
+        self.name = name
+        self.mode = mode
+
+    def json_schema(self) -> Dict:
+        """
+        Returns:
+            Dict: The JSON schema of the response object.
+        """
+        return {
+            "type": "object",
+            "properties": {
+                field: {"type": FIELD_TYPES[field_type][0]}
+                for field, field_type in self.fields.items()
+            },
+            "required": list(self.fields),
+            "additionalProperties": False,
+        }
+
+    def response_format(self) -> Dict:
+        """
+        Returns:
+            Dict: The `response_format` of the chat completion request.
+        """
+        if self.mode == "json_object":
+            return {"type": "json_object"}
+        return {
+            "type": "json_schema",
+            "json_schema": {
+                "name": self.name,
+                "strict": True,
+                "schema": self.json_schema(),
+            },
+        }
+
+    def _valid(self, record) -> bool:
+        """
+        Whether a parsed response is an object with every field of the right type.
+        """
+        if not isinstance(record, dict):
+            return False
+        for field, field_type in self.fields.items():
+            value = record.get(field)
+            if field_type is float:
+                valid = isinstance(value, (int, float)) and not isinstance(value, bool)
+            elif field_type is int:
+                valid = isinstance(value, int) and not isinstance(value, bool)
+            else:
+                valid = isinstance(value, field_type)
+            if not valid:
+                return False
+        return True
+
+    def parse(self, responses: Sequence[Optional[str]]) -> Tuple[List, List[bool]]:
+        """
+        Parse raw responses in one pass.
+
+        Args:
+            responses (Sequence[str]): Raw response texts; None for rows without one.
+
+        Returns:
+            Tuple: The parsed objects (None where invalid) and a validity mask.
+        """
+        records, valid = [], []
+        for response in responses:
+            record = None
+            if isinstance(response, str):
+                try:
+                    record = _loads(_strip_fences(response))
+                except _JSON_ERRORS:  # pylint: disable=catching-non-exception
+                    record = None
+            if record is not None and not self._valid(record):
+                record = None
+            records.append(record)
+            valid.append(record is not None)
+        return records, valid
+
+    def to_frame(
+        self, records: Sequence[Optional[Dict]], index: pd.Index
+    ) -> pd.DataFrame:
+        """
+        Build one typed column per field from parsed responses, all at once.
+
+        Args:
+            records (Sequence[Dict]): Parsed objects, None for invalid rows.
+            index (pd.Index): Index of the rows.
+
+        Returns:
+            pd.DataFrame: The field columns, with missing values for invalid rows.
+        """
+        columns = list(self.fields)
+        frame = pd.DataFrame.from_records(
+            [record or {} for record in records], columns=columns, index=index
+        )
+        return frame.astype(
+            {field: FIELD_TYPES[self.fields[field]][1] for field in columns}
+        )
@@ -0,0 +1,238 @@
+"""
+Local mock of an OpenAI-compatible chat-completions server.
+
+Used by the benchmark suite and by tests that need a real HTTP round trip
+without calling a paid API. The server runs an aiohttp application on a
+background thread and can simulate latency, jitter and 429 rate limiting. Requests with
+`"stream": true` are answered with server-sent event chunks. `/v1/embeddings` returns
+deterministic vectors derived from a hash of every input text.
+
+Example:
+    with MockChatServer(latency=0.05, jitter=0.01, rate_limit_ratio=0.1) as server:
+        os.environ["OPENAI_BASE_URL"] = server.base_url
+        ...
+"""
+
+import asyncio
+import base64
+import hashlib
+import json
+import random
+import time
+from typing import Dict, Optional
+
+import numpy as np
+from aiohttp import web
+
+from llmworkbook.utils import BackgroundServer
+
+
+class MockChatServer:  # pylint: disable=too-many-instance-attributes
+    """
+    A threaded aiohttp server answering `/v1/chat/completions` requests.
+
+    Attributes:
+        latency (float): Mean response latency in seconds.
+        jitter (float): Maximum random deviation (+/-) added to the latency.
+        rate_limit_ratio (float): Fraction of requests answered with HTTP 429.
+        latency_per_token (float): Extra latency per (estimated) prompt token.
+        embedding_dim (int): Dimension of the returned embeddings.
+        stats (Dict[str, int]): Counters for served and rate-limited requests.
+        last_request (Dict, optional): Headers (case-insensitive) and JSON payload of
+            the latest request.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        rate_limit_ratio: float = 0.0,
+        latency_per_token: float = 0.0,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        seed: Optional[int] = None,
+        embedding_dim: int = 8,
+    ) -> None:
+        """
+        Args:
+            latency (float): Mean response latency in seconds.
+            jitter (float): Maximum random deviation (+/-) added to the latency.
+            rate_limit_ratio (float): Fraction (0-1) of requests answered with HTTP 429.
+            latency_per_token (float): Extra latency per prompt token (4 characters),
+                to simulate prompts of very different sizes.
+            host (str): Interface to bind to.
+            port (int): Port to bind to. 0 picks a free port.
+            seed (int, optional): Seed for the jitter / rate limit random generator.
+            embedding_dim (int): Dimension of the returned embeddings.
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit_ratio = rate_limit_ratio
+        self.latency_per_token = latency_per_token
+        self.embedding_dim = embedding_dim
+        self.host = host
+        self.port = port
+        self.stats: Dict[str, int] = {"requests": 0, "rate_limited": 0}
+        self.last_request: Optional[Dict] = None
+        self._random = random.Random(seed)
+        self._server: Optional[BackgroundServer] = None
+
+    @property
+    def base_url(self) -> str:
+        """
+        Returns:
+            str: The base URL to hand to an OpenAI client (ends with `/v1`).
+        """
+        return f"http://{self.host}:{self.port}/v1"
+
+    def _delay(self, prompt: str) -> float:
+        delay = self.latency + self.latency_per_token * len(prompt) / 4
+        if not self.jitter:
+            return delay
+        return max(0.0, delay + self._random.uniform(-self.jitter, self.jitter))
+
+    async def _chat_completions(self, request: web.Request) -> web.Response:
+        self.stats["requests"] += 1
+        payload = await request.json()
+        self.last_request = {"headers": request.headers.copy(), "payload": payload}
+
+        prompt = payload["messages"][-1]["content"]
+        await asyncio.sleep(self._delay(prompt))
+
+        if self._random.random() < self.rate_limit_ratio:
+            self.stats["rate_limited"] += 1
+            return web.json_response(
+                {
+                    "error": {
+                        "message": "Rate limit reached (mock).",
+                        "type": "requests",
+                        "code": "rate_limit_exceeded",
+                    }
+                },
+                status=429,
+                headers={"retry-after-ms": "10"},
+            )
+
+        content = f"Mock response to: {prompt}"
+        if payload.get("stream"):
+            return await self._stream_completion(request, payload, content)
+        return web.json_response(
+            {
+                "id": f"chatcmpl-mock-{self.stats['requests']}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": payload.get("model", "mock-model"),
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": content},
+                        "finish_reason": "stop",
+                    }
+                ],
+                "usage": {
+                    "prompt_tokens": len(prompt) // 4,
+                    "completion_tokens": len(content) // 4,
+                    "total_tokens": (len(prompt) + len(content)) // 4,
+                },
+            }
+        )
+
+    def embedding(self, text: str) -> np.ndarray:
+        """
+        Returns:
+            np.ndarray: The float32 vector the server returns for `text`.
+        """
+        seed = int.from_bytes(hashlib.blake2b(text.encode()).digest()[:8], "little")
+        return (
+            np.random.default_rng(seed)
+            .standard_normal(self.embedding_dim)
+            .astype(np.float32)
+        )
+
+    async def _embeddings(self, request: web.Request) -> web.Response:
+        self.stats["requests"] += 1
+        payload = await request.json()
+        self.last_request = {"headers": request.headers.copy(), "payload": payload}
+        texts = payload["input"]
+        texts = [texts] if isinstance(texts, str) else texts
+        await asyncio.sleep(self._delay("".join(texts)))
+
+        data = []
+        for position, text in enumerate(texts):
+            vector = self.embedding(text)
+            if payload.get("encoding_format") == "base64":
+                embedding = base64.b64encode(vector.tobytes()).decode()
+            else:
+                embedding = vector.tolist()
+            data.append(
+                {"object": "embedding", "index": position, "embedding": embedding}
+            )
+        tokens = sum(len(text) for text in texts) // 4
+        return web.json_response(
+            {
+                "object": "list",
+                "data": data,
+                "model": payload.get("model", "mock-embedding"),
+                "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+            }
+        )
+
+    async def _stream_completion(
+        self, request: web.Request, payload: Dict, content: str
+    ) -> web.StreamResponse:
+        # Server-sent events, one chunk per word, like the OpenAI streaming API
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+        chunk_id = f"chatcmpl-mock-{self.stats['requests']}"
+        words = content.split(" ")
+        deltas = [word if i == 0 else f" {word}" for i, word in enumerate(words)]
+        for delta in [*deltas, None]:
+            chunk = {
+                "id": chunk_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": payload.get("model", "mock-model"),
+                "choices": [
+                    {
+                        "index": 0,
+                        "delta": {"content": delta} if delta else {},
+                        "finish_reason": None if delta else "stop",
+                    }
+                ],
+            }
+            await response.write(f"data: {json.dumps(chunk)}\n\n".encode())
+        await response.write(b"data: [DONE]\n\n")
+        await response.write_eof()
+        return response
+
+    def _build_app(self) -> web.Application:
+        app = web.Application(client_max_size=64 * 1024**2)
+        app.router.add_post("/v1/chat/completions", self._chat_completions)
+        app.router.add_post("/v1/embeddings", self._embeddings)
+        return app
+
+    def start(self) -> "MockChatServer":
+        """
+        Start the server on a daemon thread and wait until it accepts connections.
+
+        Returns:
+            MockChatServer: The running server.
+        """
+        self._server = BackgroundServer(self._build_app, self.host, self.port).start()
+        # Resolve the real port when an ephemeral one was requested
+        self.port = self._server.address[1]
+        return self
+
+    def stop(self) -> None:
+        """
+        Stop the server and join its thread.
+        """
+        if self._server is not None:
+            self._server.stop()
+            self._server = None
+
+    def __enter__(self) -> "MockChatServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
@@ -0,0 +1,77 @@
+# pylint: skip-file
+import pytest
+from types import SimpleNamespace
+from unittest.mock import patch
+from llmworkbook import LLMConfig, LLMRunner, ModelCascade
+from llmworkbook.cascade import json_check, length_check, logprob_check, regex_check
+
+
+def test_acceptance_checks():
+    assert regex_check(r"^(yes|no)$")("yes", None)
+    assert not regex_check(r"^(yes|no)$")("maybe", None)
+    assert json_check()('{"label": "spam"}', None)
+    assert not json_check()("label: spam", None)
+    assert length_check(2, 5)("abc", None)
+    assert not length_check(2, 5)("abcdef", None)
+    assert logprob_check(-0.5)("x", [-0.1, -0.3])
+    assert not logprob_check(-0.5)("x", [-0.1, -2.0])
+    assert not logprob_check(-0.5)("x", None)
+
+
+def test_cascade_needs_two_models():
+    with pytest.raises(ValueError):
+        ModelCascade(["gpt-4o-mini"], accept=json_check())
+
+
+@pytest.mark.asyncio
+async def test_cascade_escalates_rejected_responses():
+    """Rows failing the check are re-run on the stronger model; tiers are counted."""
+    cascade = ModelCascade(["small", "large"], accept=regex_check(r"^\d+$"))
+    runner = LLMRunner(LLMConfig(provider="openai_compatible"), cascade=cascade)
+
+    async def dispatch(provider, prompt):
+        model = runner._model_name()
+        return prompt if model == "small" else "42"
+
+    with patch.object(runner, "_dispatch", side_effect=dispatch):
+        assert await runner.run("7") == "7"
+        assert await runner.run("seven") == "42"
+
+    stats = runner.stats()["cascade"]
+    assert stats["small"]["requests"] == 2
+    assert stats["small"]["accepted"] == 1
+    assert stats["small"]["escalated"] == 1
+    assert stats["large"]["requests"] == 1
+    assert stats["large"]["accepted"] == 1
+
+
+@pytest.mark.asyncio
+async def test_cascade_requests_logprobs():
+    """A logprob check asks the provider for logprobs and judges by them."""
+    cascade = ModelCascade(["small", "large"], accept=logprob_check(-0.5))
+    runner = LLMRunner(LLMConfig(api_key="test-api-key"), cascade=cascade)
+
+    def create(model, messages, temperature, logprobs):
+        logprob = -2.0 if model == "small" else -0.1
+        return SimpleNamespace(
+            choices=[
+                SimpleNamespace(
+                    message=SimpleNamespace(content=f"from {model}"),
+                    logprobs=SimpleNamespace(
+                        content=[SimpleNamespace(logprob=logprob)]
+                    ),
+                )
+            ],
+            usage=None,
+        )
+
+    with patch(
+        "openai.resources.chat.completions.Completions.create", side_effect=create
+    ) as mock_create:
+        assert await runner.run("Classify this") == "from large"
+
+    assert [call.kwargs["model"] for call in mock_create.call_args_list] == [
+        "small",
+        "large",
+    ]
+    assert runner.stats()["cascade"]["small"]["escalated"] == 1
@@ -0,0 +1,76 @@
+# pylint: skip-file
+import pytest
+from unittest.mock import AsyncMock
+from llmworkbook import LLMConfig, LLMRunner
+from llmworkbook.cassette import Cassette, cassette_key
+
+
+@pytest.fixture
+def cassette_path(tmp_path):
+    """Fixture for a cassette file path."""
+    return str(tmp_path / "responses.cassette")
+
+
+def test_record_and_lookup(cassette_path):
+    """Recorded responses should be found again by key."""
+    cassette = Cassette(cassette_path)
+    options = {"model_name": "gpt-4o-mini", "temperature": 0.7}
+    keys = [cassette_key(f"prompt {i}", "system", options) for i in range(100)]
+    for i, key in enumerate(keys):
+        cassette.record(key, f"response\t{i}\nwith newline", latency=i / 100)
+
+    assert len(cassette) == 100
+    assert cassette.lookup(keys[42]) == (
+        "response\t42\nwith newline",
+        pytest.approx(0.42),
+    )
+    with pytest.raises(KeyError):
+        cassette.lookup(cassette_key("unknown", "system", options))
+    cassette.close()
+
+
+def test_last_record_wins_and_index_is_reused(cassette_path):
+    """Re-recorded keys keep the latest response and the index sidecar is reused."""
+    cassette = Cassette(cassette_path)
+    cassette.record(1, "old", 0.1)
+    cassette.record(1, "new", 0.2)
+    cassette.record(2, "other", 0.3)
+    cassette.close()
+
+    reopened = Cassette(cassette_path)
+    assert reopened.lookup(1) == ("new", pytest.approx(0.2))
+    assert len(reopened) == 2
+    assert reopened._index_is_fresh()
+
+    reopened.record(3, "appended", 0.4)
+    assert not reopened._index_is_fresh()
+    assert reopened.lookup(3)[0] == "appended"
+    reopened.close()
+
+
+def test_replay_provider_record_then_replay(cassette_path):
+    """The replay provider records upstream responses and serves them offline."""
+    options = {"cassette_path": cassette_path, "replay_mode": "record"}
+    recorder = LLMRunner(LLMConfig(provider="replay", options=options))
+    recorder._call_llm_openai = AsyncMock(return_value="recorded answer")
+
+    assert recorder.run_sync("What is AI?") == "recorded answer"
+    recorder._call_llm_openai.assert_awaited_once_with("What is AI?")
+
+    replay_options = {
+        "cassette_path": cassette_path,
+        "replay_latency": "sampled",
+    }
+    replayer = LLMRunner(LLMConfig(provider="replay", options=replay_options))
+    replayer._call_llm_openai = AsyncMock()
+
+    assert replayer.run_sync("What is AI?") == "recorded answer"
+    replayer._call_llm_openai.assert_not_called()
+    with pytest.raises(KeyError):
+        replayer.run_sync("Never recorded")
+
+
+def test_replay_provider_requires_cassette():
+    """The replay provider fails clearly without a cassette path."""
+    with pytest.raises(ValueError, match="cassette_path"):
+        LLMRunner(LLMConfig(provider="replay")).run_sync("prompt")
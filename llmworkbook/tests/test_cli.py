@@ -105,3 +105,22 @@ def test_cli_help():
 
     assert result.returncode == 0
     assert "CLI for wrapping data and testing LLM connectivity." in result.stdout
+
+
+def test_cli_plan(tmp_path):
+    """Test planning a run over a wrapped file using the CLI."""
+    input_path = tmp_path / "wrapped.csv"
+    with open(input_path, "w") as f:
+        f.write("wrapped_output\n")
+        f.write("<data></data><prompt>Summarize this</prompt>\n")
+        f.write("<data></data><prompt>Translate this</prompt>\n")
+    result = subprocess.run(
+        ["llmworkbook", "plan", str(input_path), "--rpm", "60", "--max_tokens", "10"],
+        capture_output=True,
+        text=True,
+    )
+
+    assert result.returncode == 0
+    assert "Plan for 2 rows" in result.stdout
+    assert "Output tokens: 20" in result.stdout
+    assert "bound by rpm" in result.stdout
@@ -0,0 +1,205 @@
+# pylint: skip-file
+import asyncio
+import pytest
+from unittest.mock import AsyncMock
+from llmworkbook import LLMConfig, LLMRunner
+from llmworkbook.concurrency import (
+    AdaptiveConcurrencyLimiter,
+    ConcurrencyLimiter,
+    HedgingPolicy,
+)
+from .mock_server import MockChatServer
+
+
+@pytest.mark.asyncio
+async def test_fixed_limiter_bounds_concurrency():
+    """No more than `limit` coroutines hold a slot at once."""
+    limiter = ConcurrencyLimiter(limit=3)
+    peak = 0
+
+    async def task():
+        nonlocal peak
+        await limiter.acquire()
+        peak = max(peak, limiter.in_flight)
+        await asyncio.sleep(0.01)
+        limiter.release(0.01)
+
+    await asyncio.gather(*(task() for _ in range(20)))
+
+    assert peak == 3
+    assert limiter.stats()["requests"] == 20
+    assert limiter.in_flight == 0
+
+
+def test_adaptive_limiter_grows_additively():
+    """Healthy completions grow the limit by about one per window."""
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=4, max_limit=6)
+    limiter.in_flight = 100
+
+    for _ in range(5):
+        limiter.release(0.1)
+    assert limiter.limit == 5
+
+    for _ in range(100):
+        limiter.release(0.1)
+    assert limiter.limit == 6  # capped at max_limit
+
+
+def test_adaptive_limiter_cuts_multiplicatively_on_overload():
+    """A 429 halves the limit; a burst within the cooldown counts once."""
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=16, min_limit=2, cooldown=60)
+    limiter.in_flight = 100
+
+    limiter.release(0.1, overloaded=True)
+    limiter.release(0.1, overloaded=True)
+
+    assert limiter.limit == 8
+    assert limiter.stats()["decreases"] == 1
+    assert limiter.stats()["overloads"] == 2
+
+
+def test_adaptive_limiter_pauses_growth_on_slow_latency():
+    """Growth stops while latency is well above the best latency seen."""
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=4, latency_tolerance=2.0)
+    limiter.in_flight = 100
+    limiter.release(0.1)
+    limit = limiter.limit
+
+    for _ in range(50):
+        limiter.release(5.0)
+
+    assert limiter.limit == limit
+
+
+def test_runner_feeds_rate_limits_to_limiter():
+    """429s from the provider shrink the runner's concurrency limit."""
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=8, cooldown=0)
+    with MockChatServer(rate_limit_ratio=1.0) as server:
+        config = LLMConfig(
+            provider="openai_compatible",
+            base_url=server.base_url,
+            options={"max_retries": 0},
+        )
+        runner = LLMRunner(config, limiter=limiter)
+
+        for _ in range(2):
+            with pytest.raises(Exception, match="429"):
+                runner.run_sync("Hello")
+
+    stats = runner.stats()["concurrency"]
+    assert stats["limit"] == 2
+    assert stats["overloads"] == 2
+    assert stats["in_flight"] == 0
+
+
+def _slow_then_fast_runner(hedging):
+    """Runner whose first call hangs and every later call answers quickly."""
+    runner = LLMRunner(LLMConfig(provider="openai"), hedging=hedging)
+    calls = []
+
+    async def dispatch(provider, prompt):
+        calls.append(prompt)
+        if len(calls) == 1:
+            await asyncio.sleep(5)
+            return "slow"
+        return "fast"
+
+    runner._dispatch = dispatch
+    return runner, calls
+
+
+@pytest.mark.asyncio
+async def test_hedged_request_takes_first_answer():
+    """A call slower than the observed tail latency is hedged; the hedge wins."""
+    policy = HedgingPolicy(percentile=95, max_extra_load=1.0, min_samples=3)
+    for latency in (0.01, 0.01, 0.02):
+        policy.record(latency)
+    runner, calls = _slow_then_fast_runner(policy)
+
+    response = await asyncio.wait_for(runner.run("prompt"), timeout=1)
+
+    assert response == "fast"
+    assert len(calls) == 2
+    stats = runner.stats()["hedging"]
+    assert stats["hedges"] == 1
+    assert stats["hedge_wins"] == 1
+
+
+@pytest.mark.asyncio
+async def test_hedging_respects_extra_load_cap():
+    """No hedge is sent when it would exceed the extra-load budget."""
+    policy = HedgingPolicy(max_extra_load=0.5, min_samples=1)
+    policy.record(0.01)
+    runner, calls = _slow_then_fast_runner(policy)
+
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(runner.run("prompt"), timeout=0.2)
+
+    assert len(calls) == 1  # 1 hedge per 1 request would be 100% extra load
+    assert runner.stats()["hedging"]["hedges"] == 0
+
+
+@pytest.mark.asyncio
+async def test_request_timeout():
+    """The request_timeout option bounds each call."""
+
+    async def hang(prompt):
+        await asyncio.sleep(5)
+
+    runner = LLMRunner(LLMConfig(options={"request_timeout": 0.05}))
+    runner._call_llm_openai = AsyncMock(side_effect=hang)
+
+    with pytest.raises(asyncio.TimeoutError):
+        await runner.run("prompt")
+
+
+@pytest.mark.asyncio
+async def test_queue_wait_does_not_trigger_hedges():
+    """Time queued for a limiter slot counts toward neither the hedge delay nor latency."""
+    policy = HedgingPolicy(max_extra_load=1.0, min_samples=1)
+    policy.record(0.05)
+    limiter = ConcurrencyLimiter(limit=1)
+    runner = LLMRunner(LLMConfig(provider="openai"), limiter=limiter, hedging=policy)
+    calls = []
+
+    async def dispatch(provider, prompt):
+        calls.append(prompt)
+        await asyncio.sleep(0.01)
+        return "answer"
+
+    runner._dispatch = dispatch
+    await limiter.acquire()  # Another request holds the only slot for a while
+    asyncio.get_running_loop().call_later(0.2, limiter.release)
+
+    assert await asyncio.wait_for(runner.run("prompt"), timeout=1) == "answer"
+
+    assert calls == ["prompt"]
+    assert policy.stats()["hedges"] == 0
+    assert max(policy._latencies) < 0.15
+
+
+@pytest.mark.asyncio
+async def test_externally_cancelled_hedge_is_not_an_exception():
+    """A hedged call cancelled from outside surfaces the other call's result."""
+    policy = HedgingPolicy(max_extra_load=1.0, min_samples=1)
+    policy.record(0.01)
+    runner = LLMRunner(LLMConfig(provider="openai"), hedging=policy)
+    tasks = []
+    original = runner._run_once
+
+    def run_once(*args, **kwargs):
+        task = asyncio.ensure_future(original(*args, **kwargs))
+        tasks.append(task)
+        return task
+
+    async def dispatch(provider, prompt):
+        if len(tasks) == 1:
+            await asyncio.sleep(5)
+        tasks[0].cancel()  # The primary is cancelled from outside
+        await asyncio.sleep(0.01)
+        return "hedge"
+
+    runner._run_once = run_once
+    runner._dispatch = dispatch
+
+    assert await asyncio.wait_for(runner.run("prompt"), timeout=1) == "hedge"
@@ -0,0 +1,66 @@
+# pylint: skip-file
+import numpy as np
+import pandas as pd
+import pytest
+from llmworkbook import LLMConfig, LLMDataFrameIntegrator, LLMRunner
+from llmworkbook.concurrency import ConcurrencyLimiter
+from .mock_server import MockChatServer
+
+
+@pytest.fixture
+def texts():
+    return pd.DataFrame(
+        {"text": ["Great product", "Muy bueno", "", "Great product", None, "Broken"]}
+    )
+
+
+def make_runner(server, **options):
+    return LLMRunner(
+        LLMConfig(
+            provider="openai_compatible", base_url=server.base_url, options=options
+        ),
+        limiter=ConcurrencyLimiter(4),
+    )
+
+
+@pytest.mark.parametrize("async_mode", [False, True])
+def test_add_embeddings_batches_and_dedups(texts, async_mode):
+    """Unique texts are packed into batches and scattered back to their rows."""
+    with MockChatServer(embedding_dim=4) as server:
+        integrator = LLMDataFrameIntegrator(runner=make_runner(server), df=texts)
+
+        vectors = integrator.add_embeddings("text", async_mode=async_mode, batch_size=2)
+
+        assert vectors.dtype == np.float32 and vectors.shape == (6, 4)
+        assert vectors.flags["C_CONTIGUOUS"]
+        np.testing.assert_array_equal(vectors[0], server.embedding("Great product"))
+        np.testing.assert_array_equal(vectors[3], vectors[0])
+        np.testing.assert_array_equal(vectors[5], server.embedding("Broken"))
+        assert np.isnan(vectors[[2, 4]]).all()
+        # Three unique texts in batches of two
+        assert server.stats["requests"] == 2
+
+
+def test_add_embeddings_memory_mapped(texts, tmp_path):
+    out_path = str(tmp_path / "vectors.npy")
+    with MockChatServer(embedding_dim=4) as server:
+        integrator = LLMDataFrameIntegrator(runner=make_runner(server), df=texts)
+        vectors = integrator.add_embeddings(
+            "text", row_filter=[1, 5], out_path=out_path
+        )
+
+    assert isinstance(vectors, np.memmap)
+    stored = np.load(out_path, mmap_mode="r")
+    np.testing.assert_array_equal(stored[1], server.embedding("Broken"))
+
+
+def test_embed_cache_and_list_encoding():
+    """Cached texts are not requested again; list encoded vectors work as well."""
+    with MockChatServer(embedding_dim=3) as server:
+        runner = make_runner(server, embedding_encoding="float")
+        first = runner.embed_sync(["a", "b"])
+        second = runner.embed_sync(["b", "c"])
+
+        assert server.last_request["payload"]["input"] == ["c"]
+        np.testing.assert_array_equal(second[0], first[1])
+        assert runner.stats()["usage"]["requests"] == 2
@@ -0,0 +1,134 @@
+# pylint: skip-file
+import asyncio
+import pytest
+from llmworkbook import LLMConfig, LLMRunner
+from llmworkbook.endpoints import Endpoint, EndpointPool
+from .mock_server import MockChatServer
+
+
+@pytest.mark.asyncio
+async def test_least_outstanding_respects_weight():
+    """A twice-as-heavy endpoint gets twice the concurrent requests."""
+    pool = EndpointPool([Endpoint(name="a", weight=2), Endpoint(name="b", weight=1)])
+
+    chosen = [(await pool.acquire())[0].name for _ in range(6)]
+
+    assert chosen.count("a") == 4
+    assert chosen.count("b") == 2
+
+
+@pytest.mark.asyncio
+async def test_remaining_quota_and_budget_exhaustion():
+    """Endpoints with the most budget left are preferred; spent ones are skipped."""
+    small = Endpoint(name="small", rpm=1)
+    large = Endpoint(name="large", rpm=3)
+    pool = EndpointPool([small, large], strategy="remaining_quota")
+
+    chosen = [(await pool.acquire())[0].name for _ in range(4)]
+
+    assert sorted(chosen) == ["large", "large", "large", "small"]
+    assert pool.stats()["large"]["remaining_quota"] == 0
+
+
+@pytest.mark.asyncio
+async def test_failing_endpoint_is_ejected():
+    """Consecutive errors eject an endpoint from rotation."""
+    bad = Endpoint(name="bad")
+    good = Endpoint(name="good")
+    pool = EndpointPool([bad, good], eject_after=2, eject_seconds=60)
+
+    for _ in range(2):
+        endpoint, entry = await pool.acquire(exclude={"good"})
+        pool.release(endpoint, entry, latency=0.1, error=RuntimeError("boom"))
+
+    stats = pool.stats()
+    assert stats["bad"]["ejected"]
+    assert stats["bad"]["errors"] == 2
+    chosen = [(await pool.acquire())[0].name for _ in range(3)]
+    assert chosen == ["good", "good", "good"]
+
+
+def test_invalid_pool():
+    with pytest.raises(ValueError):
+        EndpointPool([])
+    with pytest.raises(ValueError):
+        EndpointPool([Endpoint()], strategy="random")
+
+
+def test_endpoint_names_are_unique():
+    """Default names never collide, so statistics and failover see every key."""
+    pool = EndpointPool(
+        [
+            Endpoint(base_url="http://llm:8000/v1", api_key="sk-a-1234"),
+            Endpoint(base_url="http://llm:8000/v1", api_key="sk-b-1234"),
+            Endpoint(base_url="http://llm:8000/v1", api_key="sk-c-5678"),
+        ]
+    )
+
+    assert list(pool.stats()) == [
+        "http://llm:8000/v1 key-...1234",
+        "http://llm:8000/v1 key-...1234 #1",
+        "http://llm:8000/v1 key-...5678",
+    ]
+    with pytest.raises(ValueError, match="Duplicate"):
+        EndpointPool([Endpoint(name="a"), Endpoint(name="a")])
+
+
+def test_runner_fails_over_to_healthy_endpoint():
+    """Rate-limited endpoints are failed over and the healthy one answers."""
+    with MockChatServer(rate_limit_ratio=1.0) as limited, MockChatServer() as healthy:
+        pool = EndpointPool(
+            [
+                Endpoint(base_url=limited.base_url, name="limited", weight=10),
+                Endpoint(base_url=healthy.base_url, name="healthy"),
+            ],
+            eject_after=1,
+        )
+        config = LLMConfig(provider="openai_compatible", options={"max_retries": 0})
+        runner = LLMRunner(config, endpoint_pool=pool)
+
+        for _ in range(3):
+            assert runner.run_sync("Hello") == "Mock response to: Hello"
+
+        stats = pool.stats()
+        assert stats["limited"]["errors"] == 1
+        assert stats["limited"]["ejected"]
+        assert stats["healthy"]["requests"] == 3
+        assert stats["healthy"]["tokens"] > 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_pool_call_releases_its_slot(monkeypatch):
+    """Timed-out or cancelled calls give their slot back without an error."""
+    pool = EndpointPool([Endpoint(name="a", base_url="http://llm/v1")], eject_after=1)
+    runner = LLMRunner(LLMConfig(provider="openai_compatible"), endpoint_pool=pool)
+
+    async def hang(client, prompt):
+        await asyncio.sleep(60)
+
+    monkeypatch.setattr(runner, "_create_completion", hang)
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(runner._call_llm_pool("Hello"), 0.05)
+
+    stats = pool.stats()
+    assert stats["a"]["outstanding"] == 0
+    assert stats["a"]["errors"] == 0
+
+
+@pytest.mark.asyncio
+async def test_caller_errors_do_not_eject_endpoints(monkeypatch):
+    """Non-transient errors (e.g. a 400 for a bad prompt) are not the endpoint's."""
+    pool = EndpointPool([Endpoint(name="a", base_url="http://llm/v1")], eject_after=1)
+    runner = LLMRunner(LLMConfig(provider="openai_compatible"), endpoint_pool=pool)
+
+    async def bad_request(client, prompt):
+        raise ValueError("bad prompt")
+
+    monkeypatch.setattr(runner, "_create_completion", bad_request)
+    with pytest.raises(ValueError):
+        await runner._call_llm_pool("Hello")
+
+    stats = pool.stats()
+    assert stats["a"]["outstanding"] == 0
+    assert stats["a"]["errors"] == 0
+    assert not stats["a"]["ejected"]
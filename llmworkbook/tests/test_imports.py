@@ -0,0 +1,46 @@
+# pylint: skip-file
+import json
+import subprocess
+import sys
+
+import pytest
+
+import llmworkbook
+
+HEAVY_MODULES = ["openai", "pandas", "numpy"]
+
+
+def _loaded_after(code: str) -> list:
+    check = (
+        f"{code}; import json, sys; "
+        f"print(json.dumps([m for m in {HEAVY_MODULES} if m in sys.modules]))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", check], capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout)
+
+
+@pytest.mark.parametrize(
+    "code",
+    [
+        "import llmworkbook",
+        "from llmworkbook import LLMConfig",
+        "import llmworkbook.cli.cli",
+    ],
+)
+def test_import_does_not_load_heavy_modules(code):
+    """Importing the package, its config or the CLI stays free of heavy imports."""
+    assert _loaded_after(code) == []
+
+
+def test_public_names_resolve():
+    for name in llmworkbook.__all__:
+        assert getattr(llmworkbook, name).__name__ == name
+    assert set(llmworkbook.__all__) <= set(dir(llmworkbook))
+    assert sorted(llmworkbook.__all__) == sorted(llmworkbook._LAZY_IMPORTS)
+
+
+def test_unknown_name_raises_attribute_error():
+    with pytest.raises(AttributeError, match="no_such_name"):
+        llmworkbook.no_such_name
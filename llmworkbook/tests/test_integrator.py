@@ -1,5 +1,6 @@
 # pylint: skip-file
-from llmworkbook import LLMDataFrameIntegrator, LLMRunner
+import asyncio
+from llmworkbook import LLMConfig, LLMDataFrameIntegrator, LLMRunner
 import pandas as pd
 import pytest
 from unittest.mock import AsyncMock, MagicMock
@@ -83,6 +84,16 @@ def test_add_llm_responses_with_row_filter(sample_dataframe, mock_runner):
     assert mock_runner.run_sync.call_count == 1  # Only valid prompt processed
 
 
+def test_async_row_filter_unknown_index_raises(sample_dataframe, mock_runner):
+    """A row_filter index missing from the frame raises instead of hanging."""
+    integrator = LLMDataFrameIntegrator(runner=mock_runner, df=sample_dataframe)
+
+    with pytest.raises(KeyError):
+        integrator.add_llm_responses(row_filter=[0, 99], async_mode=True)
+
+    assert mock_runner.run.await_count <= 1
+
+
 def test_reset_responses(sample_dataframe, mock_runner):
     """Test resetting response columns."""
     integrator = LLMDataFrameIntegrator(runner=mock_runner, df=sample_dataframe)
@@ -126,3 +137,340 @@ def test_async_function(sample_dataframe, mock_runner):
         prompt_column="prompt_column", response_column="llm_response", async_mode=True
     )
     output_df
+
+
+def test_add_llm_responses_async_deadline(sample_dataframe, mock_runner):
+    """Rows still running at the deadline are cancelled and keep no response."""
+
+    async def respond(prompt):
+        if prompt == "What is AI?":
+            await asyncio.sleep(5)
+        return f"Async response to: {prompt}"
+
+    mock_runner.run = AsyncMock(side_effect=respond)
+    integrator = LLMDataFrameIntegrator(runner=mock_runner, df=sample_dataframe)
+
+    updated_df = integrator.add_llm_responses(async_mode=True, deadline=0.2)
+
+    assert updated_df.loc[0, "llm_response"] == "Async response to: Hello, world!"
+    assert pd.isna(updated_df.loc[1, "llm_response"])
+    assert updated_df.loc[3, "llm_response"] == "Async response to: Tell me a joke"
+
+
+def test_add_llm_responses_skips_timed_out_rows(sample_dataframe, mock_runner):
+    """Rows whose request times out keep no response; the others are stored."""
+
+    def respond(prompt):
+        if prompt == "What is AI?":
+            raise asyncio.TimeoutError()
+        return f"Response to: {prompt}"
+
+    mock_runner.run_sync.side_effect = respond
+    integrator = LLMDataFrameIntegrator(runner=mock_runner, df=sample_dataframe)
+
+    updated_df = integrator.add_llm_responses()
+
+    assert pd.isna(updated_df.loc[1, "llm_response"])
+    assert updated_df.loc[3, "llm_response"] == "Response to: Tell me a joke"
+
+
+def test_longest_first_schedule(sample_dataframe, mock_runner):
+    """Rows are dispatched longest prompt first and answers land on their own rows."""
+    integrator = LLMDataFrameIntegrator(runner=mock_runner, df=sample_dataframe)
+
+    updated_df = integrator.add_llm_responses(async_mode=True, schedule="longest_first")
+
+    dispatched = [call.args[0] for call in mock_runner.run.await_args_list]
+    assert dispatched == ["Tell me a joke", "Hello, world!", "What is AI?"]
+    assert updated_df.loc[1, "llm_response"] == "Async response to: What is AI?"
+
+
+def test_priority_column_schedule(sample_dataframe, mock_runner):
+    """A priority column orders dispatch highest first."""
+    integrator = LLMDataFrameIntegrator(runner=mock_runner, df=sample_dataframe)
+
+    integrator.add_llm_responses(priority_column="other_column")
+
+    dispatched = [call.args[0] for call in mock_runner.run_sync.call_args_list]
+    assert dispatched == ["Tell me a joke", "What is AI?", "Hello, world!"]
+
+
+def test_prefix_schedule(mock_runner):
+    """Rows sharing a prompt prefix are dispatched together."""
+    df = pd.DataFrame(
+        {
+            "prompt_column": [
+                "Translate: a",
+                "Summarize: b",
+                "Translate: c",
+                "Summarize: d",
+            ]
+        }
+    )
+    integrator = LLMDataFrameIntegrator(runner=mock_runner, df=df)
+
+    updated_df = integrator.add_llm_responses(schedule="prefix")
+
+    dispatched = [call.args[0] for call in mock_runner.run_sync.call_args_list]
+    assert dispatched == [
+        "Summarize: b",
+        "Summarize: d",
+        "Translate: a",
+        "Translate: c",
+    ]
+    assert updated_df.loc[2, "llm_response"] == "Response to: Translate: c"
+
+
+def test_unknown_schedule(sample_dataframe, mock_runner):
+    integrator = LLMDataFrameIntegrator(runner=mock_runner, df=sample_dataframe)
+
+    with pytest.raises(ValueError):
+        integrator.add_llm_responses(schedule="random")
+
+
+@pytest.mark.asyncio
+async def test_aiter_responses(sample_dataframe, mock_runner):
+    """Results are yielded per row with metadata and stored in the frame."""
+    integrator = LLMDataFrameIntegrator(runner=mock_runner, df=sample_dataframe)
+
+    results = {}
+    async for idx, response, metadata in integrator.aiter_responses():
+        results[idx] = response
+        assert metadata["error"] is None
+        assert metadata["latency"] >= 0
+
+    assert results == {
+        0: "Async response to: Hello, world!",
+        1: "Async response to: What is AI?",
+        3: "Async response to: Tell me a joke",
+    }
+    assert integrator.df.loc[3, "llm_response"] == "Async response to: Tell me a joke"
+
+
+@pytest.mark.asyncio
+async def test_aiter_responses_backpressure(sample_dataframe, mock_runner):
+    """With buffer_size=1 no new row is dispatched until the last one is consumed."""
+    integrator = LLMDataFrameIntegrator(runner=mock_runner, df=sample_dataframe)
+
+    dispatched = []
+    async for _ in integrator.aiter_responses(buffer_size=1):
+        dispatched.append(mock_runner.run.await_count)
+
+    assert dispatched == [1, 2, 3]
+
+
+def test_iter_responses(sample_dataframe, mock_runner):
+    """The sync generator yields the same results and can be stopped early."""
+    integrator = LLMDataFrameIntegrator(runner=mock_runner, df=sample_dataframe)
+
+    responses = integrator.iter_responses(schedule="longest_first", buffer_size=1)
+    first = next(responses)
+    responses.close()
+
+    assert first == (3, "Async response to: Tell me a joke", first[2])
+    assert pd.isna(integrator.df.loc[1, "llm_response"])
+
+
+def test_add_llm_responses_on_token(sample_dataframe):
+    """`on_token` receives the row index with every streamed delta."""
+
+    async def run(prompt, on_token=None):
+        for word in ["Re", "ply"]:
+            on_token(word)
+        return "Reply"
+
+    runner = MagicMock(spec=LLMRunner)
+    runner.run = AsyncMock(side_effect=run)
+    integrator = LLMDataFrameIntegrator(runner=runner, df=sample_dataframe)
+    progress = []
+
+    updated_df = integrator.add_llm_responses(
+        prompt_column="prompt_column",
+        async_mode=True,
+        on_token=lambda idx, delta: progress.append((idx, delta)),
+    )
+
+    assert updated_df.loc[0, "llm_response"] == "Reply"
+    assert sorted(progress) == sorted(
+        [(idx, word) for idx in (0, 1, 3) for word in ["Re", "ply"]]
+    )
+
+
+@pytest.fixture
+def config_runner(mock_runner):
+    """Mock runner with a real config, as fingerprints hash it."""
+    mock_runner.config = LLMConfig(options={"model_name": "gpt-4o-mini"})
+    return mock_runner
+
+
+@pytest.mark.parametrize("async_mode", [False, True])
+def test_incremental_reruns_changed_rows_only(
+    sample_dataframe, config_runner, async_mode
+):
+    """Only rows with a changed prompt, data column or config are dispatched again."""
+    integrator = LLMDataFrameIntegrator(runner=config_runner, df=sample_dataframe)
+    run = config_runner.run if async_mode else config_runner.run_sync
+    kwargs = dict(
+        prompt_column="prompt_column",
+        async_mode=async_mode,
+        incremental=True,
+        fingerprint_columns=["other_column"],
+    )
+
+    integrator.add_llm_responses(**kwargs)
+    assert run.call_count == 3
+    assert "_llm_response_fingerprint" in sample_dataframe.columns
+
+    integrator.add_llm_responses(**kwargs)
+    assert run.call_count == 3
+
+    sample_dataframe.loc[1, "other_column"] = 20
+    sample_dataframe.loc[3, "llm_response"] = None
+    integrator.add_llm_responses(**kwargs)
+    assert run.call_count == 5
+
+    config_runner.config.options["temperature"] = 0.0
+    integrator.add_llm_responses(**kwargs)
+    assert run.call_count == 8
+
+
+def test_incremental_fingerprint_sidecar(sample_dataframe, config_runner, tmp_path):
+    """With a sidecar file the DataFrame gets no fingerprint column."""
+    path = str(tmp_path / "fingerprints.pkl")
+    integrator = LLMDataFrameIntegrator(
+        runner=config_runner, df=sample_dataframe, fingerprint_path=path
+    )
+    integrator.add_llm_responses(prompt_column="prompt_column", incremental=True)
+    assert config_runner.run_sync.call_count == 3
+    assert "_llm_response_fingerprint" not in sample_dataframe.columns
+
+    # A new integrator over the same data picks the sidecar up
+    integrator = LLMDataFrameIntegrator(
+        runner=config_runner, df=sample_dataframe, fingerprint_path=path
+    )
+    integrator.add_llm_responses(prompt_column="prompt_column", incremental=True)
+    assert config_runner.run_sync.call_count == 3
+
+
+@pytest.mark.parametrize("async_mode", [False, True])
+def test_polars_frame(sample_dataframe, mock_runner, async_mode):
+    """Polars frames get the response column attached, addressed by position."""
+    pl = pytest.importorskip("polars")
+    df = pl.from_pandas(sample_dataframe)
+    integrator = LLMDataFrameIntegrator(runner=mock_runner, df=df)
+
+    updated_df = integrator.add_llm_responses(
+        prompt_column="prompt_column",
+        async_mode=async_mode,
+        schedule="longest_first",
+    )
+
+    prefix = "Async response to: " if async_mode else "Response to: "
+    assert isinstance(updated_df, pl.DataFrame)
+    assert updated_df["llm_response"].to_list() == [
+        prefix + "Hello, world!",
+        prefix + "What is AI?",
+        None,
+        prefix + "Tell me a joke",
+    ]
+    assert integrator.df is updated_df
+
+
+def test_polars_lazy_frame_iter_responses(sample_dataframe, mock_runner):
+    """A LazyFrame comes back lazy, with the responses streamed on the way."""
+    pl = pytest.importorskip("polars")
+    integrator = LLMDataFrameIntegrator(
+        runner=mock_runner, df=pl.from_pandas(sample_dataframe).lazy()
+    )
+
+    results = list(
+        integrator.iter_responses(prompt_column="prompt_column", row_filter=[0, 3])
+    )
+
+    assert sorted(idx for idx, _, _ in results) == [0, 3]
+    assert isinstance(integrator.df, pl.LazyFrame)
+    assert integrator.df.collect()["llm_response"].to_list() == [
+        "Async response to: Hello, world!",
+        None,
+        None,
+        "Async response to: Tell me a joke",
+    ]
+
+
+@pytest.mark.parametrize("async_mode", [False, True])
+def test_arrow_string_storage(sample_dataframe, mock_runner, monkeypatch, async_mode):
+    """Responses land in an Arrow-backed column, written in bulk."""
+    pytest.importorskip("pyarrow")
+    from llmworkbook import integrator as integrator_module
+
+    monkeypatch.setattr(integrator_module, "_FLUSH_EVERY", 2)
+    integrator = LLMDataFrameIntegrator(
+        runner=mock_runner, df=sample_dataframe, string_storage="pyarrow"
+    )
+
+    updated_df = integrator.add_llm_responses(
+        prompt_column="prompt_column", async_mode=async_mode
+    )
+
+    prefix = "Async response to: " if async_mode else "Response to: "
+    assert updated_df["llm_response"].dtype == pd.StringDtype("pyarrow")
+    assert updated_df.loc[0, "llm_response"] == prefix + "Hello, world!"
+    assert updated_df.loc[3, "llm_response"] == prefix + "Tell me a joke"
+    assert pd.isna(updated_df.loc[2, "llm_response"])
+
+    integrator.reset_responses()
+    assert updated_df["llm_response"].dtype == pd.StringDtype("pyarrow")
+    assert updated_df["llm_response"].isna().all()
+
+
+@pytest.mark.parametrize("async_mode", [False, True])
+def test_arrow_prompt_column_with_missing_prompt(mock_runner, async_mode):
+    """A missing prompt in an Arrow-backed column (pd.NA) is skipped."""
+    pytest.importorskip("pyarrow")
+    df = pd.DataFrame(
+        {"prompt_column": pd.array(["Hello", None, "Bye"], dtype="string[pyarrow]")}
+    )
+    integrator = LLMDataFrameIntegrator(runner=mock_runner, df=df)
+
+    updated_df = integrator.add_llm_responses(async_mode=async_mode)
+
+    prefix = "Async response to: " if async_mode else "Response to: "
+    assert updated_df.loc[0, "llm_response"] == prefix + "Hello"
+    assert pd.isna(updated_df.loc[1, "llm_response"])
+    assert updated_df.loc[2, "llm_response"] == prefix + "Bye"
+
+
+@pytest.mark.parametrize("async_mode", [False, True])
+def test_structured_output(mock_runner, async_mode):
+    """JSON responses become typed columns; invalid ones are re-run."""
+    from llmworkbook import OutputSchema
+
+    attempts = {}
+
+    def respond(prompt, response_format=None):
+        assert response_format["type"] == "json_schema"
+        attempts[prompt] = attempts.get(prompt, 0) + 1
+        if prompt == "flaky" and attempts[prompt] == 1:
+            return "Sure! Here is the JSON"
+        if prompt == "broken":
+            return "{"
+        return f'{{"label": "{prompt}", "score": 0.5}}'
+
+    async def arespond(prompt, response_format=None):
+        return respond(prompt, response_format)
+
+    mock_runner.run_sync.side_effect = respond
+    mock_runner.run = AsyncMock(side_effect=arespond)
+    df = pd.DataFrame({"prompt_column": ["ok", "flaky", "broken", ""]})
+    integrator = LLMDataFrameIntegrator(runner=mock_runner, df=df)
+
+    updated_df = integrator.add_llm_responses(
+        output_schema=OutputSchema({"label": str, "score": float}),
+        async_mode=async_mode,
+        max_invalid_retries=2,
+    )
+
+    assert updated_df["label"].tolist()[:2] == ["ok", "flaky"]
+    assert str(updated_df["score"].dtype) == "Float64"
+    assert pd.isna(updated_df.loc[2, "label"]) and pd.isna(updated_df.loc[3, "label"])
+    assert attempts == {"ok": 1, "flaky": 2, "broken": 3}
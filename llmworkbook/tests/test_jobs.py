@@ -0,0 +1,190 @@
+# pylint: skip-file
+import os
+import signal
+import threading
+import time
+
+import pandas as pd
+import pytest
+from llmworkbook import LLMConfig, LLMDataFrameIntegrator, LLMRunner
+from llmworkbook.concurrency import ConcurrencyLimiter
+from .mock_server import MockChatServer
+
+
+def make_runner(server):
+    return LLMRunner(
+        LLMConfig(provider="openai_compatible", base_url=server.base_url),
+        limiter=ConcurrencyLimiter(4),
+    )
+
+
+def make_frame(rows):
+    return pd.DataFrame({"prompt": [f"Prompt {i}" for i in range(rows)]})
+
+
+def test_submit_runs_in_background():
+    with MockChatServer(latency=0.01) as server:
+        df = make_frame(20).assign(prompt=lambda df: df.prompt.where(df.index != 5, ""))
+        integrator = LLMDataFrameIntegrator(runner=make_runner(server), df=df)
+        job = integrator.submit("prompt", handle_signals=False)
+        assert job.progress()["total"] == 19
+
+        result = job.result(timeout=30)
+
+    progress = job.progress()
+    assert progress["state"] == "finished"
+    assert (progress["done"], progress["failed"], progress["in_flight"]) == (19, 0, 0)
+    assert progress["eta"] == 0.0 and progress["rows_per_second"] > 0
+    assert result["llm_response"][0] == "Mock response to: Prompt 0"
+    assert result["llm_response"][5] is None
+    assert len(job.results()) == 19
+
+
+def test_cancel_drains_and_checkpoint_resumes(tmp_path):
+    """Cancelled jobs keep the responses in flight; a new job resumes after them."""
+    checkpoint = str(tmp_path / "job.pkl")
+    with MockChatServer(latency=0.05) as server:
+        integrator = LLMDataFrameIntegrator(
+            runner=make_runner(server), df=make_frame(40)
+        )
+        job = integrator.submit(
+            "prompt", max_in_flight=4, checkpoint_path=checkpoint, handle_signals=False
+        )
+        time.sleep(0.12)
+        assert job.cancel(timeout=30)
+
+        progress = job.progress()
+        assert progress["state"] == "cancelled"
+        assert progress["in_flight"] == 0 and progress["failed"] == 0
+        assert 0 < progress["done"] < 40
+        done = job.results()
+        stored = integrator.df["llm_response"].dropna()
+        assert stored.to_dict() == done
+        assert pd.read_pickle(checkpoint).to_dict() == done
+
+        # A new integrator resumes from the checkpoint
+        requests = server.stats["requests"]
+        resumed = LLMDataFrameIntegrator(runner=make_runner(server), df=make_frame(40))
+        job = resumed.submit("prompt", checkpoint_path=checkpoint, handle_signals=False)
+        result = job.result(timeout=30)
+        assert server.stats["requests"] - requests == 40 - len(done)
+
+    assert result["llm_response"].notna().all()
+    assert len(pd.read_pickle(checkpoint)) == 40
+
+
+def test_failed_rows_do_not_stop_the_job():
+    with MockChatServer() as server:
+        integrator = LLMDataFrameIntegrator(
+            runner=make_runner(server), df=make_frame(5)
+        )
+        run = integrator.runner.run
+
+        async def flaky(prompt, **kwargs):
+            if prompt == "Prompt 2":
+                raise RuntimeError("boom")
+            return await run(prompt, **kwargs)
+
+        integrator.runner.run = flaky
+        job = integrator.submit("prompt", handle_signals=False)
+        job.result(timeout=30)
+
+    assert job.progress()["failed"] == 1 and job.progress()["done"] == 4
+    assert isinstance(job.errors[2], RuntimeError)
+
+
+@pytest.mark.skipif(not hasattr(signal, "SIGTERM"), reason="needs SIGTERM")
+def test_signal_flushes_partial_results(tmp_path):
+    checkpoint = str(tmp_path / "job.pkl")
+    received = []
+    previous = signal.signal(signal.SIGTERM, lambda *args: received.append(args[0]))
+    try:
+        with MockChatServer(latency=0.05) as server:
+            integrator = LLMDataFrameIntegrator(
+                runner=make_runner(server), df=make_frame(40)
+            )
+            job = integrator.submit(
+                "prompt", max_in_flight=4, checkpoint_path=checkpoint
+            )
+            time.sleep(0.12)
+            os.kill(os.getpid(), signal.SIGTERM)
+
+            assert job.done() and job.progress()["state"] == "cancelled"
+            assert received == [signal.SIGTERM]
+            assert pd.read_pickle(checkpoint).to_dict() == job.results()
+            # The previous handler is back
+            assert signal.getsignal(signal.SIGTERM) is not job._on_signal
+    finally:
+        signal.signal(signal.SIGTERM, previous)
+
+
+def test_second_signal_interrupts_the_drain():
+    """While a signalled job drains, the previous handler gets the next signal."""
+    received = []
+    previous = signal.signal(signal.SIGTERM, lambda *args: received.append(job.done()))
+    try:
+        with MockChatServer(latency=0.5) as server:
+            integrator = LLMDataFrameIntegrator(
+                runner=make_runner(server), df=make_frame(8)
+            )
+            job = integrator.submit("prompt", max_in_flight=4)
+            time.sleep(0.1)
+            threading.Timer(0.1, os.kill, (os.getpid(), signal.SIGTERM)).start()
+            os.kill(os.getpid(), signal.SIGTERM)
+
+            # The second signal arrived mid-drain, the first once the job stopped
+            assert received == [False, True]
+    finally:
+        signal.signal(signal.SIGTERM, previous)
+
+
+def test_checkpoint_is_saved_while_running(tmp_path):
+    """Responses are saved periodically, not only when the job stops."""
+    checkpoint = str(tmp_path / "job.pkl")
+    with MockChatServer(latency=0.05) as server:
+        integrator = LLMDataFrameIntegrator(
+            runner=make_runner(server), df=make_frame(40)
+        )
+        job = integrator.submit(
+            "prompt",
+            max_in_flight=4,
+            checkpoint_path=checkpoint,
+            checkpoint_every=5,
+            handle_signals=False,
+        )
+        deadline = time.monotonic() + 10
+        while not os.path.exists(checkpoint) and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        assert not job.done()
+        saved = pd.read_pickle(checkpoint).to_dict()
+        assert len(saved) >= 5
+        assert all(job.results()[idx] == response for idx, response in saved.items())
+        job.cancel(timeout=30)
+
+
+@pytest.mark.skipif(not hasattr(signal, "SIGTERM"), reason="needs SIGTERM")
+def test_signal_drain_is_bounded(tmp_path):
+    """A stuck request does not hold a signal back past the drain timeout."""
+    checkpoint = str(tmp_path / "job.pkl")
+    received = []
+    previous = signal.signal(signal.SIGTERM, lambda *args: received.append(args[0]))
+    try:
+        with MockChatServer(latency=2) as server:
+            df = make_frame(4)
+            integrator = LLMDataFrameIntegrator(runner=make_runner(server), df=df)
+            job = integrator.submit(
+                "prompt", checkpoint_path=checkpoint, handle_signals=False
+            )
+            job.handle_signals(drain_timeout=0.2)
+            time.sleep(0.1)
+            start = time.monotonic()
+            os.kill(os.getpid(), signal.SIGTERM)
+
+            assert time.monotonic() - start < 2
+            assert received == [signal.SIGTERM]
+            assert not job.done()
+            assert pd.read_pickle(checkpoint).empty
+            job.cancel(drain=False, timeout=30)
+    finally:
+        signal.signal(signal.SIGTERM, previous)
@@ -0,0 +1,31 @@
+# pylint: skip-file
+import pytest
+from llmworkbook import LLMConfig, LLMRunner
+from .mock_server import MockChatServer
+
+
+@pytest.fixture
+def mock_server():
+    """Fixture running the mock chat-completions server."""
+    with MockChatServer(latency=0.001, seed=0) as server:
+        yield server
+
+
+def test_runner_against_mock_server(mock_server, monkeypatch):
+    """The OpenAI provider should work end to end against the mock server."""
+    monkeypatch.setenv("OPENAI_BASE_URL", mock_server.base_url)
+    runner = LLMRunner(LLMConfig(provider="openai", api_key="mock-key"))
+
+    assert runner.run_sync("Hello") == "Mock response to: Hello"
+    assert mock_server.stats["requests"] == 1
+
+
+def test_mock_server_rate_limits(monkeypatch):
+    """With a rate limit ratio of 1 every request is rejected with a 429."""
+    with MockChatServer(rate_limit_ratio=1.0) as server:
+        monkeypatch.setenv("OPENAI_BASE_URL", server.base_url)
+        config = LLMConfig(provider="openai", api_key="mock-key")
+
+        with pytest.raises(Exception, match="429"):
+            LLMRunner(config).run_sync("Hello")
+        assert server.stats["rate_limited"] == server.stats["requests"] >= 1
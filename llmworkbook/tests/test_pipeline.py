@@ -0,0 +1,75 @@
+# pylint: skip-file
+import pandas as pd
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from llmworkbook import LLMDataFrameIntegrator, LLMRunner, PipelineStage
+from llmworkbook.pipeline import order_stages
+
+
+@pytest.fixture
+def reviews():
+    return pd.DataFrame({"review": ["Great product", "", "Arrived broken"]})
+
+
+@pytest.fixture
+def mock_runner():
+    mock = MagicMock(spec=LLMRunner)
+    mock.run = AsyncMock(side_effect=lambda prompt: f"<{prompt}>")
+    return mock
+
+
+def test_stage_columns():
+    stage = PipelineStage("summary", "Summarize {review} given {category} {{json}}")
+    assert stage.columns == ["review", "category"]
+    assert (
+        stage.render({"review": "r", "category": "c"}) == "Summarize r given c {json}"
+    )
+
+    with pytest.raises(ValueError, match="reads no column"):
+        PipelineStage("summary", "Summarize")
+    with pytest.raises(ValueError, match="own output"):
+        PipelineStage("summary", "Summarize {summary}")
+
+
+def test_order_stages():
+    stages = [
+        PipelineStage("summary", "{review} {entities}"),
+        PipelineStage("entities", "{review} {category}"),
+        PipelineStage("category", "{review}"),
+    ]
+    assert order_stages(stages, ["review"]) == {
+        "category": [],
+        "entities": ["category"],
+        "summary": ["entities"],
+    }
+    with pytest.raises(ValueError, match="unknown column"):
+        order_stages([PipelineStage("a", "{missing}")], ["review"])
+    with pytest.raises(ValueError, match="cycle"):
+        order_stages(
+            [PipelineStage("a", "{review} {b}"), PipelineStage("b", "{a}")], ["review"]
+        )
+
+
+def test_pipeline_runs_stages_per_row(reviews, mock_runner):
+    """A row's next stage is dispatched as soon as its upstream cell is done."""
+    integrator = LLMDataFrameIntegrator(runner=mock_runner, df=reviews)
+
+    df = integrator.add_pipeline_responses(
+        [
+            PipelineStage("summary", "S {category}"),
+            PipelineStage("category", "C {review}"),
+        ],
+        max_in_flight=1,
+    )
+
+    assert df.loc[0, "category"] == "<C Great product>"
+    assert df.loc[0, "summary"] == "<S <C Great product>>"
+    # Empty inputs are skipped, like empty prompts
+    assert pd.isna(df.loc[1, "category"]) and pd.isna(df.loc[1, "summary"])
+    dispatched = [call.args[0] for call in mock_runner.run.await_args_list]
+    assert dispatched == [
+        "C Great product",
+        "S <C Great product>",
+        "C Arrived broken",
+        "S <C Arrived broken>",
+    ]
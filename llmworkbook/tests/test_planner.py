@@ -0,0 +1,63 @@
+# pylint: skip-file
+import pandas as pd
+import pytest
+
+from llmworkbook import Endpoint, EndpointPool, LLMConfig, WrapPromptList
+from llmworkbook import estimate_tokens, plan_run
+
+
+@pytest.fixture
+def config():
+    return LLMConfig(
+        system_prompt=None, options={"model_name": "gpt-4o-mini", "max_tokens": 100}
+    )
+
+
+def test_estimate_tokens_chars():
+    """The character heuristic rounds up to whole tokens."""
+    tokens = estimate_tokens(pd.Series(["abcd", "abcde", "", None]))
+    assert tokens.tolist() == [1, 2, 0, 0]
+
+
+def test_estimate_tokens_unknown_backend():
+    with pytest.raises(ValueError, match="Unknown token backend"):
+        estimate_tokens(["text"], backend="words")
+
+
+def test_plan_run_over_wrapped_output(config):
+    """Tokens and cost add up over the rows of `wrap()` output."""
+    wrapped = WrapPromptList(["a" * 40, "b" * 80]).wrap()
+    result = plan_run(wrapped, config)
+
+    prompt_tokens = estimate_tokens(wrapped["wrapped_output"]).sum()
+    assert result["rows"] == 2
+    assert result["input_tokens"] == prompt_tokens + 2 * 4
+    assert result["output_tokens"] == 200
+    assert result["cost"] == pytest.approx(
+        (result["input_tokens"] * 0.15 + 200 * 0.60) / 1_000_000
+    )
+    assert result["wall_time"] is None
+
+
+def test_plan_run_bottleneck(config):
+    """The wall time is the largest of the quota and concurrency bounds."""
+    prompts = ["x" * 400] * 600
+    result = plan_run(prompts, config, rpm=600, tpm=1_000_000, chunk_size=100)
+
+    assert result["rows"] == 600
+    assert result["bottleneck"] == "rpm"
+    assert result["wall_time"] == pytest.approx(60.0)
+
+    result = plan_run(prompts, config, rpm=600, concurrency=2, latency=1.0)
+    assert result["bottleneck"] == "concurrency"
+    assert result["wall_time"] == pytest.approx(300.0)
+
+
+def test_plan_run_uses_endpoint_pool_quota(config):
+    pool = EndpointPool(
+        [Endpoint(api_key="a", rpm=100), Endpoint(api_key="b", rpm=200)]
+    )
+    result = plan_run(pd.Series(["hello"] * 300), config, endpoint_pool=pool)
+
+    assert result["bottleneck"] == "rpm"
+    assert result["wall_time"] == pytest.approx(60.0)
@@ -1,7 +1,9 @@
 # pylint: skip-file
+import asyncio
 import pytest
 from unittest.mock import AsyncMock, patch
 from llmworkbook import LLMRunner, LLMConfig
+from .mock_server import MockChatServer
 
 
 @pytest.fixture
@@ -102,3 +104,106 @@ async def test_call_llm_openai(mock_config):
             ],
             temperature=mock_config.options["temperature"],
         )
+
+
+@pytest.mark.asyncio
+async def test_usage_reports_cached_tokens(mock_config):
+    """Prompt, completion and cached prompt tokens are summed from the usage."""
+    from types import SimpleNamespace
+
+    runner = LLMRunner(config=mock_config)
+    completion = SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content="ok"))],
+        usage=SimpleNamespace(
+            prompt_tokens=200,
+            completion_tokens=10,
+            prompt_tokens_details=SimpleNamespace(cached_tokens=150),
+        ),
+    )
+    with patch(
+        "openai.resources.chat.completions.Completions.create",
+        return_value=completion,
+    ):
+        await runner._call_llm_openai("One")
+        await runner._call_llm_openai("Two")
+
+    usage = runner.stats()["usage"]
+    assert usage["requests"] == 2
+    assert usage["prompt_tokens"] == 400
+    assert usage["cached_tokens"] == 300
+    assert usage["cache_hit_ratio"] == 0.75
+
+
+@pytest.mark.asyncio
+async def test_provider_openai_compatible_requires_base_url():
+    """The openai_compatible provider fails clearly without a base_url."""
+    with pytest.raises(ValueError, match="base_url"):
+        await LLMRunner(config=LLMConfig(provider="openai_compatible")).run("prompt")
+
+
+def test_openai_compatible_against_local_server():
+    """The openai_compatible provider sends model, headers and prompt to base_url."""
+    with MockChatServer(seed=0) as server:
+        config = LLMConfig(
+            provider="openai_compatible",
+            base_url=server.base_url,
+            headers={"X-Team": "data"},
+            options={"model_name": "llama-3-8b-instruct"},
+        )
+        runner = LLMRunner(config)
+
+        assert runner.run_sync("Hello") == "Mock response to: Hello"
+        assert runner.run_sync("Again") == "Mock response to: Again"
+        assert server.last_request["headers"]["X-Team"] == "data"
+        assert server.last_request["payload"]["model"] == "llama-3-8b-instruct"
+        # One pooled client is reused across calls
+        assert len(runner._clients) == 1
+
+
+def test_openai_compatible_retries_rate_limits():
+    """429 responses are retried up to `max_retries`."""
+    with MockChatServer(rate_limit_ratio=0.5, seed=1) as server:
+        config = LLMConfig(
+            provider="openai_compatible",
+            base_url=server.base_url,
+            options={"max_retries": 10},
+        )
+        runner = LLMRunner(config)
+
+        for _ in range(5):
+            assert runner.run_sync("Hello") == "Mock response to: Hello"
+        assert server.stats["rate_limited"] > 0
+
+
+def test_stream_against_local_server():
+    """`stream` yields deltas that join to the full response and calls on_token."""
+    with MockChatServer(seed=0) as server:
+        config = LLMConfig(provider="openai_compatible", base_url=server.base_url)
+        runner = LLMRunner(config)
+        seen = []
+
+        async def collect():
+            return [
+                delta
+                async for delta in runner.stream("Tell a story", on_token=seen.append)
+            ]
+
+        deltas = asyncio.run(collect())
+
+        assert len(deltas) > 1
+        assert "".join(deltas) == "Mock response to: Tell a story"
+        assert seen == deltas
+        assert server.last_request["payload"]["stream"] is True
+
+
+def test_run_sync_with_on_token_streams():
+    """`run_sync(on_token=...)` streams the response and returns the full text."""
+    with MockChatServer(seed=0) as server:
+        config = LLMConfig(provider="openai_compatible", base_url=server.base_url)
+        runner = LLMRunner(config)
+        seen = []
+
+        assert (
+            runner.run_sync("Hello", on_token=seen.append) == "Mock response to: Hello"
+        )
+        assert "".join(seen) == "Mock response to: Hello"
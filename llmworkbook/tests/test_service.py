@@ -0,0 +1,139 @@
+# pylint: skip-file
+import asyncio
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+import pytest
+from llmworkbook import (
+    LLMConfig,
+    LLMDataFrameIntegrator,
+    LLMRunner,
+    LLMService,
+    LLMServiceClient,
+    WrapDataFrame,
+)
+from llmworkbook.concurrency import ConcurrencyLimiter
+from .mock_server import MockChatServer
+
+
+@pytest.fixture
+def server():
+    with MockChatServer(latency=0.02, embedding_dim=4) as server:
+        yield server
+
+
+@pytest.fixture
+def service(server):
+    runner = LLMRunner(
+        LLMConfig(
+            provider="openai_compatible",
+            base_url=server.base_url,
+            api_key="secret",
+            options={"temperature": 0},
+        ),
+        limiter=ConcurrencyLimiter(4),
+    )
+    with LLMService(runner) as service:
+        yield service
+
+
+@pytest.fixture
+def client(service):
+    host, port = service.address
+    with LLMServiceClient(f"http://{host}:{port}") as client:
+        yield client
+
+
+def test_client_replaces_runner(server, client):
+    """Integrators share the service's runner and its response cache."""
+    df = pd.DataFrame({"prompt": ["a", "b", "a", ""]})
+    first = LLMDataFrameIntegrator(runner=client, df=df.copy())
+    second = LLMDataFrameIntegrator(runner=client, df=df.copy())
+
+    first.add_llm_responses("prompt")
+    second.add_llm_responses("prompt", async_mode=True)
+
+    for integrator in (first, second):
+        assert integrator.df["llm_response"].tolist()[:3] == [
+            "Mock response to: a",
+            "Mock response to: b",
+            "Mock response to: a",
+        ]
+    # Two distinct prompts reach the provider, everything else is cached
+    assert server.stats["requests"] == 2
+    stats = client.stats()
+    assert stats["service"]["requests"] == 6
+    assert stats["service"]["cache_hits"] == 4
+    assert stats["usage"]["requests"] == 2
+
+
+def test_identical_requests_in_flight_are_coalesced(server, client):
+    async def main():
+        return await asyncio.gather(*(client.run("same") for _ in range(5)))
+
+    assert asyncio.run(main()) == ["Mock response to: same"] * 5
+    assert server.stats["requests"] == 1
+    assert client.stats()["service"]["coalesced"] == 4
+
+
+def test_coalesced_requests_survive_the_first_caller_leaving(server, service):
+    """Cancelling the request that started a provider call leaves its waiters be."""
+
+    async def main():
+        first = asyncio.ensure_future(service.run("shared"))
+        await asyncio.sleep(0)
+        second = asyncio.ensure_future(service.run("shared"))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(main()) == "Mock response to: shared"
+    assert server.stats["requests"] == 1
+
+
+def test_start_raises_when_the_port_is_taken(service):
+    """A failed bind is raised from start() instead of blocking it."""
+    host, port = service.address
+    runner = LLMRunner(LLMConfig(provider="openai_compatible", base_url="http://x"))
+    with pytest.raises(OSError):
+        LLMService(runner).start(host, port)
+
+
+def test_config_has_no_credentials(client):
+    assert client.config.options["temperature"] == 0
+    assert client.config.api_key is None
+
+
+def test_embed_and_wrap(server, client):
+    vectors = client.embed_sync(["x", "y"])
+    assert vectors.dtype == np.float32
+    np.testing.assert_array_equal(vectors[1], server.embedding("y"))
+
+    df = pd.DataFrame(
+        {"prompt": ["Summarize", "Translate"], "Reviews": ["Great", "Muy bueno"]},
+        index=[10, 20],
+    )
+    options = {
+        "prompt_column": "prompt",
+        "data_columns": ["Reviews"],
+        "wrap_format": "kv",
+    }
+    wrapped = client.wrap(df, **options)
+    pd.testing.assert_frame_equal(wrapped, WrapDataFrame(df, **options).wrap())
+
+    with pytest.raises(RuntimeError, match="400"):
+        client.wrap(df, prompt_column="missing")
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs Unix sockets")
+def test_unix_socket(server):
+    runner = LLMRunner(
+        LLMConfig(provider="openai_compatible", base_url=server.base_url)
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "llmworkbook.sock")
+        with LLMService(runner).start(unix_socket=path):
+            with LLMServiceClient(unix_socket=path) as client:
+                assert client.run_sync("hi") == "Mock response to: hi"
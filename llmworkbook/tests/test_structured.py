@@ -0,0 +1,50 @@
+# pylint: skip-file
+import pandas as pd
+import pytest
+from llmworkbook import OutputSchema
+
+
+@pytest.fixture
+def schema():
+    return OutputSchema({"label": str, "score": float, "count": int, "spam": bool})
+
+
+def test_response_format(schema):
+    response_format = schema.response_format()
+    assert response_format["type"] == "json_schema"
+    json_schema = response_format["json_schema"]["schema"]
+    assert json_schema["required"] == ["label", "score", "count", "spam"]
+    assert json_schema["properties"]["count"] == {"type": "integer"}
+    assert OutputSchema({"a": str}, mode="json_object").response_format() == {
+        "type": "json_object"
+    }
+
+
+def test_invalid_schema():
+    with pytest.raises(ValueError, match="Unsupported type"):
+        OutputSchema({"tags": list})
+    with pytest.raises(ValueError, match="Unknown mode"):
+        OutputSchema({"a": str}, mode="yaml")
+
+
+def test_parse_and_expand(schema):
+    responses = [
+        '{"label": "ham", "score": 0.2, "count": 3, "spam": false}',
+        '```json\n{"label": "spam", "score": 1, "count": 0, "spam": true}\n```',
+        '{"label": "ham", "score": "high", "count": 1, "spam": false}',
+        "not json",
+        None,
+    ]
+    records, valid = schema.parse(responses)
+    assert valid == [True, True, False, False, False]
+
+    frame = schema.to_frame(records, pd.RangeIndex(5))
+    assert frame.dtypes.astype(str).tolist() == [
+        "string",
+        "Float64",
+        "Int64",
+        "boolean",
+    ]
+    assert frame.loc[1, "score"] == 1.0
+    assert frame.loc[0, "count"] == 3
+    assert frame.loc[2:].isna().all().all()
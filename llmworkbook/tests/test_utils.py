@@ -11,3 +11,18 @@ def test_sanitize_prompt():
 
     # Assert
     assert sanitized_prompt == "This is a sample string"
+
+
+def test_resolve_string_dtype():
+    import pandas as pd
+    import pytest
+
+    from ..utils import resolve_string_dtype
+
+    pytest.importorskip("pyarrow")
+    assert resolve_string_dtype(None) is None
+    assert resolve_string_dtype("object") is None
+    assert resolve_string_dtype("pyarrow") == pd.StringDtype("pyarrow")
+    assert str(resolve_string_dtype("large_string")) == "large_string[pyarrow]"
+    with pytest.raises(ValueError, match="Unknown string storage"):
+        resolve_string_dtype("utf8")
@@ -0,0 +1,166 @@
+# pylint: skip-file
+import threading
+import time
+
+import pandas as pd
+from unittest.mock import AsyncMock, MagicMock
+import pytest
+from llmworkbook import (
+    LLMConfig,
+    LLMDataFrameIntegrator,
+    LLMRunner,
+    SQLiteWorkQueue,
+    run_worker,
+)
+from llmworkbook.concurrency import ConcurrencyLimiter
+from .mock_server import MockChatServer
+
+
+def make_runner(server):
+    return LLMRunner(
+        LLMConfig(provider="openai_compatible", base_url=server.base_url),
+        limiter=ConcurrencyLimiter(4),
+    )
+
+
+@pytest.fixture
+def frame():
+    return pd.DataFrame(
+        {"prompt": [f"Prompt {i}" if i != 3 else "" for i in range(10)]},
+        index=[f"row{i}" for i in range(10)],
+    )
+
+
+def test_leases_expire_and_requeue(tmp_path):
+    """A batch whose worker stopped renewing its lease is leased again."""
+    queue = SQLiteWorkQueue(str(tmp_path / "queue.db"))
+    queue.put([[(0, "a"), (1, "b")], [(2, "c")]])
+
+    dead = queue.lease("dead", lease_seconds=0.05)
+    assert dead.items == [(0, "a"), (1, "b")]
+    assert queue.counts() == {"pending": 1, "leased": 1, "done": 0, "failed": 0}
+
+    time.sleep(0.1)
+    assert queue.counts()["pending"] == 2
+    alive = queue.lease("alive", lease_seconds=60)
+    assert alive.batch_id == dead.batch_id
+
+    # The dead worker lost its lease: its late results are rejected
+    assert not queue.complete(dead, {0: "stale", 1: "stale"})
+    assert not queue.renew(dead, 60)
+    assert queue.complete(alive, {0: "A", 1: None})
+    assert list(queue.results()) == [(0, "A"), (1, None)]
+    assert not queue.finished()
+    queue.close()
+
+
+def test_distributed_job_merges_in_row_order(tmp_path, frame):
+    """Several workers share a job; responses land on their rows."""
+    path = str(tmp_path / "job.db")
+    with MockChatServer(latency=0.01) as server:
+        coordinator = LLMDataFrameIntegrator(runner=make_runner(server), df=frame)
+        assert (
+            coordinator.enqueue_rows(SQLiteWorkQueue(path), "prompt", batch_size=2) == 5
+        )
+
+        with pytest.raises(ValueError, match="already holds batches"):
+            coordinator.enqueue_rows(SQLiteWorkQueue(path), "prompt")
+
+        # A worker that dies holding a lease: its batch comes back to the others
+        SQLiteWorkQueue(path).lease("dead", lease_seconds=0.2)
+
+        completed = []
+
+        def work(async_mode):
+            completed.append(
+                run_worker(
+                    SQLiteWorkQueue(path),
+                    make_runner(server),
+                    async_mode=async_mode,
+                    poll_interval=0.05,
+                )
+            )
+
+        workers = [
+            threading.Thread(target=work, args=(mode,)) for mode in (True, False)
+        ]
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join(timeout=30)
+
+        result = coordinator.collect_responses(
+            SQLiteWorkQueue(path), "prompt", wait=True
+        )
+
+    assert sum(completed) == 5
+    expected = [f"Mock response to: Prompt {i}" if i != 3 else None for i in range(10)]
+    assert result["llm_response"].tolist() == expected
+
+
+def test_distributed_job_polars(tmp_path):
+    pl = pytest.importorskip("polars")
+    path = str(tmp_path / "job.db")
+    df = pl.DataFrame({"prompt": ["a", "b", "c"]}).lazy()
+    with MockChatServer() as server:
+        coordinator = LLMDataFrameIntegrator(runner=make_runner(server), df=df)
+        coordinator.enqueue_rows(SQLiteWorkQueue(path), "prompt", batch_size=2)
+        run_worker(SQLiteWorkQueue(path), make_runner(server))
+        result = coordinator.collect_responses(SQLiteWorkQueue(path), "prompt")
+
+    assert isinstance(result, pl.LazyFrame)
+    assert result.collect()["llm_response"].to_list() == [
+        "Mock response to: a",
+        "Mock response to: b",
+        "Mock response to: c",
+    ]
+
+
+@pytest.mark.parametrize("async_mode", [True, False])
+def test_failing_row_does_not_block_the_queue(tmp_path, async_mode):
+    """A row whose request always fails is recorded; its batch still completes."""
+    queue = SQLiteWorkQueue(str(tmp_path / "queue.db"))
+    queue.put([[(0, "a"), (1, "poison")], [(2, "b")]])
+    runner = MagicMock(spec=LLMRunner)
+
+    async def run(prompt):
+        if prompt == "poison":
+            raise ValueError("bad request")
+        return prompt.upper()
+
+    runner.run = AsyncMock(side_effect=run)
+
+    assert run_worker(queue, runner, async_mode=async_mode, poll_interval=0.01) == 2
+
+    assert queue.finished()
+    assert queue.counts() == {"pending": 0, "leased": 0, "done": 2, "failed": 0}
+    assert list(queue.results()) == [(0, "A"), (1, None), (2, "B")]
+    assert list(queue.errors()) == [(1, "ValueError: bad request")]
+    queue.close()
+
+
+def test_batch_fails_after_max_attempts(tmp_path):
+    """A batch that keeps losing its worker is moved to the failed state."""
+    queue = SQLiteWorkQueue(str(tmp_path / "queue.db"), max_attempts=2)
+    queue.put([[(0, "a"), (1, "b")], [(2, "c")]])
+
+    for _ in range(2):
+        lease = queue.lease("crashing", lease_seconds=0.01)
+        assert lease.items == [(0, "a"), (1, "b")]
+        time.sleep(0.05)
+
+    assert queue.counts()["failed"] == 1
+    lease = queue.lease("alive", lease_seconds=60)
+    assert lease.items == [(2, "c")]
+    queue.release(lease, error="RuntimeError: worker stopped")
+    lease = queue.lease("alive", lease_seconds=60)
+    queue.release(lease, error="RuntimeError: worker stopped")
+
+    assert queue.finished()
+    assert queue.counts() == {"pending": 0, "leased": 0, "done": 0, "failed": 2}
+    assert list(queue.errors()) == [
+        (0, "Batch failed after 2 attempts: Lease expired"),
+        (1, "Batch failed after 2 attempts: Lease expired"),
+        (2, "Batch failed after 2 attempts: RuntimeError: worker stopped"),
+    ]
+    queue.close()
@@ -176,3 +176,363 @@ def test_wrap_prompt_list(sample_list):
     assert len(wrapped_df) == len(sample_list)
     expected_first_row = "<data></data><prompt>Summarize this</prompt>"
     assert wrapped_df.iloc[0, 0] == expected_first_row
+
+
+def test_wrap_polars_frame_matches_pandas(sample_dataframe):
+    """Polars wrapping produces the same output as WrapDataFrame."""
+    pl = pytest.importorskip("polars")
+    from llmworkbook import WrapPolarsFrame
+
+    expected = WrapDataFrame(
+        pd.DataFrame(sample_dataframe),
+        prompt_column="prompt",
+        data_columns=["Reviews", "Language"],
+    ).wrap()["wrapped_output"]
+    wrapped = WrapPolarsFrame(
+        pl.DataFrame(sample_dataframe),
+        prompt_column="prompt",
+        data_columns=["Reviews", "Language"],
+    ).wrap()
+
+    assert isinstance(wrapped, pl.DataFrame)
+    assert wrapped["wrapped_output"].to_list() == expected.tolist()
+
+
+def test_wrap_polars_lazy_frame(sample_dataframe):
+    """A LazyFrame is wrapped lazily; without data columns, all others are wrapped."""
+    pl = pytest.importorskip("polars")
+    from llmworkbook import WrapPolarsFrame
+
+    lazy = pl.DataFrame(sample_dataframe).lazy().select("prompt", "Language")
+    wrapped = WrapPolarsFrame(lazy, prompt_column="prompt").wrap()
+
+    assert isinstance(wrapped, pl.LazyFrame)
+    assert wrapped.collect()["wrapped_output"][0] == (
+        "<data>\n  <cell>en</cell>\n</data><prompt>Summarize this</prompt>"
+    )
+
+
+def test_wrap_polars_frame_invalid_column(sample_dataframe):
+    pl = pytest.importorskip("polars")
+    from llmworkbook import WrapPolarsFrame
+
+    with pytest.raises(InvalidColumnName):
+        WrapPolarsFrame(pl.DataFrame(sample_dataframe), prompt_column="missing")
+
+
+@pytest.mark.parametrize("storage", ["pyarrow", "large_string"])
+def test_wrap_arrow_string_storage(sample_dataframe, storage):
+    """Wrapped output can be stored as Arrow-backed strings."""
+    pytest.importorskip("pyarrow")
+    wrapper = WrapDataFrame(
+        pd.DataFrame(sample_dataframe),
+        prompt_column="prompt",
+        data_columns=["Reviews", "Language"],
+    )
+
+    wrapped = wrapper.wrap(string_storage=storage)
+
+    assert wrapped["wrapped_output"].dtype != object
+    assert (
+        wrapped["wrapped_output"].tolist() == wrapper.wrap()["wrapped_output"].tolist()
+    )
+
+
+@pytest.mark.parametrize(
+    "wrap_format, expected",
+    [
+        ("csv", "Reviews,Language\nGreat product,en\n\nSummarize this"),
+        ("tsv", "Reviews\tLanguage\nGreat product\ten\n\nSummarize this"),
+        ("json", '{"Reviews":"Great product","Language":"en"}\n\nSummarize this'),
+        ("kv", "Reviews: Great product\nLanguage: en\n\nSummarize this"),
+    ],
+)
+def test_wrap_formats(sample_dataframe, wrap_format, expected):
+    wrapper = WrapDataFrame(
+        pd.DataFrame(sample_dataframe),
+        prompt_column="prompt",
+        data_columns=["Reviews", "Language"],
+        wrap_format=wrap_format,
+    )
+    assert wrapper.wrap().iloc[0, 0] == expected
+
+
+def test_wrap_formats_escape_values():
+    """CSV fields are quoted and JSON values stay valid JSON."""
+    import json
+
+    df = pd.DataFrame(
+        {"prompt": ["p"], "text": ['Say "hi",\nthen go'], "n": [1.5], "ok": [True]}
+    )
+    csv = WrapDataFrame(df, prompt_column="prompt", wrap_format="csv").wrap()
+    assert csv.iloc[0, 0] == 'text,n,ok\n"Say ""hi"",\nthen go",1.5,True\n\np'
+
+    wrapped = WrapDataFrame(df, prompt_column="prompt", wrap_format="json").wrap()
+    data, prompt = wrapped.iloc[0, 0].split("\n\n")
+    assert json.loads(data) == {"text": 'Say "hi",\nthen go', "n": 1.5, "ok": True}
+    assert prompt == "p"
+
+
+@pytest.mark.parametrize(
+    "wrap_format, expected",
+    [
+        (
+            "xml",
+            "<data>\n  <cell>nan</cell>\n  <cell>None</cell>\n  <cell>nan</cell>\n"
+            "</data><prompt>q</prompt>",
+        ),
+        ("csv", "a,b,c\nnan,None,nan\n\nq"),
+        ("tsv", "a\tb\tc\nnan\tNone\tnan\n\nq"),
+        ("json", '{"a":null,"b":null,"c":null}\n\nq'),
+        ("kv", "a: nan\nb: None\nc: nan\n\nq"),
+    ],
+)
+def test_wrap_formats_missing_values(wrap_format, expected):
+    """Missing cells are written like f"{value}" (JSON: null), never dropped."""
+    df = pd.DataFrame(
+        {
+            "prompt": ["p", "q"],
+            "a": [1, None],
+            "b": pd.Series(["x", None], dtype=object),
+            "c": [1.5, np.nan],
+        }
+    )
+    wrapped = WrapDataFrame(df, prompt_column="prompt", wrap_format=wrap_format).wrap()
+    assert wrapped.iloc[1, 0] == expected
+
+
+def _row_wise_xml(df, prompt_column, data_columns):
+    """XML wrapping as it was done row by row."""
+    data = df[data_columns].apply(
+        lambda row: "<data>\n"
+        + "\n".join(f"  <cell>{value}</cell>" for value in row)
+        + "\n</data>",
+        axis=1,
+    )
+    return (
+        data + df[prompt_column].apply(lambda value: f"<prompt>{value}</prompt>")
+    ).tolist()
+
+
+@pytest.mark.parametrize(
+    "data_columns",
+    [
+        ["when", "count", "score", "nullable"],
+        ["count", "score"],
+        ["when"],
+        ["count", "nullable", "label"],
+    ],
+)
+def test_wrap_xml_matches_row_wise(data_columns):
+    """Column-wise XML wrapping writes every dtype as row-wise wrapping did."""
+    df = pd.DataFrame(
+        {
+            "prompt": ["p", "q", "r"],
+            "when": pd.to_datetime(["2024-01-01", "2024-01-02", None]),
+            "count": [1, 2, 3],
+            "score": [0.5, np.nan, 2.0],
+            "nullable": pd.array([1, None, 3], dtype="Int64"),
+            "label": pd.array(["a", None, "c"], dtype="string"),
+        }
+    )
+    wrapped = WrapDataFrame(df, prompt_column="prompt", data_columns=data_columns)
+
+    assert wrapped.wrap()["wrapped_output"].tolist() == _row_wise_xml(
+        df, "prompt", data_columns
+    )
+
+
+def test_wrap_format_array_and_prompt_list(sample_array):
+    wrapped = WrapDataArray(
+        sample_array, prompt_index=0, data_indices=[1, 2], wrap_format="kv"
+    ).wrap()
+    assert wrapped.iloc[0, 0] == "col_1: Great product\ncol_2: en\n\nSummarize this"
+
+    wrapped = WrapPromptList(["Hello"], wrap_format="json").wrap()
+    assert wrapped.iloc[0, 0] == "Hello"
+
+
+def test_unknown_wrap_format(sample_dataframe):
+    with pytest.raises(ValueError, match="Unknown wrap format"):
+        WrapDataFrame(
+            pd.DataFrame(sample_dataframe), prompt_column="prompt", wrap_format="yaml"
+        )
+
+
+@pytest.mark.parametrize("wrap_format", ["csv", "tsv", "json", "kv"])
+def test_wrap_polars_formats_match_pandas(sample_dataframe, wrap_format):
+    pl = pytest.importorskip("polars")
+    from llmworkbook import WrapPolarsFrame
+
+    kwargs = dict(
+        prompt_column="prompt",
+        data_columns=["Reviews", "Language"],
+        wrap_format=wrap_format,
+    )
+    expected = WrapDataFrame(pd.DataFrame(sample_dataframe), **kwargs).wrap()
+    wrapped = WrapPolarsFrame(pl.DataFrame(sample_dataframe), **kwargs).wrap()
+    assert wrapped["wrapped_output"].to_list() == expected["wrapped_output"].tolist()
+
+
+def test_wrap_prefix_layout(sample_dataframe):
+    """The prompt and the least varying columns come first."""
+    wrapper = WrapDataFrame(
+        pd.DataFrame(sample_dataframe),
+        prompt_column="prompt",
+        data_columns=["Reviews", "Language"],
+        wrap_format="kv",
+        layout="prefix",
+    )
+    assert wrapper.wrap().iloc[0, 0] == (
+        "Summarize this\n\nLanguage: en\nReviews: Great product"
+    )
+
+    wrapped = WrapPromptList(["Hello"], layout="prefix").wrap()
+    assert wrapped.iloc[0, 0] == "<prompt>Hello</prompt><data></data>"
+
+    with pytest.raises(ValueError, match="Unknown layout"):
+        WrapPromptList(["Hello"], layout="random")
+
+
+@pytest.mark.parametrize("wrap_format", ["xml", "csv", "json"])
+def test_wrap_polars_prefix_layout_matches_pandas(sample_dataframe, wrap_format):
+    pl = pytest.importorskip("polars")
+    from llmworkbook import WrapPolarsFrame
+
+    kwargs = dict(prompt_column="prompt", wrap_format=wrap_format, layout="prefix")
+    expected = WrapDataFrame(
+        pd.DataFrame(sample_dataframe), data_columns=["Reviews", "Language"], **kwargs
+    ).wrap()
+    wrapped = WrapPolarsFrame(pl.DataFrame(sample_dataframe), **kwargs).wrap()
+    assert wrapped["wrapped_output"].to_list() == expected["wrapped_output"].tolist()
+
+
+def test_prompt_template(sample_dataframe):
+    """Templates render column-wise, like f-strings per row."""
+    from llmworkbook import PromptTemplate
+
+    df = pd.DataFrame(sample_dataframe).assign(stars=[4.5, 3.0, 1.25])
+    template = PromptTemplate("{prompt} ({Language}, {stars:.1f}/5): {Reviews} {{x}}")
+    assert template.columns == ["prompt", "Language", "stars", "Reviews"]
+
+    expected = df.apply(
+        lambda row: f"{row.prompt} ({row.Language}, {row.stars:.1f}/5): {row.Reviews} {{x}}",
+        axis=1,
+    )
+    assert template.render(df).tolist() == expected.tolist()
+
+    with pytest.raises(ValueError):
+        PromptTemplate("Summarize {}")
+
+    df.loc[1, ["Language", "stars"]] = [None, np.nan]
+    template = PromptTemplate("{Language} {stars}")
+    expected = df.apply(lambda row: f"{row.Language} {row.stars}", axis=1)
+    assert template.render(df).tolist() == expected.tolist()
+
+
+def test_prompt_template_datetimes_and_missing_values():
+    """Datetimes render like str.format; missing values skip the format spec."""
+    from llmworkbook import PromptTemplate
+
+    df = pd.DataFrame(
+        {
+            "when": pd.to_datetime(["2024-01-01", "2024-01-02", None]),
+            "score": pd.Series([0.5, None, np.nan], dtype=object),
+            "count": pd.array([1, None, 3], dtype="Int64"),
+        }
+    )
+    template = PromptTemplate("{when} {count}")
+    expected = [
+        "{when} {count}".format(when=when, count=count)
+        for when, count in zip(df["when"], df["count"])
+    ]
+    assert template.render(df).tolist() == expected
+    assert expected[0] == "2024-01-01 00:00:00 1"
+
+    rendered = PromptTemplate("{score:.2f}").render(df)
+    assert rendered.tolist() == ["0.50", "None", "nan"]
+    assert PromptTemplate("{count:03d}").render(df).tolist() == ["001", "<NA>", "003"]
+
+
+def test_wrap_dataframe_prompt_template(sample_dataframe):
+    df = pd.DataFrame(sample_dataframe).drop(columns=["prompt"])
+    wrapper = WrapDataFrame(
+        df,
+        prompt_template="Summarize this {Language} review",
+        data_columns=["Reviews"],
+        wrap_format="kv",
+    )
+    assert wrapper.wrap().iloc[1, 0] == "Reviews: Muy bueno\n\nSummarize this es review"
+
+    # Missing columns surface when the template is compiled, not when rendering
+    with pytest.raises(InvalidColumnName, match="Template columns"):
+        WrapDataFrame(df, prompt_template="Summarize {Rating}")
+
+
+@pytest.mark.parametrize("wrap_format", ["xml", "csv", "json"])
+@pytest.mark.parametrize("layout", ["data_first", "prefix"])
+def test_wrap_n_jobs_matches_serial(tmp_path, wrap_format, layout):
+    """Rows wrapped on a process pool come back in order, identical to serial."""
+    pytest.importorskip("pyarrow")
+    rows = 50
+    df = pd.DataFrame(
+        {
+            "prompt": [f"Summarize review {i}" for i in range(rows)],
+            "Reviews": ['Great, "really"', "Muy bueno\nok"] * (rows // 2),
+            "Stars": np.arange(rows) / 2,
+            "Mixed": [1, "a"] * (rows // 2),
+            "Missing": [None, "x", np.nan, 2.5, "y"] * (rows // 5),
+            "Score": [np.nan, 1.0] * (rows // 2),
+        },
+        index=np.arange(rows)[::-1] * 3,
+    )
+    wrapper = WrapDataFrame(
+        df, prompt_column="prompt", wrap_format=wrap_format, layout=layout
+    )
+
+    serial = wrapper.wrap()
+    parallel = wrapper.wrap(n_jobs=2)
+    pd.testing.assert_frame_equal(parallel, serial)
+
+    wrapper.transform_and_export(str(tmp_path / "serial.csv"), "csv")
+    wrapper.transform_and_export(str(tmp_path / "parallel.csv"), "csv", n_jobs=2)
+    assert (tmp_path / "parallel.csv").read_text() == (
+        tmp_path / "serial.csv"
+    ).read_text()
+
+
+@pytest.mark.parametrize("wrap_format", ["xml", "json"])
+def test_wrap_n_jobs_keeps_dtypes(wrap_format):
+    """Dtypes Arrow does not keep (nullable ints, datetimes) wrap like serial."""
+    pytest.importorskip("pyarrow")
+    rows = 20
+    df = pd.DataFrame(
+        {
+            "prompt": pd.array([f"q{i}" for i in range(rows)], dtype="string"),
+            "when": pd.date_range("2024-01-01", periods=rows, freq="D"),
+            "nullable": pd.array([1, None] * (rows // 2), dtype="Int64"),
+            "label": pd.array(["a", None] * (rows // 2), dtype="string"),
+        }
+    )
+    wrapper = WrapDataFrame(df, prompt_column="prompt", wrap_format=wrap_format)
+
+    pd.testing.assert_frame_equal(wrapper.wrap(n_jobs=2), wrapper.wrap())
+
+
+def test_wrap_n_jobs_empty_frame_csv(tmp_path):
+    """An empty frame exported on a process pool still gets its CSV header."""
+    pytest.importorskip("pyarrow")
+    df = pd.DataFrame({"prompt": pd.Series([], dtype=object), "a": []})
+    wrapper = WrapDataFrame(df, prompt_column="prompt")
+
+    wrapper.transform_and_export(str(tmp_path / "serial.csv"), "csv")
+    wrapper.transform_and_export(str(tmp_path / "parallel.csv"), "csv", n_jobs=2)
+    assert (tmp_path / "parallel.csv").read_text() == (
+        tmp_path / "serial.csv"
+    ).read_text()
+
+
+def test_wrap_n_jobs_invalid(sample_dataframe):
+    wrapper = WrapDataFrame(pd.DataFrame(sample_dataframe), prompt_column="prompt")
+    with pytest.raises(ValueError, match="n_jobs"):
+        wrapper.wrap(n_jobs=0)
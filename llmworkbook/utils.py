@@ -3,8 +3,9 @@ Additional utility functions for the llmworkbook package.
 """
 
 import asyncio
+import threading
 from functools import wraps
-from typing import Callable, Coroutine
+from typing import Callable, Coroutine, Optional
 import nest_asyncio
 
 
@@ -49,3 +50,135 @@ def sync_to_async(func: Coroutine) -> Callable:
         return asyncio.run(func(*args, **kwargs))
 
     return wrapper
+
+
+def resolve_string_dtype(string_storage: Optional[str]):
+    """
+    Map a string storage option to the pandas dtype of text columns.
+
+    Arrow-backed strings live in contiguous buffers instead of one Python object per
+    value, which cuts memory and garbage collector work for millions of long strings.
+
+    Args:
+        string_storage (str, optional): None or "object" (Python objects, the default),
+            "pyarrow" (`string[pyarrow]`) or "large_string"
+            (`pd.ArrowDtype(pa.large_string())`, 64-bit offsets for over 2 GiB of text).
+
+    Returns:
+        The pandas dtype, or None for plain object columns.
+
+    Raises:
+        ValueError: If the storage option is unknown.
+        ImportError: If an Arrow storage is chosen but pyarrow is not installed.
+    """
+    if string_storage in (None, "object"):
+        return None
+    if string_storage not in ("pyarrow", "large_string"):
+        raise ValueError(
+            f"Unknown string storage '{string_storage}'. "
+            "Use None, 'object', 'pyarrow' or 'large_string'."
+        )
+    # pylint: disable=import-outside-toplevel
+    import pandas as pd
+
+    try:
+        import pyarrow as pa
+    except ImportError as error:
+        raise ImportError(
+            "Arrow string storage needs the pyarrow package: pip install pyarrow"
+        ) from error
+    if string_storage == "pyarrow":
+        return pd.StringDtype("pyarrow")
+    return pd.ArrowDtype(pa.large_string())
+
+
+class BackgroundServer:  # pylint: disable=too-many-instance-attributes
+    """
+    Runs an aiohttp application on a daemon thread with its own event loop, on a TCP
+    port or a Unix socket.
+
+    Attributes:
+        address: The bound address, e.g. `(host, port)` (known once started).
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self,
+        app_factory: Callable,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        unix_socket: Optional[str] = None,
+        name: str = "llmworkbook-server",
+    ) -> None:
+        """
+        Args:
+            app_factory (Callable): Returns the `aiohttp.web.Application` to serve;
+                called on the server thread.
+            host (str): Interface to bind to.
+            port (int): TCP port to bind to; 0 picks a free one.
+            unix_socket (str, optional): Serve on this Unix socket instead.
+            name (str): Name of the server thread.
+        """
+        self.address = None
+        self._app_factory = app_factory
+        self._bind = (host, port, unix_socket)
+        self._name = name
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._started = threading.Event()
+        self._error: Optional[BaseException] = None
+
+    def _serve(self) -> None:
+        from aiohttp import web  # pylint: disable=import-outside-toplevel
+
+        host, port, unix_socket = self._bind
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        runner = web.AppRunner(self._app_factory(), access_log=None)
+        try:
+            self._loop.run_until_complete(runner.setup())
+            if unix_socket is not None:
+                site = web.UnixSite(runner, unix_socket)
+            else:
+                site = web.TCPSite(runner, host, port)
+            self._loop.run_until_complete(site.start())
+            self.address = runner.addresses[0]
+        except BaseException as exc:  # pylint: disable=broad-exception-caught
+            # E.g. the port is in use: handed to `start` to raise
+            self._error = exc
+        self._started.set()
+        if self._error is None:
+            self._loop.run_forever()
+        self._loop.run_until_complete(runner.cleanup())
+        self._loop.close()
+
+    def start(self) -> "BackgroundServer":
+        """
+        Start the server thread and wait until it accepts connections.
+
+        Returns:
+            BackgroundServer: The running server.
+
+        Raises:
+            OSError: If the address cannot be bound (e.g. the port is in use).
+        """
+        self._started.clear()
+        self._error = None
+        self._thread = threading.Thread(
+            target=self._serve, name=self._name, daemon=True
+        )
+        self._thread.start()
+        self._started.wait()
+        if self._error is not None:
+            self._thread.join()
+            self._thread = None
+            raise self._error
+        return self
+
+    def stop(self) -> None:
+        """
+        Stop the server and join its thread.
+        """
+        if self._loop and self._thread:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._thread = None
@@ -0,0 +1,426 @@
+"""
+Work queue module to spread one integrator job over worker processes and nodes.
+
+A coordinator puts the rows to run in a durable queue as batches of
+`(row position, prompt)` pairs (`LLMDataFrameIntegrator.enqueue_rows`). Workers on
+any node lease a batch, run its prompts and commit the responses (`run_worker`, or
+`llmworkbook worker <queue>` on the command line). A lease expires after
+`lease_seconds` unless the worker renews it, so the batches of a dead worker go back
+to the queue. A batch leased `max_attempts` times without being completed (it keeps
+killing its workers) is moved to the "failed" state instead. Rows whose request fails
+keep no response and their error is recorded, so one bad row never fails its batch.
+At the end the coordinator merges the responses back into the frame in row order
+(`LLMDataFrameIntegrator.collect_responses`).
+
+`SQLiteWorkQueue` keeps the queue in one SQLite file, for workers on one machine or
+on a shared file system. Other backends implement `WorkQueue`.
+"""
+
+import asyncio
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from .runner import LLMRunner
+from .utils import sync_to_async
+
+
+class Lease(NamedTuple):
+    """
+    A batch leased by a worker.
+    """
+
+    batch_id: int
+    worker: str
+    items: List[Tuple[int, str]]
+    expires: float
+
+
+class WorkQueue(ABC):
+    """
+    Interface of a durable queue of prompt batches with leases.
+
+    Lease expiry times are wall-clock (`time.time()`) timestamps, so the clocks of the
+    nodes sharing a queue should roughly agree.
+    """
+
+    @abstractmethod
+    def put(self, batches: Sequence[Sequence[Tuple[int, str]]]) -> None:
+        """
+        Add batches of `(row position, prompt)` pairs to the queue.
+        """
+
+    @abstractmethod
+    def lease(self, worker: str, lease_seconds: float) -> Optional[Lease]:
+        """
+        Lease the next pending batch, re-queueing expired leases first.
+
+        Returns:
+            Lease, optional: The leased batch, or None if no batch is pending.
+        """
+
+    @abstractmethod
+    def renew(self, lease: Lease, lease_seconds: float) -> bool:
+        """
+        Extend a lease by `lease_seconds` from now.
+
+        Returns:
+            bool: False if the batch was re-queued or leased by another worker since.
+        """
+
+    @abstractmethod
+    def complete(
+        self,
+        lease: Lease,
+        responses: Dict[int, Optional[str]],
+        errors: Optional[Dict[int, str]] = None,
+    ) -> bool:
+        """
+        Commit the responses of a leased batch; None marks rows without a response.
+        `errors` holds the error of every row whose request failed.
+
+        Returns:
+            bool: False, and nothing is committed, if the lease was lost.
+        """
+
+    @abstractmethod
+    def release(self, lease: Lease, error: Optional[str] = None) -> None:
+        """
+        Give a leased batch back to the queue without results, or move it to the
+        "failed" state if it used up its attempts.
+        """
+
+    @abstractmethod
+    def counts(self) -> Dict[str, int]:
+        """
+        Returns:
+            Dict[str, int]: Number of "pending", "leased", "done" and "failed"
+            batches. Batches whose lease expired count as pending (or failed).
+        """
+
+    @abstractmethod
+    def errors(self) -> Iterator[Tuple[int, str]]:
+        """
+        Yields:
+            Tuple[int, str]: `(row position, error)` of the rows whose request failed
+            and of the rows of failed batches, in row order.
+        """
+
+    @abstractmethod
+    def results(self) -> Iterator[Tuple[int, Optional[str]]]:
+        """
+        Yields:
+            Tuple[int, str]: Committed `(row position, response)` pairs, in row order.
+        """
+
+    def finished(self) -> bool:
+        """
+        Returns:
+            bool: Whether every batch is done or failed.
+        """
+        counts = self.counts()
+        return counts["pending"] + counts["leased"] == 0
+
+
+class SQLiteWorkQueue(WorkQueue):
+    """
+    A work queue kept in a SQLite file.
+
+    Every worker opens the file with its own `SQLiteWorkQueue`. Leases are taken in
+    `BEGIN IMMEDIATE` transactions, so two workers never lease the same batch. Keep the
+    file on a local disk or a file system with working locks (not every network file
+    system has them).
+    """
+
+    def __init__(
+        self, path: str, timeout: float = 30.0, max_attempts: Optional[int] = 3
+    ) -> None:
+        """
+        Args:
+            path (str): The SQLite file; created if missing.
+            timeout (float): Seconds to wait for another worker's write lock.
+            max_attempts (int, optional): Leases after which a batch that was never
+                completed (its lease expired or was given back) fails. None retries
+                forever. Every worker should use the same value.
+        """
+        self.path = path
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            path, timeout=timeout, isolation_level=None, check_same_thread=False
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.executescript("""
+            CREATE TABLE IF NOT EXISTS batches (
+                id INTEGER PRIMARY KEY,
+                items TEXT NOT NULL,
+                state TEXT NOT NULL DEFAULT 'pending',
+                worker TEXT,
+                lease_until REAL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                error TEXT
+            );
+            CREATE INDEX IF NOT EXISTS batches_state ON batches (state, id);
+            CREATE TABLE IF NOT EXISTS results (
+                position INTEGER PRIMARY KEY,
+                response TEXT,
+                error TEXT
+            );
+            """)
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """
+        A write transaction, committed unless it raises.
+        """
+        with self._lock:
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._connection
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+            self._connection.execute("COMMIT")
+
+    def put(self, batches: Sequence[Sequence[Tuple[int, str]]]) -> None:
+        rows = [
+            (json.dumps([[int(position), prompt] for position, prompt in batch]),)
+            for batch in batches
+        ]
+        with self._transaction() as connection:
+            connection.executemany("INSERT INTO batches (items) VALUES (?)", rows)
+
+    def _requeued_state(self) -> str:
+        """
+        SQL expression of the state a batch given back (or expired) goes to.
+        """
+        if self.max_attempts is None:
+            return "'pending'"
+        return (
+            f"CASE WHEN attempts >= {int(self.max_attempts)} "
+            "THEN 'failed' ELSE 'pending' END"
+        )
+
+    def lease(self, worker: str, lease_seconds: float) -> Optional[Lease]:
+        now = time.time()
+        with self._transaction() as connection:
+            connection.execute(
+                f"UPDATE batches SET state = {self._requeued_state()}, worker = NULL, "
+                "error = 'Lease expired' WHERE state = 'leased' AND lease_until < ?",
+                (now,),
+            )
+            row = connection.execute(
+                "SELECT id, items FROM batches WHERE state = 'pending' "
+                "ORDER BY id LIMIT 1"
+            ).fetchone()
+            if row is None:
+                return None
+            expires = now + lease_seconds
+            connection.execute(
+                "UPDATE batches SET state = 'leased', worker = ?, lease_until = ?, "
+                "attempts = attempts + 1 WHERE id = ?",
+                (worker, expires, row[0]),
+            )
+        items = [tuple(item) for item in json.loads(row[1])]
+        return Lease(row[0], worker, items, expires)
+
+    def _holds(self, connection: sqlite3.Connection, lease: Lease) -> bool:
+        row = connection.execute(
+            "SELECT state, worker FROM batches WHERE id = ?", (lease.batch_id,)
+        ).fetchone()
+        return row is not None and row[0] == "leased" and row[1] == lease.worker
+
+    def renew(self, lease: Lease, lease_seconds: float) -> bool:
+        with self._transaction() as connection:
+            if not self._holds(connection, lease):
+                return False
+            connection.execute(
+                "UPDATE batches SET lease_until = ? WHERE id = ?",
+                (time.time() + lease_seconds, lease.batch_id),
+            )
+        return True
+
+    def complete(
+        self,
+        lease: Lease,
+        responses: Dict[int, Optional[str]],
+        errors: Optional[Dict[int, str]] = None,
+    ) -> bool:
+        errors = errors or {}
+        with self._transaction() as connection:
+            if not self._holds(connection, lease):
+                return False
+            connection.executemany(
+                "INSERT OR REPLACE INTO results (position, response, error) "
+                "VALUES (?, ?, ?)",
+                [
+                    (int(position), response, errors.get(position))
+                    for position, response in responses.items()
+                ],
+            )
+            connection.execute(
+                "UPDATE batches SET state = 'done', lease_until = NULL WHERE id = ?",
+                (lease.batch_id,),
+            )
+        return True
+
+    def release(self, lease: Lease, error: Optional[str] = None) -> None:
+        with self._transaction() as connection:
+            if self._holds(connection, lease):
+                connection.execute(
+                    f"UPDATE batches SET state = {self._requeued_state()}, "
+                    "worker = NULL, lease_until = NULL, error = ? WHERE id = ?",
+                    (error, lease.batch_id),
+                )
+
+    def counts(self) -> Dict[str, int]:
+        counts = {"pending": 0, "leased": 0, "done": 0, "failed": 0}
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT CASE WHEN state = 'leased' AND lease_until < ? "
+                f"THEN {self._requeued_state()} ELSE state END, COUNT(*) "
+                "FROM batches GROUP BY 1",
+                (time.time(),),
+            ).fetchall()
+        counts.update(dict(rows))
+        return counts
+
+    def results(self) -> Iterator[Tuple[int, Optional[str]]]:
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT position, response FROM results ORDER BY position"
+            ).fetchall()
+        yield from rows
+
+    def errors(self) -> Iterator[Tuple[int, str]]:
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT position, error FROM results WHERE error IS NOT NULL"
+            ).fetchall()
+            failed = self._connection.execute(
+                "SELECT items, attempts, error FROM batches WHERE state = 'failed'"
+            ).fetchall()
+        for items, attempts, error in failed:
+            message = f"Batch failed after {attempts} attempts: {error}"
+            rows += [(position, message) for position, _ in json.loads(items)]
+        yield from sorted(rows)
+
+    def close(self) -> None:
+        """
+        Close the database connection.
+        """
+        with self._lock:
+            self._connection.close()
+
+
+def _worker_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+
+async def _run_batch(
+    runner: LLMRunner,
+    queue: WorkQueue,
+    lease: Lease,
+    lease_seconds: float,
+    async_mode: bool,
+) -> Tuple[Dict[int, Optional[str]], Dict[int, str]]:
+    """
+    Run the prompts of a leased batch, renewing the lease while they run.
+
+    Returns:
+        Tuple[Dict, Dict]: The responses and the errors of failed rows, by position.
+    """
+    errors: Dict[int, str] = {}
+
+    async def run_one(position: int, prompt: str) -> Optional[str]:
+        try:
+            return await runner.run(prompt)
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            # Like the integrator, a failed or timed out row keeps no response
+            errors[position] = f"{type(exc).__name__}: {exc}"
+            return None
+
+    async def heartbeat() -> None:
+        while True:
+            await asyncio.sleep(lease_seconds / 3)
+            await asyncio.to_thread(queue.renew, lease, lease_seconds)
+
+    renewing = asyncio.create_task(heartbeat())
+    try:
+        if async_mode:
+            responses = await asyncio.gather(
+                *(run_one(position, prompt) for position, prompt in lease.items)
+            )
+        else:
+            responses = [
+                await run_one(position, prompt) for position, prompt in lease.items
+            ]
+    finally:
+        renewing.cancel()
+    responses = {
+        position: response for (position, _), response in zip(lease.items, responses)
+    }
+    return responses, errors
+
+
+def run_worker(  # pylint: disable=too-many-arguments
+    queue: WorkQueue,
+    runner: LLMRunner,
+    worker_id: Optional[str] = None,
+    *,
+    lease_seconds: float = 300.0,
+    async_mode: bool = True,
+    poll_interval: float = 1.0,
+    max_batches: Optional[int] = None,
+) -> int:
+    """
+    Lease batches and run them until the queue is finished.
+
+    While other workers hold leases the worker keeps polling, so it takes over the
+    batches of workers that die. Rows whose request fails keep no response and their
+    error is committed with the batch (see `WorkQueue.errors`). On any other error
+    the batch is given back to the queue, counting as a failed attempt, and the error
+    is raised.
+
+    Args:
+        queue (WorkQueue): The queue to work on.
+        runner (LLMRunner): Runs the prompts; its limiter, endpoints and options apply.
+        worker_id (str, optional): Name of the worker in leases. Defaults to the host
+            name, process id and a random suffix.
+        lease_seconds (float): Lease duration. The lease is renewed every third of it
+            while a batch runs, so it only expires when the worker stops.
+        async_mode (bool): Run the prompts of a batch concurrently (bounded by the
+            runner's limiter) rather than one after the other.
+        poll_interval (float): Seconds between polls while no batch is pending.
+        max_batches (int, optional): Stop after this many batches.
+
+    Returns:
+        int: Number of batches this worker completed.
+    """
+    worker_id = worker_id or _worker_id()
+    completed = 0
+    while max_batches is None or completed < max_batches:
+        lease = queue.lease(worker_id, lease_seconds)
+        if lease is None:
+            if queue.finished():
+                break
+            time.sleep(poll_interval)
+            continue
+        try:
+            responses, errors = sync_to_async(_run_batch)(
+                runner, queue, lease, lease_seconds, async_mode
+            )
+        except BaseException as exc:
+            queue.release(lease, error=f"{type(exc).__name__}: {exc}")
+            raise
+        # A lost lease means another worker runs the batch again
+        if queue.complete(lease, responses, errors):
+            completed += 1
+    return completed
@@ -1,28 +1,324 @@
 """
 Module to transform data for LLM readiness.
 
-The three concrete implementations:
+The concrete implementations:
 
-1) WrapDataFrame  - for pandas DataFrame
-2) WrapDataArray  - for 2D array-like structures
-3) WrapPromptList - for 1D lists (of prompts only)
+1) WrapDataFrame    - for pandas DataFrame
+2) WrapDataArray    - for 2D array-like structures
+3) WrapPromptList   - for 1D lists (of prompts only)
+4) WrapPolarsFrame  - for Polars DataFrame / LazyFrame (optional `polars` dependency)
 
-All only handle the data source specifics.
+All only handle the data source specifics. The layout of the wrapped text is chosen
+with `wrap_format`:
+
+- "xml"  - `<data><cell>...</cell></data><prompt>...</prompt>` (default)
+- "csv"  - a header line and a CSV row, then the prompt
+- "tsv"  - a header line and a tab-separated row, then the prompt
+- "json" - a compact JSON object keyed by column name, then the prompt
+- "kv"   - one `column: value` line per column, then the prompt
+
+The compact formats name every value and spend far fewer tokens on markup.
+
+With `layout="prefix"` the prompt comes first and data columns are ordered from the
+fewest to the most distinct values, so rows share the longest possible leading text.
+Providers cache such shared prefixes and bill them at a discount.
+
+A `PromptTemplate` builds the prompts from `{column}` placeholders, rendered for all
+rows at once (see `WrapDataFrame(prompt_template=...)`).
 """
 
+import json
 from abc import ABC, abstractmethod
-from typing import List, Optional, Union
+from functools import partial
+from string import Formatter
+from typing import Iterable, List, Optional, Tuple, Union
 
 import numpy as np
-from pandas import DataFrame, Series
+from pandas import DataFrame, Series, StringDtype
+from pandas.api.types import is_bool_dtype, is_numeric_dtype, is_object_dtype
 from pandas.errors import InvalidColumnName
 
+from .parallel import resolve_n_jobs
+from .utils import resolve_string_dtype
+
+WRAP_FORMATS = ("xml", "csv", "tsv", "json", "kv")
+
+LAYOUTS = ("data_first", "prefix")
+
+
+def _as_text(values: Series, mapped: bool = False) -> Series:
+    """
+    The same text as f"{value}" for every value, missing ones included ("nan",
+    "None", "<NA>"). Only dtypes whose `astype(str)` gives that text are converted in
+    bulk (not datetimes, which it writes without a midnight time, nor float32); the
+    others are formatted per value, as iteration hands them over or, if `mapped`, as
+    `Series.map` does (nullable integers as floats). Depending on the pandas version
+    `astype(str)` keeps missing values missing.
+    """
+    dtype = values.dtype
+    bulk = isinstance(dtype, StringDtype) or (
+        isinstance(dtype, np.dtype) and (dtype.kind in "iubO" or dtype == np.float64)
+    )
+    if not bulk:
+        if mapped:
+            return values.map(lambda value: f"{value}").astype(object)
+        return Series(
+            [f"{value}" for value in values], index=values.index, dtype=object
+        )
+    text = values.astype(str).astype(object)
+    missing = values.isna().to_numpy()
+    if missing.any():
+        text[missing] = [f"{value}" for value in values[missing]]
+    return text
+
+
+def _row_columns(data_df: DataFrame) -> List[Series]:
+    """
+    The data columns as rows of the frame hold them, e.g. ints as floats next to
+    float columns, so column-wise XML wrapping writes what row-wise wrapping did.
+    """
+    columns = [data_df.iloc[:, position] for position in range(data_df.shape[1])]
+    if data_df.empty:
+        return columns
+    dtype = data_df.iloc[0].dtype
+    if is_object_dtype(dtype):
+        return columns
+    return [column.astype(dtype) for column in columns]
+
+
+def _csv_field(text: Series) -> Series:
+    needs_quotes = text.str.contains('[,"\r\n]', regex=True)
+    quoted = '"' + text.str.replace('"', '""', regex=False) + '"'
+    return text.where(~needs_quotes, quoted)
+
+
+def _tsv_field(text: Series) -> Series:
+    return text.str.replace("[\t\r\n]", " ", regex=True)
+
+
+def _json_string(text: Series) -> Series:
+    for char, escaped in (("\\", "\\\\"), ('"', '\\"'), ("\n", "\\n"), ("\t", "\\t")):
+        text = text.str.replace(char, escaped, regex=False)
+    text = text.str.replace(
+        "[\x00-\x1f]", lambda match: f"\\u{ord(match.group()):04x}", regex=True
+    )
+    return '"' + text + '"'
+
+
+def _json_value(values: Series) -> Series:
+    if is_bool_dtype(values):
+        text = values.map({True: "true", False: "false"}).astype(object)
+    elif is_numeric_dtype(values):
+        text = _as_text(values)
+    else:
+        text = _json_string(_as_text(values))
+    return text.where(values.notna(), "null")
+
+
+def _join(parts: List[Union[str, Series]], index) -> Series:
+    """
+    Concatenate literal strings and text Series element-wise.
+    """
+    result = Series("", index=index, dtype=object)
+    for part in parts:
+        result = result + part
+    return result
+
+
+def _wrap_data(data_df: DataFrame, wrap_format: str) -> Series:
+    """
+    Wrap all data rows at once in the given format.
+
+    Args:
+        data_df (DataFrame): The data columns to wrap.
+        wrap_format (str): One of `WRAP_FORMATS`.
+
+    Returns:
+        Series: The wrapped data of every row.
+    """
+    names = [str(name) for name in data_df.columns]
+    columns = [data_df.iloc[:, position] for position in range(len(names))]
+    index = data_df.index
+    if wrap_format == "xml":
+        if not columns:
+            # If there are no data columns, return an empty <data></data> block
+            return Series("<data></data>", index=index, dtype=object)
+        parts = ["<data>\n"]
+        for column in _row_columns(data_df):
+            parts += ["  <cell>", _as_text(column), "</cell>\n"]
+        return _join([*parts, "</data>"], index)
+    if not columns:
+        return Series("", index=index, dtype=object)
+
+    parts = []
+    if wrap_format in ("csv", "tsv"):
+        field, separator = (
+            (_csv_field, ",") if wrap_format == "csv" else (_tsv_field, "\t")
+        )
+        header = separator.join(field(Series(names, dtype=object)))
+        parts.append(header + "\n")
+        for position, column in enumerate(columns):
+            if position:
+                parts.append(separator)
+            parts.append(field(_as_text(column)))
+    elif wrap_format == "json":
+        for position, (name, column) in enumerate(zip(names, columns)):
+            key = json.dumps(name, ensure_ascii=False)
+            parts += ["{" if not position else ",", f"{key}:", _json_value(column)]
+        parts.append("}")
+    else:
+        for position, (name, column) in enumerate(zip(names, columns)):
+            parts += ["\n" if position else "", f"{name}: ", _as_text(column)]
+    return _join(parts, index)
+
+
+def _wrap_prompts(prompt_series: Series, wrap_format: str) -> Series:
+    """
+    Wrap all prompt values at once in the given format.
+
+    Args:
+        prompt_series (Series): The prompt values to wrap.
+        wrap_format (str): One of `WRAP_FORMATS`.
+
+    Returns:
+        Series: The wrapped prompt of every row.
+    """
+    # Mapped, as prompts were wrapped with `Series.apply`
+    if wrap_format == "xml":
+        return "<prompt>" + _as_text(prompt_series, mapped=True) + "</prompt>"
+    return _as_text(prompt_series, mapped=True)
+
+
+def wrap_chunk(
+    data_df: DataFrame, prompt_series: Series, wrap_format: str, layout: str
+) -> DataFrame:
+    """
+    Wrap data columns, already in wrapping order, and prompts. Used by the wrappers
+    and, on chunks of rows, by the workers of a parallel wrap.
+
+    Args:
+        data_df (DataFrame): The data columns to wrap.
+        prompt_series (Series): The prompt values to wrap.
+        wrap_format (str): One of `WRAP_FORMATS`.
+        layout (str): One of `LAYOUTS`.
+
+    Returns:
+        DataFrame: A single-column DataFrame with the wrapped output.
+    """
+    # Wrap the data rows and the prompt column, all rows at once
+    data_content = _wrap_data(data_df, wrap_format)
+    prompt_content = _wrap_prompts(prompt_series, wrap_format)
+
+    # Combine data and prompt columns into a single column
+    separator = "" if wrap_format == "xml" or data_df.shape[1] == 0 else "\n\n"
+    if layout == "prefix":
+        transformed_content = prompt_content + separator + data_content
+    else:
+        transformed_content = data_content + separator + prompt_content
+
+    return DataFrame({"wrapped_output": transformed_content})
+
+
+class PromptTemplate:
+    """
+    A prompt template with `{column}` placeholders, parsed once and rendered for all
+    rows at once by concatenating whole columns, instead of formatting row by row with
+    `df.apply(lambda row: f"...", axis=1)`.
+
+    Placeholders take the column name literally (dots and brackets included) and an
+    optional format spec, e.g. `{price:.2f}`; `{{` and `}}` are literal braces.
+    Values are rendered like `str.format` renders them; missing values always like
+    `f"{value}"` ("nan", "None", "<NA>"), as a format spec may not apply to them.
+
+    Example:
+        template = PromptTemplate("Translate this {Language} review: {Reviews}")
+        df["prompt"] = template.render(df)
+
+    Attributes:
+        template (str): The template text.
+        columns (List[str]): Columns the template reads, in order of appearance.
+    """
+
+    def __init__(self, template: str, columns: Optional[Iterable[str]] = None) -> None:
+        """
+        Args:
+            template (str): The template text.
+            columns (Iterable[str], optional): Columns of the frames it will render;
+                if given, missing columns are reported right away.
+
+        Raises:
+            ValueError: If a placeholder is empty or malformed.
+            InvalidColumnName: If the template reads a column not in `columns`.
+        """
+        self.template = template
+        # (literal text, column, format spec, conversion) per placeholder
+        self._parts: List[Tuple[str, Optional[str], str, Optional[str]]] = []
+        self.columns: List[str] = []
+        for literal, field, spec, conversion in Formatter().parse(template):
+            if field == "":
+                raise ValueError("Template placeholders must name a column.")
+            if field is not None and field not in self.columns:
+                self.columns.append(field)
+            self._parts.append((literal, field, spec or "", conversion))
+        if columns is not None:
+            self.validate(columns)
+
+    def validate(self, columns: Iterable[str]) -> None:
+        """
+        Check that every placeholder names one of `columns`.
+
+        Raises:
+            InvalidColumnName: If the template reads a missing column.
+        """
+        available = set(columns)
+        missing = [column for column in self.columns if column not in available]
+        if missing:
+            raise InvalidColumnName(
+                f"Template columns {missing} not found in the DataFrame."
+            )
+
+    def render(self, df: DataFrame) -> Series:
+        """
+        Render the template for every row of `df`.
+
+        Args:
+            df (DataFrame): The frame holding the template's columns.
+
+        Returns:
+            Series: The rendered prompt of every row.
+        """
+        self.validate(df.columns)
+        parts: List[Union[str, Series]] = []
+        for literal, field, spec, conversion in self._parts:
+            if literal:
+                parts.append(literal)
+            if field is None:
+                continue
+            values = df[field]
+            if conversion == "r":
+                values = values.map(repr)
+            elif conversion == "a":
+                values = values.map(ascii)
+            if spec:
+                # Missing values are written as without a spec, which they may not fit
+                text = _as_text(values)
+                present = values.notna().to_numpy()
+                text[present] = [f"{value:{spec}}" for value in values[present]]
+                parts.append(text)
+            else:
+                parts.append(_as_text(values))
+        return _join(parts, df.index)
+
 
 class BaseLLMWrapper(ABC):
     """
     An abstract base class providing common methods to transform and export data
     for LLM consumption.
 
+    Attributes:
+        wrap_format (str): Format of the wrapped text, one of `WRAP_FORMATS`.
+        layout (str): "data_first" (default) or "prefix", see the module docstring.
+
     Methods to Implement in Child Classes:
         - _prepare_data_for_wrapping() -> DataFrame:
             This method should return a DataFrame of shape (n, m) containing the data
@@ -32,6 +328,25 @@ class BaseLLMWrapper(ABC):
             holding the "prompt" values to wrap.
     """
 
+    wrap_format = "xml"
+    layout = "data_first"
+
+    def _set_wrap_format(self, wrap_format: str, layout: str = "data_first") -> None:
+        """
+        Validate and set the wrap format and layout.
+
+        Raises:
+            ValueError: If the format or layout is unknown.
+        """
+        if wrap_format not in WRAP_FORMATS:
+            raise ValueError(
+                f"Unknown wrap format '{wrap_format}'. Use one of {WRAP_FORMATS}."
+            )
+        if layout not in LAYOUTS:
+            raise ValueError(f"Unknown layout '{layout}'. Use one of {LAYOUTS}.")
+        self.wrap_format = wrap_format
+        self.layout = layout
+
     @abstractmethod
     def _prepare_data_for_wrapping(self) -> DataFrame:
         """
@@ -44,33 +359,16 @@ class BaseLLMWrapper(ABC):
         Return a single-column Series of prompt data.
         """
 
-    def _wrap_data_row(self, row: Series) -> str:
-        """
-        Wrap a row of data into the <data><cell>...</cell></data> format.
-
-        Args:
-            row (Series): A single row containing data columns.
-
-        Returns:
-            str: The wrapped string for the data row.
-        """
-        if row.empty:
-            # If there are no data columns, return an empty <data></data> block
-            return "<data></data>"
-        cells = "\n".join(f"  <cell>{value}</cell>" for value in row)
-        return f"<data>\n{cells}\n</data>"
-
-    def _wrap_prompt(self, value) -> str:
+    def _ordered_data(self) -> DataFrame:
         """
-        Wrap a prompt value into the <prompt>...</prompt> format.
-
-        Args:
-            value: The prompt value to wrap.
-
-        Returns:
-            str: The wrapped string for the prompt.
+        Return the data columns to wrap, in wrapping order.
         """
-        return f"<prompt>{value}</prompt>"
+        data_df = self._prepare_data_for_wrapping()
+        if self.layout == "prefix" and data_df.shape[1] > 1:
+            # Columns shared by many rows first
+            order = np.argsort(data_df.nunique(dropna=False).to_numpy(), kind="stable")
+            data_df = data_df.iloc[:, order]
+        return data_df
 
     def _generate_transformed_content(self) -> DataFrame:
         """
@@ -79,49 +377,82 @@ class BaseLLMWrapper(ABC):
         Returns:
             DataFrame: A single-column DataFrame with the wrapped output.
         """
-        data_df = self._prepare_data_for_wrapping()
-        prompt_series = self._get_prompt_series()
-
-        # Wrap the data rows
-        data_content = data_df.apply(self._wrap_data_row, axis=1)
-
-        # Wrap the prompt column
-        prompt_content = prompt_series.apply(self._wrap_prompt)
-
-        # Combine data and prompt columns into a single column
-        transformed_content = data_content + prompt_content
+        return wrap_chunk(
+            self._ordered_data(),
+            self._get_prompt_series(),
+            self.wrap_format,
+            self.layout,
+        )
 
-        return DataFrame({"wrapped_output": transformed_content})
+    def _parallel_wrap(self, n_jobs: int, csv_path: Optional[str] = None):
+        # pylint: disable=import-outside-toplevel
+        from .parallel import parallel_wrap
+
+        return parallel_wrap(
+            self._ordered_data(),
+            self._get_prompt_series(),
+            partial(wrap_chunk, wrap_format=self.wrap_format, layout=self.layout),
+            n_jobs,
+            wrap_format=self.wrap_format,
+            csv_path=csv_path,
+        )
 
-    def wrap(self) -> DataFrame:
+    def wrap(
+        self, string_storage: Optional[str] = None, n_jobs: Optional[int] = 1
+    ) -> DataFrame:
         """
         Wrap the data for LLM consumption.
 
+        Args:
+            string_storage (str, optional): Storage of the wrapped column: None (Python
+                objects), "pyarrow" or "large_string" for Arrow-backed strings, which
+                take far less memory for millions of rows. See `resolve_string_dtype`.
+            n_jobs (int, optional): Processes to wrap on; -1 uses every core. Above 1,
+                the rows are wrapped in chunks by a process pool reading them from a
+                memory-mapped Arrow file (needs `pyarrow`). Worth it for millions of
+                rows only.
+
         Returns:
             DataFrame: A DataFrame with transformed (wrapped) content.
         """
-        return self._generate_transformed_content()
-
-    def transform_and_export(self, file_path: str, file_format: str = "excel") -> None:
+        n_jobs = resolve_n_jobs(n_jobs)
+        if n_jobs > 1:
+            wrapped = DataFrame({"wrapped_output": self._parallel_wrap(n_jobs)})
+        else:
+            wrapped = self._generate_transformed_content()
+        dtype = resolve_string_dtype(string_storage)
+        if dtype is not None:
+            wrapped["wrapped_output"] = wrapped["wrapped_output"].astype(dtype)
+        return wrapped
+
+    def transform_and_export(
+        self, file_path: str, file_format: str = "excel", n_jobs: Optional[int] = 1
+    ) -> None:
         """
         Transform the data and export it to a specified file.
 
         Args:
             file_path (str): The path to save the exported file.
             file_format (str): The format of the file ('csv', 'json', or 'excel').
+            n_jobs (int, optional): Processes to wrap on, see `wrap`. CSV chunks are
+                written by the workers and concatenated in row order.
 
         Raises:
             ValueError: If an unsupported file format is provided.
         """
-        transformed_df = self.wrap()
+        if file_format not in ("csv", "json", "excel"):
+            raise ValueError("Unsupported file format. Use 'csv', 'json', or 'excel'.")
+        n_jobs = resolve_n_jobs(n_jobs)
+        if file_format == "csv" and n_jobs > 1:
+            self._parallel_wrap(n_jobs, csv_path=file_path)
+            return
+        transformed_df = self.wrap(n_jobs=n_jobs)
         if file_format == "csv":
             transformed_df.to_csv(file_path, index=False)
         elif file_format == "json":
             transformed_df.to_json(file_path, orient="records")
-        elif file_format == "excel":
-            transformed_df.to_excel(file_path, index=False, engine="openpyxl")
         else:
-            raise ValueError("Unsupported file format. Use 'csv', 'json', or 'excel'.")
+            transformed_df.to_excel(file_path, index=False, engine="openpyxl")
 
     def preview(self, n: int = 5) -> None:
         """
@@ -142,13 +473,18 @@ class WrapDataFrame(BaseLLMWrapper):
         df (DataFrame): The input DataFrame.
         prompt_column (str): The column containing prompt data.
         data_columns (Optional[List[str]]): The columns containing the data to wrap.
+        prompt_template (Optional[PromptTemplate]): Template the prompts are rendered
+            from instead of being read from `prompt_column`.
     """
 
-    def __init__(
+    def __init__(  # pylint: disable=too-many-arguments,too-many-positional-arguments
         self,
         df: DataFrame,
         prompt_column: str = "prompt_column",
         data_columns: Optional[List[str]] = None,
+        wrap_format: str = "xml",
+        layout: str = "data_first",
+        prompt_template: Optional[Union[str, PromptTemplate]] = None,
     ) -> None:
         """
         Initialize the WrapDataFrame object.
@@ -157,10 +493,21 @@ class WrapDataFrame(BaseLLMWrapper):
             df (DataFrame): The input DataFrame.
             prompt_column (str): The column containing prompt data.
             data_columns (Optional[List[str]]): The columns containing the data to wrap.
+            wrap_format (str): Format of the wrapped text: "xml" (default), "csv",
+                "tsv", "json" or "kv".
+            layout (str): "data_first" (default) or "prefix" to put the prompt and the
+                least varying columns first, for provider prompt caching.
+            prompt_template (Union[str, PromptTemplate], optional): Builds every prompt
+                from `{column}` placeholders, e.g. "Summarize this {Language} review".
+                The prompt column is then not needed.
         """
         self.df = df
         self.prompt_column = prompt_column
         self.data_columns = data_columns or []
+        if isinstance(prompt_template, str):
+            prompt_template = PromptTemplate(prompt_template)
+        self.prompt_template = prompt_template
+        self._set_wrap_format(wrap_format, layout)
         self._validate_columns()
 
     def _validate_columns(self) -> None:
@@ -170,7 +517,9 @@ class WrapDataFrame(BaseLLMWrapper):
         Raises:
             InvalidColumnName: If required columns are missing from the DataFrame.
         """
-        if self.prompt_column not in self.df.columns:
+        if self.prompt_template is not None:
+            self.prompt_template.validate(self.df.columns)
+        elif self.prompt_column not in self.df.columns:
             raise InvalidColumnName(
                 f"Prompt column '{self.prompt_column}' not found in the DataFrame."
             )
@@ -198,8 +547,10 @@ class WrapDataFrame(BaseLLMWrapper):
 
     def _get_prompt_series(self) -> Series:
         """
-        Return the prompt column as a Series.
+        Return the prompt column, or the rendered prompt template, as a Series.
         """
+        if self.prompt_template is not None:
+            return self.prompt_template.render(self.df)
         return self.df[self.prompt_column]
 
 
@@ -218,6 +569,8 @@ class WrapDataArray(BaseLLMWrapper):
         arr: Union[np.ndarray, list],
         prompt_index: int = 0,
         data_indices: Optional[List[int]] = None,
+        wrap_format: str = "xml",
+        layout: str = "data_first",
     ) -> None:
         """
         Initialize the WrapDataArray object.
@@ -226,6 +579,10 @@ class WrapDataArray(BaseLLMWrapper):
             arr (Union[np.ndarray, list]): The input array or list of lists.
             prompt_index (int): The index (column) containing prompt data.
             data_indices (Optional[List[int]]): The columns (by index) with data to wrap.
+            wrap_format (str): Format of the wrapped text: "xml" (default), "csv",
+                "tsv", "json" or "kv". Columns are named `col_<index>`.
+            layout (str): "data_first" (default) or "prefix" to put the prompt and the
+                least varying columns first, for provider prompt caching.
         """
         # Convert list to numpy array if not already
         if isinstance(arr, list):
@@ -239,6 +596,7 @@ class WrapDataArray(BaseLLMWrapper):
         self.arr = arr
         self.prompt_index = prompt_index
         self.data_indices = data_indices or []
+        self._set_wrap_format(wrap_format, layout)
         self._validate_indices()
 
         # Convert the array into a DataFrame for easier manipulation
@@ -302,14 +660,20 @@ class WrapPromptList(BaseLLMWrapper):
         df = wrapper.wrap()
     """
 
-    def __init__(self, prompts: List[str]) -> None:
+    def __init__(
+        self, prompts: List[str], wrap_format: str = "xml", layout: str = "data_first"
+    ) -> None:
         """
         Initialize the WrapPromptList object.
 
         Args:
             prompts (List[str]): A list of prompt strings.
+            wrap_format (str): "xml" (default) wraps every prompt in `<data></data>`
+                and `<prompt>` tags; the other formats leave the prompts as they are.
+            layout (str): "data_first" (default) or "prefix" to put the prompt first.
         """
         self.prompts = prompts
+        self._set_wrap_format(wrap_format, layout)
 
     def _prepare_data_for_wrapping(self) -> DataFrame:
         """
@@ -324,3 +688,239 @@ class WrapPromptList(BaseLLMWrapper):
         Return the list of prompts as a pandas Series.
         """
         return Series(self.prompts)
+
+
+class WrapPolarsFrame(BaseLLMWrapper):
+    """
+    A class to wrap Polars DataFrame / LazyFrame data for LLM consumption.
+
+    The output is built with Polars string expressions (`concat_str`), so wrapping
+    runs multi-threaded in Polars without a round trip through pandas. It matches the
+    output of `WrapDataFrame`, except that null cells are wrapped as empty cells (and
+    as `null` in the "json" format, which Polars encodes itself) and booleans as
+    `true` / `false`.
+
+    Attributes:
+        df (polars.DataFrame | polars.LazyFrame): The input frame.
+        prompt_column (str): The column containing prompt data.
+        data_columns (Optional[List[str]]): The columns containing the data to wrap.
+    """
+
+    def __init__(
+        self,
+        df,
+        prompt_column: str = "prompt_column",
+        data_columns: Optional[List[str]] = None,
+        wrap_format: str = "xml",
+        layout: str = "data_first",
+    ) -> None:
+        """
+        Initialize the WrapPolarsFrame object.
+
+        Args:
+            df (polars.DataFrame | polars.LazyFrame): The input frame.
+            prompt_column (str): The column containing prompt data.
+            data_columns (Optional[List[str]]): The columns containing the data to wrap.
+                If None, all columns except the prompt column are wrapped.
+            wrap_format (str): Format of the wrapped text: "xml" (default), "csv",
+                "tsv", "json" or "kv".
+            layout (str): "data_first" (default) or "prefix" to put the prompt and the
+                least varying columns first, for provider prompt caching.
+        """
+        self.df = df
+        self.prompt_column = prompt_column
+        self.data_columns = data_columns or []
+        self._set_wrap_format(wrap_format, layout)
+        self._columns = (
+            df.collect_schema().names() if hasattr(df, "collect") else df.columns
+        )
+        self._validate_columns()
+
+    def _validate_columns(self) -> None:
+        """
+        Validate that the required columns exist in the frame.
+
+        Raises:
+            InvalidColumnName: If required columns are missing from the frame.
+        """
+        if self.prompt_column not in self._columns:
+            raise InvalidColumnName(
+                f"Prompt column '{self.prompt_column}' not found in the DataFrame."
+            )
+
+        missing_columns = [col for col in self.data_columns if col not in self._columns]
+        if missing_columns:
+            raise InvalidColumnName(
+                f"Data columns {missing_columns} not found in the DataFrame."
+            )
+
+    def _prepare_data_for_wrapping(self):
+        """
+        Return the frame of only the data columns that we need to wrap.
+        """
+        columns = self.data_columns or [
+            col for col in self._columns if col != self.prompt_column
+        ]
+        return self.df.select(columns)
+
+    def _get_prompt_series(self):
+        """
+        Return the prompt column of the frame.
+        """
+        return self.df.select(self.prompt_column)
+
+    def _data_columns(self) -> List[str]:
+        """
+        Return the data columns to wrap, in wrapping order.
+        """
+        import polars as pl  # pylint: disable=import-outside-toplevel
+
+        columns = self.data_columns or [
+            col for col in self._columns if col != self.prompt_column
+        ]
+        if self.layout != "prefix" or len(columns) < 2:
+            return columns
+        # Columns shared by many rows first
+        counts = self.df.select(pl.col(columns).n_unique())
+        if hasattr(counts, "collect"):
+            counts = counts.collect()
+        order = np.argsort(np.asarray(counts.row(0)), kind="stable")
+        return [columns[position] for position in order]
+
+    def _data_parts(self, columns: List[str]) -> list:
+        """
+        Build the Polars expressions of the wrapped data block of a row.
+        """
+        import polars as pl  # pylint: disable=import-outside-toplevel
+
+        if self.wrap_format == "xml":
+            if not columns:
+                return [pl.lit("<data></data>")]
+            parts = [pl.lit("<data>\n  <cell>")]
+            for position, column in enumerate(columns):
+                if position:
+                    parts.append(pl.lit("</cell>\n  <cell>"))
+                parts.append(pl.col(column).cast(pl.String))
+            return [*parts, pl.lit("</cell>\n</data>")]
+
+        parts = []
+        if self.wrap_format in ("csv", "tsv"):
+            separator = "," if self.wrap_format == "csv" else "\t"
+
+            def field(text):
+                if self.wrap_format == "tsv":
+                    return text.str.replace_all("[\t\r\n]", " ")
+                quoted = pl.concat_str(
+                    [
+                        pl.lit('"'),
+                        text.str.replace_all('"', '""', literal=True),
+                        pl.lit('"'),
+                    ]
+                )
+                return (
+                    pl.when(text.str.contains('[,"\r\n]')).then(quoted).otherwise(text)
+                )
+
+            header = separator.join(
+                _csv_field(Series(columns, dtype=object))
+                if self.wrap_format == "csv"
+                else _tsv_field(Series(columns, dtype=object))
+            )
+            parts.append(pl.lit(header + "\n"))
+            for position, column in enumerate(columns):
+                if position:
+                    parts.append(pl.lit(separator))
+                parts.append(field(pl.col(column).cast(pl.String)))
+        elif self.wrap_format == "json":
+            parts.append(pl.struct(columns).struct.json_encode())
+        else:
+            for position, column in enumerate(columns):
+                parts += [
+                    pl.lit(f"{chr(10) if position else ''}{column}: "),
+                    pl.col(column).cast(pl.String),
+                ]
+        return parts
+
+    def _wrap_expression(self):
+        """
+        Build the Polars expression producing the wrapped output of a row.
+        """
+        import polars as pl  # pylint: disable=import-outside-toplevel
+
+        columns = self._data_columns()
+        prompt = pl.col(self.prompt_column).cast(pl.String)
+        if self.wrap_format == "xml":
+            prompt_parts = [pl.lit("<prompt>"), prompt, pl.lit("</prompt>")]
+            separator = []
+        elif not columns:
+            return prompt.alias("wrapped_output")
+        else:
+            prompt_parts = [prompt]
+            separator = [pl.lit("\n\n")]
+        data_parts = self._data_parts(columns)
+        if self.layout == "prefix":
+            parts = [*prompt_parts, *separator, *data_parts]
+        else:
+            parts = [*data_parts, *separator, *prompt_parts]
+        return pl.concat_str(parts, ignore_nulls=True).alias("wrapped_output")
+
+    def wrap(self, string_storage: Optional[str] = None, n_jobs: Optional[int] = 1):
+        """
+        Wrap the data for LLM consumption.
+
+        Args:
+            string_storage (str, optional): Ignored; Polars strings are Arrow-backed.
+            n_jobs (int, optional): Ignored; Polars already wraps on every core.
+
+        Returns:
+            polars.DataFrame | polars.LazyFrame: Same kind of frame as the input.
+        """
+        return self._generate_transformed_content()
+
+    def _generate_transformed_content(self):
+        """
+        Generate the single-column frame with the wrapped output.
+
+        Returns:
+            polars.DataFrame | polars.LazyFrame: Same kind of frame as the input.
+        """
+        return self.df.select(self._wrap_expression())
+
+    def transform_and_export(
+        self, file_path: str, file_format: str = "excel", n_jobs: Optional[int] = 1
+    ) -> None:
+        """
+        Transform the data and export it to a specified file.
+
+        Args:
+            file_path (str): The path to save the exported file.
+            file_format (str): The format of the file ('csv', 'json', or 'excel').
+                Excel export needs the `xlsxwriter` package.
+            n_jobs (int, optional): Ignored; Polars already wraps on every core.
+
+        Raises:
+            ValueError: If an unsupported file format is provided.
+        """
+        transformed_df = self.wrap()
+        if hasattr(transformed_df, "collect"):
+            transformed_df = transformed_df.collect()
+        if file_format == "csv":
+            transformed_df.write_csv(file_path)
+        elif file_format == "json":
+            transformed_df.write_json(file_path)
+        elif file_format == "excel":
+            transformed_df.write_excel(file_path)
+        else:
+            raise ValueError("Unsupported file format. Use 'csv', 'json', or 'excel'.")
+
+    def preview(self, n: int = 5) -> None:
+        """
+        Display a preview of the transformed output.
+
+        Args:
+            n (int): Number of rows to preview. Default is 5.
+        """
+        transformed_df = self.df.head(n).select(self._wrap_expression())
+        if hasattr(transformed_df, "collect"):
+            transformed_df = transformed_df.collect()
+        print(transformed_df)